@@ -176,6 +176,38 @@ describe("ObjectStream serialization and deserialization", () => {
     });
   });
 
+  it("should correctly handle list and number operations", async () => {
+    const stream = createObjectStream({
+      execute: (controller) => {
+        controller.enqueue([
+          { type: "set", path: ["items"], value: [1, 2, 3] },
+          { type: "set", path: ["meta"], value: { a: 1, b: 2 } },
+          { type: "delete", path: ["items", "0"] },
+          { type: "delete", path: ["meta", "b"] },
+          {
+            type: "splice",
+            path: ["items"],
+            start: 1,
+            deleteCount: 1,
+            items: [4, 5],
+          },
+          { type: "append-list", path: ["items"], items: [6] },
+          { type: "increment", path: ["meta", "a"], value: 2 },
+          { type: "increment", path: ["meta", "count"], value: 1 },
+        ]);
+      },
+    });
+
+    const decodedStream = await encodeAndDecode(stream);
+    const chunks = await collectChunks(decodedStream);
+    const finalChunk = chunks[chunks.length - 1]!;
+
+    expect(finalChunk.snapshot).toEqual({
+      items: [2, 4, 5, 6],
+      meta: { a: 3, count: 1 },
+    });
+  });
+
   it("should correctly handle special characters and Unicode", async () => {
     const stream = createObjectStream({
       execute: (controller) => {
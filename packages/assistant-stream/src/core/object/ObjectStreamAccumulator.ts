@@ -34,6 +34,31 @@ export class ObjectStreamAccumulator {
             throw new Error(`Expected string at path [${op.path.join(", ")}]`);
           return current + op.value;
         });
+      case "delete":
+        return ObjectStreamAccumulator.deletePath(state, op.path);
+      case "splice":
+        return ObjectStreamAccumulator.updatePath(state, op.path, (current) => {
+          if (!Array.isArray(current))
+            throw new Error(`Expected array at path [${op.path.join(", ")}]`);
+          if (op.start < 0 || op.start > current.length)
+            throw new Error(`Splice start out of bounds`);
+          const nextState = [...current];
+          nextState.splice(op.start, op.deleteCount, ...op.items);
+          return nextState;
+        });
+      case "increment":
+        return ObjectStreamAccumulator.updatePath(state, op.path, (current) => {
+          if (current === undefined || current === null) return op.value;
+          if (typeof current !== "number")
+            throw new Error(`Expected number at path [${op.path.join(", ")}]`);
+          return current + op.value;
+        });
+      case "append-list":
+        return ObjectStreamAccumulator.updatePath(state, op.path, (current) => {
+          if (!Array.isArray(current))
+            throw new Error(`Expected array at path [${op.path.join(", ")}]`);
+          return [...current, ...op.items];
+        });
 
       default: {
         const _exhaustiveCheck: never = type;
@@ -42,6 +67,35 @@ export class ObjectStreamAccumulator {
     }
   }
 
+  private static deletePath(
+    state: ReadonlyJSONValue,
+    path: readonly string[],
+  ): ReadonlyJSONValue {
+    if (path.length === 0) throw new Error("Cannot delete the root state");
+
+    const key = path[path.length - 1]!;
+    return ObjectStreamAccumulator.updatePath(
+      state,
+      path.slice(0, -1),
+      (current) => {
+        if (Array.isArray(current)) {
+          const idx = Number(key);
+          if (Number.isNaN(idx) || idx < 0 || idx >= current.length)
+            throw new Error(`Delete array index out of bounds`);
+          const nextState = [...current];
+          nextState.splice(idx, 1);
+          return nextState;
+        }
+        if (typeof current !== "object" || current === null)
+          throw new Error(`Invalid path: [${path.join(", ")}]`);
+
+        const nextState = { ...(current as ReadonlyJSONObject) };
+        delete nextState[key];
+        return nextState;
+      },
+    );
+  }
+
   private static updatePath(
     state: ReadonlyJSONValue | undefined,
     path: readonly string[],
@@ -10,6 +10,27 @@ export type ObjectStreamOperation =
       readonly type: "append-text";
       readonly path: readonly string[];
       readonly value: string;
+    }
+  | {
+      readonly type: "delete";
+      readonly path: readonly string[];
+    }
+  | {
+      readonly type: "splice";
+      readonly path: readonly string[];
+      readonly start: number;
+      readonly deleteCount: number;
+      readonly items: readonly ReadonlyJSONValue[];
+    }
+  | {
+      readonly type: "increment";
+      readonly path: readonly string[];
+      readonly value: number;
+    }
+  | {
+      readonly type: "append-list";
+      readonly path: readonly string[];
+      readonly items: readonly ReadonlyJSONValue[];
     };
 
 export type ObjectStreamChunk = {
@@ -0,0 +1,46 @@
+"""Cost of streaming append-text operations into one long string.
+
+Appends tokens to the content of the last message, as a token stream from
+a model does, and reads the content back at the end. Without buffering
+every token copies the whole string, so the per-token cost grows with the
+length of the answer.
+
+Run with: python benchmarks/bench_append_text.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.state_manager import StateManager
+
+TOKEN = "token "
+
+
+def bench(tokens: int) -> float:
+    state = {"messages": [{"role": "assistant", "content": ""}]}
+    manager = StateManager(lambda _: None, state)
+    operation = {
+        "type": "append-text",
+        "path": ["messages", "0", "content"],
+        "value": TOKEN,
+    }
+    start = time.perf_counter()
+    for _ in range(tokens):
+        manager._apply_operation_to_local_state(operation)
+    content = manager.get_value_at_path(["messages", "0", "content"])
+    elapsed = time.perf_counter() - start
+    assert len(content) == tokens * len(TOKEN)
+    return elapsed
+
+
+async def main() -> None:
+    for tokens in (1_000, 10_000, 50_000):
+        elapsed = bench(tokens)
+        print(
+            f"tokens={tokens:<7} total={elapsed * 1000:9.1f} ms "
+            f"per_token={elapsed * 1e9 / tokens:7.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
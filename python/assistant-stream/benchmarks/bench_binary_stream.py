@@ -0,0 +1,99 @@
+"""Round-trip cost of the binary stream format against the data stream.
+
+Encodes a mixed stream of text deltas, state updates and tool calls with
+DataStreamEncoder and BinaryStreamEncoder, then decodes it the way a Python
+consumer would: line splitting, prefix matching and JSON parsing for the
+data stream, BinaryStreamDecoder for the binary format. Reports the bytes
+on the wire and round trips per second.
+
+Run with: python benchmarks/bench_binary_stream.py
+"""
+
+import json
+import time
+
+from assistant_stream.assistant_stream_chunk import (
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization import (
+    BinaryStreamDecoder,
+    BinaryStreamEncoder,
+    DataStreamEncoder,
+)
+
+CHUNKS = 30_000
+# Body pieces as a consumer would receive them
+READ_SIZE = 4096
+
+
+def make_chunks() -> list:
+    chunks = []
+    for i in range(CHUNKS // 10):
+        for _ in range(7):
+            chunks.append(TextDeltaChunk(text_delta="token ", parent_id="msg_1"))
+        chunks.append(
+            UpdateStateChunk(
+                operations=[
+                    {"type": "append-text", "path": ["messages", "0", "content"], "value": "ab"},
+                    {"type": "set", "path": ["status"], "value": {"step": i, "done": False}},
+                ]
+            )
+        )
+        chunks.append(ToolCallBeginChunk(tool_call_id=f"call_{i}", tool_name="search"))
+        chunks.append(
+            ToolResultChunk(tool_call_id=f"call_{i}", result={"hits": [{"score": 0.5}] * 5})
+        )
+    return chunks
+
+
+def pieces(data: bytes) -> list:
+    return [data[i : i + READ_SIZE] for i in range(0, len(data), READ_SIZE)]
+
+
+def data_stream_round_trip(chunks: list) -> int:
+    encoder = DataStreamEncoder()
+    body = b"".join(encoder.encode_chunk(chunk) for chunk in chunks)
+    decoded = 0
+    rest = b""
+    for data in pieces(body):
+        lines = (rest + data).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            prefix, _, payload = line.partition(b":")
+            json.loads(payload)
+            decoded += 1
+    assert decoded == len(chunks)
+    return len(body)
+
+
+def binary_round_trip(chunks: list) -> int:
+    encoder = BinaryStreamEncoder()
+    body = b"".join(encoder.encode_chunk(chunk) for chunk in chunks)
+    decoder = BinaryStreamDecoder()
+    decoded = 0
+    for data in pieces(body):
+        decoded += len(decoder.feed(data))
+    decoder.close()
+    assert decoded == len(chunks)
+    return len(body)
+
+
+def main() -> None:
+    chunks = make_chunks()
+    for name, round_trip in (
+        ("data stream", data_stream_round_trip),
+        ("binary stream", binary_round_trip),
+    ):
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            size = round_trip(chunks)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<14} {size:10,d} bytes  {len(chunks) / best:10,.0f} chunks/s")
+
+
+if __name__ == "__main__":
+    main()
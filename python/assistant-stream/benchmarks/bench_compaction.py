@@ -0,0 +1,85 @@
+"""Wire size of state batches with and without operation compaction.
+
+By default this replays a synthetic trace, generated in this file rather
+than recorded from a real run. It models a LangGraph agent streaming chat
+messages into the assistant-transport state: each AI message is added
+with a set, its content streamed token by token, and its status replaced
+after every token. Several tokens land in the same loop iteration, so each
+state batch has redundant operations to compact.
+
+To measure a recorded trace instead, pass a JSON Lines file with one
+uncompacted state batch (the `operations` of an update-state chunk from a
+run with compact_state_operations=False) per line.
+
+Run with: python benchmarks/bench_compaction.py [trace.jsonl]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from assistant_stream import create_run, RunController
+from assistant_stream.state_compaction import compact_operations
+
+MESSAGES = 20
+TOKENS = 400
+TOKENS_PER_TICK = 8
+
+
+async def run_callback(controller: RunController) -> None:
+    controller.state["messages"] = []
+    for m in range(MESSAGES):
+        messages = controller.state["messages"]
+        messages.append({"id": f"msg_{m}", "type": "ai", "content": "", "status": {}})
+        message = messages[m]
+        for t in range(TOKENS):
+            message["content"] += f"tok{t} "
+            message["status"] = {"type": "running", "tokens": t + 1}
+            if (t + 1) % TOKENS_PER_TICK == 0:
+                await asyncio.sleep(0)
+        message["status"] = {"type": "complete", "tokens": TOKENS}
+
+
+async def measure(compact: bool):
+    operations = 0
+    size = 0
+    start = time.perf_counter()
+    async for chunk in create_run(
+        run_callback, state={}, compact_state_operations=compact
+    ):
+        if chunk.type == "update-state":
+            operations += len(chunk.operations)
+            size += len(json.dumps(chunk.operations))
+    return operations, size, (time.perf_counter() - start) * 1000
+
+
+def measure_recorded(path: str, compact: bool):
+    with open(path) as trace:
+        batches = [json.loads(line) for line in trace if line.strip()]
+    operations = 0
+    size = 0
+    start = time.perf_counter()
+    for batch in batches:
+        if compact:
+            batch = compact_operations(batch)
+        operations += len(batch)
+        size += len(json.dumps(batch))
+    return operations, size, (time.perf_counter() - start) * 1000
+
+
+async def main() -> None:
+    trace = sys.argv[1] if len(sys.argv) > 1 else None
+    for compact in (False, True):
+        if trace is None:
+            operations, size, elapsed = await measure(compact)
+        else:
+            operations, size, elapsed = measure_recorded(trace, compact)
+        print(
+            f"compact={str(compact):<5} operations={operations:<7} "
+            f"bytes={size:<9} time={elapsed:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""Wire size and throughput of compressed assistant-transport responses.
+
+Streams a run that appends tokens to a message in the state through
+AssistantTransportResponse, uncompressed and with each available encoding,
+with and without write coalescing, and reports the bytes on the wire and
+chunks per second.
+
+Run with: python benchmarks/bench_compression.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream import (
+    create_run,
+    DiffPolicy,
+    RunController,
+    StreamCompression,
+    WriteCoalescing,
+)
+from assistant_stream.serialization import AssistantTransportResponse
+
+TOKENS = 5_000
+ROUNDS = 3
+
+
+async def run_callback(controller: RunController):
+    for i in range(TOKENS):
+        controller.state["messages"][0]["content"] += "token "
+        if i % 4 == 0:
+            await asyncio.sleep(0)
+
+
+async def bench(encoding, coalescing):
+    wire = 0
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal wire
+        if message["type"] == "http.response.body":
+            wire += len(message["body"])
+
+    response = AssistantTransportResponse(
+        create_run(
+            run_callback,
+            state={"messages": [{"content": ""}]},
+            state_diff=DiffPolicy(),
+        ),
+        write_coalescing=coalescing,
+        compression=StreamCompression() if encoding else None,
+    )
+    headers = [(b"accept-encoding", encoding.encode())] if encoding else []
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "headers": headers}
+    start = time.perf_counter()
+    await response(scope, receive, send)
+    return wire, TOKENS / (time.perf_counter() - start)
+
+
+async def main():
+    encodings = [None, "gzip", "deflate"]
+    if StreamCompression().negotiate("br"):
+        encodings.append("br")
+    for coalescing in (None, WriteCoalescing()):
+        for encoding in encodings:
+            results = [await bench(encoding, coalescing) for _ in range(ROUNDS)]
+            wire = results[-1][0]
+            best = max(rate for _, rate in results)
+            name = f"{encoding or 'identity'}{' + coalescing' if coalescing else ''}"
+            print(f"{name:22s} {wire:10,d} bytes  {best:10,.0f} chunks/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
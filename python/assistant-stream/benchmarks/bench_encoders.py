@@ -0,0 +1,81 @@
+"""Encoding throughput of the stream encoders.
+
+Encodes a mixed stream of text deltas, state updates and tool results with
+each encoder and reports chunks per second, through encode_stream and, for
+encoders that have it, through direct encode_chunk calls.
+
+Run with: python benchmarks/bench_encoders.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.assistant_stream_chunk import (
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization import (
+    AssistantTransportEncoder,
+    DataStreamEncoder,
+    OpenAIStreamEncoder,
+)
+from assistant_stream.state_manager import StateManager
+
+CHUNKS = 30_000
+
+
+def make_chunks(manager: StateManager) -> list:
+    chunks = []
+    for i in range(CHUNKS // 10):
+        for _ in range(7):
+            chunks.append(TextDeltaChunk(text_delta="token ", parent_id="msg_1"))
+        chunks.append(
+            UpdateStateChunk(
+                operations=[
+                    {"type": "append-text", "path": ["messages", "0", "content"], "value": "ab"},
+                    {"type": "set", "path": ["status"], "value": {"step": i, "done": False}},
+                ]
+            )
+        )
+        chunks.append(ToolCallBeginChunk(tool_call_id=f"call_{i}", tool_name="search"))
+        chunks.append(ToolResultChunk(tool_call_id=f"call_{i}", result=manager.state["result"]))
+    return chunks
+
+
+async def bench(encoder, chunks: list) -> float:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    start = time.perf_counter()
+    async for _ in encoder.encode_stream(stream()):
+        pass
+    return len(chunks) / (time.perf_counter() - start)
+
+
+def bench_direct(encoder, chunks: list) -> float:
+    encode_chunk = encoder.encode_chunk
+    start = time.perf_counter()
+    for chunk in chunks:
+        encode_chunk(chunk)
+    return len(chunks) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    manager = StateManager(
+        lambda _: None, {"result": {"hits": [{"title": "Zoë", "score": 0.5}] * 5}}
+    )
+    chunks = make_chunks(manager)
+    for encoder in (DataStreamEncoder(), AssistantTransportEncoder(), OpenAIStreamEncoder()):
+        rate = max([await bench(encoder, chunks) for _ in range(3)])
+        line = f"{type(encoder).__name__:<26} stream={rate:9.0f} chunks/s"
+        if hasattr(encoder, "encode_chunk"):
+            direct = max(bench_direct(encoder, chunks) for _ in range(3))
+            line += f" encode_chunk={direct:9.0f} chunks/s"
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Per-chunk enqueue overhead of RunController and ToolCallController.
+
+Calls the shipped producer APIs, RunController.append_text and
+ToolCallController.append_args_text, from the event loop thread, where
+_LoopQueueWriter puts chunks on the queue directly, and from a worker
+thread, where every chunk goes through call_soon_threadsafe. Each timing
+runs until all chunks are on the queue. Finally measures end-to-end
+``create_run`` throughput.
+
+Run with: python benchmarks/bench_enqueue.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream import create_run
+from assistant_stream.create_run import RunController, _RunQueue
+from assistant_stream.modules.tool_call import create_tool_call
+
+N = 200_000
+
+
+async def wait_for_items(queue: asyncio.Queue, n: int) -> None:
+    while queue.qsize() < n:
+        await asyncio.sleep(0)
+
+
+async def bench_append_text(in_thread: bool) -> float:
+    queue = _RunQueue()
+    controller = RunController(queue, None)
+    append_text = controller.append_text
+
+    def produce():
+        for _ in range(N):
+            append_text("x")
+
+    start = time.perf_counter()
+    if in_thread:
+        await asyncio.to_thread(produce)
+    else:
+        produce()
+    await wait_for_items(queue, N)
+    return time.perf_counter() - start
+
+
+async def bench_append_args_text(in_thread: bool) -> float:
+    _, controller = await create_tool_call("search", "call_1")
+    queue = controller.queue
+    # The tool-call-begin chunk
+    queue.get_nowait()
+    append_args_text = controller.append_args_text
+
+    def produce():
+        for _ in range(N):
+            append_args_text("x")
+
+    start = time.perf_counter()
+    if in_thread:
+        await asyncio.to_thread(produce)
+    else:
+        produce()
+    await wait_for_items(queue, N)
+    return time.perf_counter() - start
+
+
+async def bench_create_run() -> float:
+    async def callback(controller):
+        for _ in range(N):
+            controller.append_text("x")
+
+    start = time.perf_counter()
+    async for _ in create_run(callback):
+        pass
+    return time.perf_counter() - start
+
+
+def report(name: str, seconds: float) -> None:
+    print(f"{name:<38} {seconds * 1e9 / N:8.0f} ns/chunk")
+
+
+async def main() -> None:
+    for in_thread in (True, False):
+        where = "worker thread" if in_thread else "loop thread"
+        report(f"append_text ({where})", await bench_append_text(in_thread))
+        report(f"append_args_text ({where})", await bench_append_args_text(in_thread))
+    report("create_run end-to-end", await bench_create_run())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Wire size of list edits with whole-list sets versus compact operations.
+
+Removes, inserts and appends messages in a thread of 500 messages, once by
+assigning the edited list (the only option with set and append-text) and
+once through StateProxy.pop/insert/extend, which emit delete, splice and
+append-list operations.
+
+Run with: python benchmarks/bench_list_ops.py
+"""
+
+import asyncio
+import json
+import time
+
+from assistant_stream.state_manager import FlushPolicy, StateManager
+
+MESSAGES = 500
+EDITS = 50
+
+
+def make_message(i: int) -> dict:
+    return {"id": f"msg_{i}", "role": "user", "content": "x" * 200}
+
+
+def bench(compact: bool):
+    chunks = []
+    state = {"messages": [make_message(i) for i in range(MESSAGES)]}
+    manager = StateManager(chunks.append, state, FlushPolicy("immediate"))
+    messages = manager.state["messages"]
+
+    start = time.perf_counter()
+    for i in range(EDITS):
+        if compact:
+            messages.pop(0)
+            messages.insert(10, make_message(MESSAGES + i))
+            messages.extend([make_message(-i)])
+        else:
+            edited = list(manager.state_data["messages"])
+            edited.pop(0)
+            edited.insert(10, make_message(MESSAGES + i))
+            edited.append(make_message(-i))
+            manager.state["messages"] = edited
+    elapsed = time.perf_counter() - start
+
+    size = sum(len(json.dumps(chunk.operations)) for chunk in chunks)
+    return size, elapsed * 1e6 / EDITS
+
+
+async def main() -> None:
+    for compact in (False, True):
+        size, elapsed = bench(compact)
+        label = "operations" if compact else "whole-list"
+        print(f"{label:<11} bytes={size:<9} {elapsed:8.1f} us/edit")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
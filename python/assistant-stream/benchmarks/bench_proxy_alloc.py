@@ -0,0 +1,91 @@
+"""Allocation cost of StateProxy on a token-streaming workload.
+
+Streams tokens into the last message the way a LangGraph handler does,
+going through `state["messages"][-1]["parts"][0]["text"]` for every token, and
+reports the time per token, the number of StateProxy objects created and
+the memory traced by tracemalloc, including the retained size of one
+child proxy.
+
+Run with: python benchmarks/bench_proxy_alloc.py
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from assistant_stream.state_manager import FlushPolicy, StateManager
+from assistant_stream.state_proxy import StateProxy
+
+MESSAGES = 50
+TOKENS = 20_000
+
+
+def make_manager() -> StateManager:
+    state = {
+        "messages": [
+            {"id": str(i), "parts": [{"type": "text", "text": ""}]}
+            for i in range(MESSAGES)
+        ]
+    }
+    return StateManager(lambda _: None, state, FlushPolicy("immediate"))
+
+
+def stream_tokens(manager: StateManager) -> None:
+    state = manager.state
+    for _ in range(TOKENS):
+        part = state["messages"][-1]["parts"][0]
+        part["text"] += "t"
+
+
+def proxy_size() -> float:
+    manager = make_manager()
+    messages = manager.state["messages"]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    proxies = [messages[i] for i in range(MESSAGES)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(proxies) == MESSAGES
+    return (after - before) / MESSAGES
+
+
+def count_proxies() -> int:
+    created = 0
+    init = StateProxy.__init__
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal created
+        created += 1
+        init(self, *args, **kwargs)
+
+    StateProxy.__init__ = counting_init
+    try:
+        stream_tokens(make_manager())
+    finally:
+        StateProxy.__init__ = init
+    return created
+
+
+async def main() -> None:
+    elapsed = float("inf")
+    for _ in range(5):
+        manager = make_manager()
+        start = time.perf_counter()
+        stream_tokens(manager)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    manager = make_manager()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    stream_tokens(manager)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"per_token={elapsed * 1e9 / TOKENS:7.0f} ns")
+    print(f"proxies created={count_proxies()}")
+    print(f"traced current={current:9d} B peak={peak:9d} B")
+    print(f"child proxy={proxy_size():7.0f} B")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
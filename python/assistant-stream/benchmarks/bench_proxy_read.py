@@ -0,0 +1,59 @@
+"""Cost of reading state through StateProxy.
+
+Measures a chained read from the root proxy (`state["k0"]["k1"]...`) and
+repeated reads through a proxy that is kept around between writes, at
+increasing depths.
+
+Run with: python benchmarks/bench_proxy_read.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.state_manager import StateManager
+
+N = 20_000
+
+
+def make_state(depth: int) -> dict:
+    state = {"leaf": 1}
+    for i in reversed(range(depth)):
+        state = {f"k{i}": state}
+    return state
+
+
+def chained_read(state, depth: int):
+    node = state
+    for i in range(depth):
+        node = node[f"k{i}"]
+    return node["leaf"]
+
+
+def bench(depth: int):
+    manager = StateManager(lambda _: None, make_state(depth))
+    state = manager.state
+
+    start = time.perf_counter()
+    for _ in range(N):
+        chained_read(state, depth)
+    chained = (time.perf_counter() - start) * 1e9 / N
+
+    proxy = state
+    for i in range(depth):
+        proxy = proxy[f"k{i}"]
+    start = time.perf_counter()
+    for _ in range(N):
+        proxy["leaf"]
+        len(proxy)
+    held = (time.perf_counter() - start) * 1e9 / N
+    return chained, held
+
+
+async def main() -> None:
+    for depth in (1, 4, 16):
+        chained, held = bench(depth)
+        print(f"depth={depth:<3} chained={chained:8.0f} ns/read held={held:7.0f} ns/read")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""ASGI body writes and throughput of AssistantStreamResponse.
+
+Streams a run of short text deltas through DataStreamResponse against an
+in-process ASGI send callable, with and without write coalescing, and
+reports the number of http.response.body messages and chunks per second.
+
+Run with: python benchmarks/bench_response_writes.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream import create_run, RunController, WriteCoalescing
+from assistant_stream.serialization import DataStreamResponse
+
+TOKENS = 20_000
+ROUNDS = 5
+
+
+async def run_callback(controller: RunController):
+    for i in range(TOKENS):
+        controller.append_text("token ")
+        if i % 8 == 0:
+            # Let the response drain between bursts, like a model stream
+            await asyncio.sleep(0)
+
+
+async def bench(policy):
+    writes = 0
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal writes
+        if message["type"] == "http.response.body" and message.get("body"):
+            writes += 1
+
+    response = DataStreamResponse(
+        create_run(run_callback, coalesce_text_ms=None), write_coalescing=policy
+    )
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    start = time.perf_counter()
+    await response(scope, receive, send)
+    return writes, TOKENS / (time.perf_counter() - start)
+
+
+async def main():
+    for name, policy in [
+        ("uncoalesced", None),
+        ("coalesced", WriteCoalescing()),
+    ]:
+        results = [await bench(policy) for _ in range(ROUNDS)]
+        writes = results[-1][0]
+        best = max(rate for _, rate in results)
+        print(f"{name:12s} {writes:7d} writes  {best:12,.0f} chunks/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""Cost of bulk state writes with and without batching.
+
+Writes 100 keys into a nested dict per iteration, as separate assignments,
+inside `state.batch()`, and through `update()`, under the immediate flush
+policy where every unbatched write becomes its own chunk.
+
+Run with: python benchmarks/bench_state_batch.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.state_manager import FlushPolicy, StateManager
+
+KEYS = 100
+ITERATIONS = 500
+
+
+def bench(mode: str):
+    chunks = []
+    manager = StateManager(chunks.append, {"meta": {}}, FlushPolicy("immediate"))
+    meta = manager.state["meta"]
+    values = {f"k{i}": i for i in range(KEYS)}
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        if mode == "separate":
+            for key, value in values.items():
+                meta[key] = value
+        elif mode == "batch":
+            with manager.state.batch():
+                for key, value in values.items():
+                    meta[key] = value
+        else:
+            meta.update(values)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1e6 / ITERATIONS, len(chunks) / ITERATIONS
+
+
+async def main() -> None:
+    for mode in ("separate", "batch", "update"):
+        per_write, chunks = bench(mode)
+        print(f"{mode:<9} {per_write:8.1f} us/100 keys  chunks/iteration={chunks:g}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
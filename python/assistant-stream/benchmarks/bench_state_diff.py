@@ -0,0 +1,51 @@
+"""Wire size and cost of reassigning the messages list with diff mode.
+
+A client-style loop copies the messages list, appends a token to the last
+message and assigns the whole list back, with and without a DiffPolicy.
+
+Run with: python benchmarks/bench_state_diff.py
+"""
+
+import asyncio
+import json
+import time
+
+from assistant_stream.state_diff import DiffPolicy
+from assistant_stream.state_manager import FlushPolicy, StateManager
+from assistant_stream.state_proxy import copy_json_value
+
+MESSAGES = 100
+TOKENS = 200
+
+
+def bench(diff_policy):
+    chunks = []
+    state = {
+        "messages": [
+            {"id": f"msg_{i}", "role": "assistant", "content": "x" * 200}
+            for i in range(MESSAGES)
+        ]
+    }
+    manager = StateManager(
+        chunks.append, state, FlushPolicy("immediate"), diff_policy=diff_policy
+    )
+
+    start = time.perf_counter()
+    for _ in range(TOKENS):
+        messages = copy_json_value(manager.state_data["messages"])
+        messages[-1]["content"] += "tok "
+        manager.state["messages"] = messages
+    elapsed = time.perf_counter() - start
+
+    size = sum(len(json.dumps(chunk.operations)) for chunk in chunks)
+    return size, elapsed * 1e6 / TOKENS
+
+
+async def main() -> None:
+    for label, policy in (("full set", None), ("diff", DiffPolicy())):
+        size, elapsed = bench(policy)
+        print(f"{label:<9} bytes={size:<9} {elapsed:8.1f} us/assignment")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
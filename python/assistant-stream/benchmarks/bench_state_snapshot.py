@@ -0,0 +1,60 @@
+"""Cost of taking point-in-time copies of a run's state.
+
+Compares a deep copy of the state with StateManager.snapshot(), which
+shares the state and copies containers on the next write to them. The
+snapshot is taken every `interval` writes while tokens stream into the last
+message of a long thread.
+
+Run with: python benchmarks/bench_state_snapshot.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.state_manager import StateManager
+from assistant_stream.state_proxy import copy_json_value
+
+WRITES = 2_000
+
+
+def make_state(messages: int) -> dict:
+    return {
+        "messages": [
+            {"id": str(i), "content": "x" * 500, "parts": [{"type": "text"}]}
+            for i in range(messages)
+        ]
+    }
+
+
+def bench(messages: int, interval: int, snapshot) -> float:
+    manager = StateManager(lambda _: None, make_state(messages), compact=False)
+    path = ["messages", str(messages - 1), "content"]
+    start = time.perf_counter()
+    for i in range(WRITES):
+        manager.add_operations([{"type": "append-text", "path": path, "value": "y"}])
+        if i % interval == 0:
+            snapshot(manager)
+    return (time.perf_counter() - start) * 1e6 / (WRITES // interval)
+
+
+def deep_copy(manager: StateManager):
+    return copy_json_value(manager.state_data)
+
+
+def shared(manager: StateManager):
+    return manager.snapshot()
+
+
+async def main() -> None:
+    for messages in (100, 2000):
+        for interval in (1, 20):
+            copied = bench(messages, interval, deep_copy)
+            snapshot = bench(messages, interval, shared)
+            print(
+                f"messages={messages:<5} every={interval:<3} "
+                f"deepcopy={copied:9.1f} us/snapshot snapshot={snapshot:7.1f} us/snapshot"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""State updates from several producer threads at once.
+
+Each worker thread appends tokens to its own key while the event loop emits
+the batches and reads the state. Reports the throughput and checks that every
+operation reached both the local state and the emitted chunks.
+
+Run with: python benchmarks/bench_state_threads.py
+"""
+
+import asyncio
+import sys
+import time
+
+from assistant_stream.state_manager import StateManager
+
+OPERATIONS = 20_000
+
+
+async def bench(threads: int):
+    emitted = []
+    per_thread = OPERATIONS // threads
+    manager = StateManager(
+        lambda chunk: emitted.append(len(chunk.operations)),
+        {f"t{i}": "" for i in range(threads)},
+        compact=False,
+    )
+
+    def produce(index: int) -> None:
+        path = [f"t{index}"]
+        for _ in range(per_thread):
+            manager.add_operations([{"type": "append-text", "path": path, "value": "x"}])
+
+    async def read() -> None:
+        while not done.is_set():
+            manager.state_data
+            await asyncio.sleep(0)
+
+    done = asyncio.Event()
+    reader = asyncio.create_task(read())
+    start = time.perf_counter()
+    await asyncio.gather(*(asyncio.to_thread(produce, i) for i in range(threads)))
+    manager.flush()
+    done.set()
+    await reader
+    elapsed = time.perf_counter() - start
+
+    expected = per_thread * threads
+    state = manager.state_data
+    applied = sum(len(state[f"t{i}"]) for i in range(threads))
+    return expected / elapsed, expected - sum(emitted), expected - applied
+
+
+async def main() -> None:
+    # Switch threads often so that unsynchronized updates would collide
+    sys.setswitchinterval(1e-5)
+    for threads in (1, 2, 4, 8):
+        rate, lost_emitted, lost_applied = await bench(threads)
+        print(
+            f"threads={threads:<2} {rate:10.0f} ops/s "
+            f"lost_emitted={lost_emitted} lost_applied={lost_applied}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Cost of local state updates in StateManager.
+
+Streams append-text operations into the last message of threads of
+increasing width, and into leaves of increasingly deep states. With an
+O(depth) update engine the per-operation cost should not grow with the
+number of siblings.
+
+Run with: python benchmarks/bench_state_update.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.state_manager import StateManager
+
+N = 20_000
+
+
+def make_wide_state(messages: int) -> dict:
+    return {
+        "messages": [
+            {"id": str(i), "parts": [{"type": "text", "text": "x" * 20}]}
+            for i in range(messages)
+        ]
+    }
+
+
+def make_deep_state(depth: int) -> dict:
+    state = {"leaf": ""}
+    for i in range(depth):
+        state = {f"k{i}": state, **{f"sibling{j}": j for j in range(50)}}
+    return state
+
+
+def deep_path(depth: int) -> list:
+    return [f"k{i}" for i in reversed(range(depth))] + ["leaf"]
+
+
+def bench(state: dict, path: list) -> float:
+    manager = StateManager(lambda _: None, state)
+    operation = {"type": "append-text", "path": path, "value": "t"}
+    start = time.perf_counter()
+    for _ in range(N):
+        manager._apply_operation_to_local_state(operation)
+    return (time.perf_counter() - start) * 1e9 / N
+
+
+async def main() -> None:
+    for messages in (10, 100, 500, 2000):
+        state = make_wide_state(messages)
+        path = ["messages", str(messages - 1), "parts", "0", "text"]
+        print(f"wide  messages={messages:<5} {bench(state, path):8.0f} ns/op")
+
+    for depth in (2, 8, 32):
+        print(f"deep  depth={depth:<8} {bench(make_deep_state(depth), deep_path(depth)):8.0f} ns/op")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Cost of high-frequency writes below a deep subtree.
+
+Compares appending tokens through the root proxy chain
+(`state["k0"]...["text"] += token`) with appending through a scoped view
+(`controller.scope(path)`), at increasing depths. The last column sets a
+value through the view's add_operations, which walks the path on every
+write, unlike appends after the first one.
+
+Run with: python benchmarks/bench_state_view.py
+"""
+
+import asyncio
+import time
+
+from assistant_stream.state_manager import StateManager
+
+N = 20_000
+
+
+def make_state(depth: int) -> dict:
+    state = {"text": "", "status": ""}
+    for i in reversed(range(depth)):
+        state = {f"k{i}": state}
+    return state
+
+
+def bench(depth: int):
+    path = [f"k{i}" for i in range(depth)]
+
+    manager = StateManager(lambda _: None, make_state(depth))
+    start = time.perf_counter()
+    for _ in range(N):
+        node = manager.state
+        for key in path:
+            node = node[key]
+        node["text"] += "x"
+    manager.flush()
+    chained = (time.perf_counter() - start) * 1e9 / N
+
+    manager = StateManager(lambda _: None, make_state(depth))
+    start = time.perf_counter()
+    view = manager.view(path)
+    for _ in range(N):
+        view.state["text"] += "x"
+    manager.flush()
+    scoped = (time.perf_counter() - start) * 1e9 / N
+
+    manager = StateManager(lambda _: None, make_state(depth))
+    start = time.perf_counter()
+    view = manager.view(path)
+    for _ in range(N):
+        view.add_operations([{"type": "append-text", "path": ["text"], "value": "x"}])
+    manager.flush()
+    operations = (time.perf_counter() - start) * 1e9 / N
+
+    # Without compaction, whose cost at flush also grows with the depth
+    manager = StateManager(lambda _: None, make_state(depth), compact=False)
+    start = time.perf_counter()
+    view = manager.view(path)
+    for _ in range(N):
+        view.add_operations([{"type": "set", "path": ["status"], "value": "running"}])
+    manager.flush()
+    sets = (time.perf_counter() - start) * 1e9 / N
+    return chained, scoped, operations, sets
+
+
+async def main() -> None:
+    for depth in (1, 4, 16):
+        chained, scoped, operations, sets = bench(depth)
+        print(
+            f"depth={depth:<3} chained={chained:7.0f} ns/write "
+            f"view={scoped:7.0f} ns/write view_ops={operations:7.0f} ns/write "
+            f"view_set={sets:7.0f} ns/write"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""Cost of common state writes with and without a compiled StateWriter.
+
+Streams tokens into a message's content and updates its token counter
+through the state proxy, through add_operations with a literal path, and
+through writers compiled from a StateSchema.
+
+Run with: python benchmarks/bench_state_writer.py
+"""
+
+import asyncio
+import time
+from typing import List, Optional, TypedDict
+
+from assistant_stream.state_manager import StateManager
+from assistant_stream.state_schema import StateSchema
+
+N = 50_000
+
+
+class Message(TypedDict):
+    role: str
+    content: str
+    tokens: Optional[int]
+
+
+class ThreadState(TypedDict):
+    messages: List[Message]
+
+
+def make_manager(messages: int) -> StateManager:
+    state = {"messages": [{"role": "ai", "content": "", "tokens": 0} for _ in range(messages)]}
+    # Without compaction, so that the write path dominates
+    return StateManager(
+        lambda _: None, state, compact=False, schema=StateSchema(ThreadState)
+    )
+
+
+def timed(write, manager: StateManager) -> float:
+    start = time.perf_counter()
+    for _ in range(N):
+        write()
+        # Emit every 100 writes, as a streaming run would once per loop tick
+        if len(manager._pending_operations) >= 100:
+            manager.flush()
+    manager.flush()
+    return (time.perf_counter() - start) * 1e9 / N
+
+
+def bench(messages: int):
+    index = messages - 1
+
+    manager = make_manager(messages)
+    message = manager.state["messages"][index]
+
+    def proxy():
+        message["content"] += "x"
+        message.increment("tokens")
+
+    via_proxy = timed(proxy, manager)
+
+    manager = make_manager(messages)
+    content = ["messages", str(index), "content"]
+    tokens = ["messages", str(index), "tokens"]
+
+    def operations():
+        manager.add_operations([{"type": "append-text", "path": content, "value": "x"}])
+        manager.add_operations([{"type": "increment", "path": tokens, "value": 1}])
+
+    via_operations = timed(operations, manager)
+
+    manager = make_manager(messages)
+    content_writer = manager.writer(["messages", index, "content"])
+    tokens_writer = manager.writer(["messages", index, "tokens"])
+
+    def writers():
+        content_writer.append_text("x")
+        tokens_writer.increment()
+
+    via_writers = timed(writers, manager)
+    return via_proxy, via_operations, via_writers
+
+
+async def main() -> None:
+    for messages in (1, 100):
+        via_proxy, via_operations, via_writers = bench(messages)
+        print(
+            f"messages={messages:<4} proxy={via_proxy:6.0f} ns "
+            f"add_operations={via_operations:6.0f} ns writer={via_writers:6.0f} ns "
+            "(per token + counter update)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
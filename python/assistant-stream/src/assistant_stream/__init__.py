@@ -1,20 +1,60 @@
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.write_coalescing import WriteCoalescing
+from assistant_stream.serialization.stream_compression import StreamCompression
 from assistant_stream.create_run import (
     create_run,
     RunController,
 )
+from assistant_stream.run_metrics import RunMetrics
+from assistant_stream.state_manager import FlushPolicy, StateHistoryExpiredError
+from assistant_stream.state_diff import DiffPolicy
+from assistant_stream.state_schema import StateSchema
+from assistant_stream.run_registry import (
+    RunRegistry,
+    RunLogExpiredError,
+)
+from assistant_stream.broadcast import (
+    RunBroadcast,
+    BroadcastOverflowError,
+)
 
 try:
     from assistant_stream.modules.langgraph import append_langgraph_event, get_tool_call_subgraph_state
 
     __all__ = [
         "AssistantStreamResponse",
+        "WriteCoalescing",
+        "StreamCompression",
         "create_run",
         "RunController",
+        "FlushPolicy",
+        "DiffPolicy",
+        "StateHistoryExpiredError",
+        "StateSchema",
+        "RunMetrics",
+        "RunRegistry",
+        "RunLogExpiredError",
+        "RunBroadcast",
+        "BroadcastOverflowError",
         "append_langgraph_event",
         "get_tool_call_subgraph_state",
     ]
 except ImportError:
-    __all__ = ["AssistantStreamResponse", "create_run", "RunController"]
+    __all__ = [
+        "AssistantStreamResponse",
+        "WriteCoalescing",
+        "StreamCompression",
+        "create_run",
+        "RunController",
+        "FlushPolicy",
+        "DiffPolicy",
+        "StateHistoryExpiredError",
+        "StateSchema",
+        "RunMetrics",
+        "RunRegistry",
+        "RunLogExpiredError",
+        "RunBroadcast",
+        "BroadcastOverflowError",
+    ]
@@ -66,7 +66,39 @@ class ObjectStreamAppendTextOperation(TypedDict):
     type: Literal["append-text"]
 
 
-ObjectStreamOperation = Union[ObjectStreamSetOperation, ObjectStreamAppendTextOperation]
+class ObjectStreamDeleteOperation(TypedDict):
+    path: List[str]
+    type: Literal["delete"]
+
+
+class ObjectStreamSpliceOperation(TypedDict):
+    path: List[str]
+    start: int
+    deleteCount: int
+    items: List[Any]
+    type: Literal["splice"]
+
+
+class ObjectStreamIncrementOperation(TypedDict):
+    path: List[str]
+    value: Union[int, float]
+    type: Literal["increment"]
+
+
+class ObjectStreamAppendListOperation(TypedDict):
+    path: List[str]
+    items: List[Any]
+    type: Literal["append-list"]
+
+
+ObjectStreamOperation = Union[
+    ObjectStreamSetOperation,
+    ObjectStreamAppendTextOperation,
+    ObjectStreamDeleteOperation,
+    ObjectStreamSpliceOperation,
+    ObjectStreamIncrementOperation,
+    ObjectStreamAppendListOperation,
+]
 
 
 @dataclass
@@ -97,3 +129,28 @@ AssistantStreamChunk = Union[
     UpdateStateChunk,
     SourceChunk,
 ]
+
+
+# Rough per-chunk framing cost used for byte accounting
+_CHUNK_OVERHEAD = 32
+
+
+def estimate_chunk_size(chunk: Optional[AssistantStreamChunk]) -> int:
+    """Approximate the encoded size of a chunk without serializing it."""
+    if chunk is None:
+        return 0
+    if isinstance(chunk, TextDeltaChunk):
+        return _CHUNK_OVERHEAD + len(chunk.text_delta)
+    if isinstance(chunk, ReasoningDeltaChunk):
+        return _CHUNK_OVERHEAD + len(chunk.reasoning_delta)
+    if isinstance(chunk, ToolCallDeltaChunk):
+        return _CHUNK_OVERHEAD + len(chunk.args_text_delta)
+    if isinstance(chunk, UpdateStateChunk):
+        size = _CHUNK_OVERHEAD
+        for operation in chunk.operations:
+            value = operation.get("value")
+            size += _CHUNK_OVERHEAD
+            if isinstance(value, str):
+                size += len(value)
+        return size
+    return _CHUNK_OVERHEAD
@@ -0,0 +1,249 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncGenerator, Callable, Coroutine, List, Optional
+
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    ReasoningDeltaChunk,
+    TextDeltaChunk,
+    ToolCallDeltaChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.create_run import RunController, create_run
+from assistant_stream.state_manager import StateManager, copy_json_value
+
+
+class BroadcastOverflowError(RuntimeError):
+    """Raised in a subscriber's stream when it fell too far behind the run."""
+
+
+class _Subscriber:
+    """Bounded per-subscriber buffer fed by the broadcast pump."""
+
+    def __init__(self, max_chunks: Optional[int]):
+        self._max_chunks = max_chunks
+        self._chunks = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._done = False
+        self._error: Optional[BaseException] = None
+
+    def push(self, chunk: AssistantStreamChunk) -> bool:
+        """Buffer a chunk; returns False if the subscriber overflowed."""
+        if self._max_chunks is not None and len(self._chunks) >= self._max_chunks:
+            self._chunks.clear()
+            self.finish(BroadcastOverflowError("Subscriber fell behind the run"))
+            return False
+        self._chunks.append(chunk)
+        self._wake()
+        return True
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self._done = True
+        self._error = error
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def read(self) -> AsyncGenerator[AssistantStreamChunk, None]:
+        while True:
+            if self._chunks:
+                yield self._chunks.popleft()
+                continue
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+            self._waiter = None
+
+
+class RunBroadcast:
+    """Runs one create_run callback and fans its chunks out to many subscribers.
+
+    Every subscriber has its own bounded buffer, so each one can be wrapped in
+    its own response and encoder. A subscriber that lets its buffer fill up is
+    disconnected with BroadcastOverflowError instead of stalling the run or
+    the other subscribers.
+
+    Subscribers that join after the run started receive a compacted catch-up
+    first: the non-state chunks so far with adjacent deltas merged, followed
+    by a single state snapshot (if the run changed the state), and then the
+    live chunks.
+
+    Example:
+        broadcast = RunBroadcast(run_callback, state=initial_state)
+
+        @app.get("/threads/{thread_id}/stream")
+        async def stream(thread_id: str):
+            return AssistantTransportResponse(broadcast.subscribe())
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[RunController], Coroutine[Any, Any, None]],
+        *,
+        state: Any | None = None,
+        max_subscriber_chunks: Optional[int] = 1000,
+        **run_options: Any,
+    ):
+        """Initialize the broadcast.
+
+        Args:
+            callback: Coroutine function that receives the RunController
+            state: Initial state for the run
+            max_subscriber_chunks: Buffer limit of each subscriber
+            **run_options: Additional keyword arguments for create_run
+        """
+        self._callback = callback
+        self._initial_state = state
+        self._max_subscriber_chunks = max_subscriber_chunks
+        self._run_options = run_options
+        self._subscribers: List[_Subscriber] = []
+        self._history: List[Any] = []
+        self._state_manager: Optional[StateManager] = None
+        self._state_changed = False
+        self._task: Optional[asyncio.Task] = None
+        self._done = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the run has finished."""
+        return self._done
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of currently attached subscribers."""
+        return len(self._subscribers)
+
+    def start(self) -> None:
+        """Start the run if it is not running yet."""
+        if self._task is not None:
+            return
+        self._state_manager = StateManager(
+            lambda _: None, copy_json_value(self._initial_state)
+        )
+        stream = create_run(
+            self._callback, state=self._initial_state, **self._run_options
+        )
+        self._task = asyncio.create_task(self._pump(stream))
+
+    def cancel(self) -> None:
+        """Stop the run for every subscriber."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def subscribe(self) -> AsyncGenerator[AssistantStreamChunk, None]:
+        """Attach a subscriber and return its chunk stream.
+
+        Starts the run on first use.
+        """
+        self.start()
+        subscriber = _Subscriber(self._max_subscriber_chunks)
+        for chunk in self._catch_up_chunks():
+            subscriber._chunks.append(chunk)
+        if self._done:
+            subscriber.finish(self._error)
+        else:
+            self._subscribers.append(subscriber)
+        return self._read(subscriber)
+
+    async def _read(
+        self, subscriber: _Subscriber
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        try:
+            async for chunk in subscriber.read():
+                yield chunk
+        finally:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    async def _pump(self, stream: AsyncGenerator[AssistantStreamChunk, None]) -> None:
+        error = None
+        try:
+            async for chunk in stream:
+                self._record(chunk)
+                for subscriber in list(self._subscribers):
+                    if not subscriber.push(chunk):
+                        self._subscribers.remove(subscriber)
+        except Exception as e:
+            error = e
+        finally:
+            self._done = True
+            self._error = error
+            subscribers, self._subscribers = self._subscribers, []
+            for subscriber in subscribers:
+                subscriber.finish(error)
+
+    def _record(self, chunk: AssistantStreamChunk) -> None:
+        """Fold a chunk into the catch-up history and the state mirror."""
+        if isinstance(chunk, UpdateStateChunk):
+            self._state_changed = True
+            for operation in chunk.operations:
+                # Copy so later in-place updates of the run's state don't leak in
+                self._state_manager._apply_operation_to_local_state(
+                    copy_json_value(operation)
+                )
+            return
+
+        key = self._merge_key(chunk)
+        if key is not None:
+            last = self._history[-1] if self._history else None
+            if isinstance(last, list) and last[0] == key:
+                last[1].append(self._delta(chunk))
+            else:
+                self._history.append([key, [self._delta(chunk)]])
+            return
+
+        self._history.append(chunk)
+
+    @staticmethod
+    def _merge_key(chunk: AssistantStreamChunk):
+        if isinstance(chunk, (TextDeltaChunk, ReasoningDeltaChunk)):
+            return (type(chunk), chunk.parent_id)
+        if isinstance(chunk, ToolCallDeltaChunk):
+            return (ToolCallDeltaChunk, chunk.tool_call_id)
+        return None
+
+    @staticmethod
+    def _delta(chunk: AssistantStreamChunk) -> str:
+        if isinstance(chunk, TextDeltaChunk):
+            return chunk.text_delta
+        if isinstance(chunk, ReasoningDeltaChunk):
+            return chunk.reasoning_delta
+        return chunk.args_text_delta
+
+    def _catch_up_chunks(self) -> List[AssistantStreamChunk]:
+        """Build the compacted chunks a late joiner receives."""
+        chunks = []
+        for entry in self._history:
+            if not isinstance(entry, list):
+                chunks.append(entry)
+                continue
+            (chunk_class, key), parts = entry
+            delta = "".join(parts)
+            if len(parts) > 1:
+                # Keep the joined string so the next late joiner reuses it
+                entry[1] = [delta]
+            if chunk_class is TextDeltaChunk:
+                chunks.append(TextDeltaChunk(text_delta=delta, parent_id=key))
+            elif chunk_class is ReasoningDeltaChunk:
+                chunks.append(ReasoningDeltaChunk(reasoning_delta=delta, parent_id=key))
+            else:
+                chunks.append(
+                    ToolCallDeltaChunk(tool_call_id=key, args_text_delta=delta)
+                )
+
+        if self._state_changed:
+            state = self._state_manager.state_data
+            chunks.append(
+                UpdateStateChunk(
+                    operations=[
+                        {"type": "set", "path": [], "value": copy_json_value(state)}
+                    ]
+                )
+            )
+        return chunks
@@ -1,5 +1,10 @@
 import asyncio
-from typing import Any, AsyncGenerator, Callable, Coroutine, List, Optional
+import concurrent.futures
+import copy
+import inspect
+import threading
+from collections import deque
+from typing import Any, AsyncGenerator, Callable, Coroutine, List, Literal, Optional
 from assistant_stream.assistant_stream_chunk import (
     AssistantStreamChunk,
     TextDeltaChunk,
@@ -9,43 +14,418 @@ from assistant_stream.assistant_stream_chunk import (
     ErrorChunk,
     SourceChunk,
     ToolCallBeginChunk,
+    estimate_chunk_size,
 )
 from assistant_stream.modules.tool_call import (
+    _LoopQueueWriter,
+    _on_loop_thread,
     create_tool_call,
     ToolCallController,
     generate_openai_style_tool_call_id,
 )
-from assistant_stream.state_manager import StateManager
+from assistant_stream.run_metrics import RunMetrics
+from assistant_stream.state_diff import DiffPolicy
+from assistant_stream.state_manager import FlushPolicy, StateManager
+from assistant_stream.state_schema import StateSchema, StateWriter
+from assistant_stream.state_view import StateView
+
+
+OverflowPolicy = Literal["block", "coalesce", "raise"]
+
+
+class _RunQueue(asyncio.Queue):
+    """Run queue that tracks buffered chunks and bytes against soft limits.
+
+    Puts never fail; producers check `is_full()` or await `wait_for_space()`
+    before enqueueing. Internal chunks (state updates, the end-of-stream
+    marker) may exceed the limits so ordering is never compromised.
+
+    Chunks that worker threads have scheduled with call_soon_threadsafe but
+    that haven't reached the queue yet count against the limits as well, so
+    blocked worker threads can't pile up a backlog of in-flight puts.
+    """
+
+    def __init__(
+        self,
+        max_chunks: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        super().__init__()
+        self._max_chunks = max_chunks
+        self._max_bytes = max_bytes
+        self._buffered_bytes = 0
+        self._space_waiters = deque()
+        # Chunks scheduled by other threads that are not in the queue yet
+        self._in_flight_chunks = 0
+        self._in_flight_bytes = 0
+        self._closed = False
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Approximate size of the buffered chunks."""
+        return self._buffered_bytes
+
+    def reserve(self, item) -> None:
+        """Count a chunk scheduled for a later put against the limits.
+
+        Called by _LoopQueueWriter under its lock, from any thread.
+        """
+        self._in_flight_chunks += 1
+        if self._max_bytes is not None:
+            self._in_flight_bytes += estimate_chunk_size(item)
+
+    def release(self, item) -> None:
+        """Stop counting a reserved chunk, right before it is put."""
+        self._in_flight_chunks -= 1
+        if self._max_bytes is not None:
+            self._in_flight_bytes -= estimate_chunk_size(item)
+
+    def _put(self, item):
+        if self._max_bytes is not None:
+            self._buffered_bytes += estimate_chunk_size(item)
+        super()._put(item)
+
+    def _get(self):
+        item = super()._get()
+        if self._max_bytes is not None:
+            self._buffered_bytes -= estimate_chunk_size(item)
+        while self._space_waiters and not self.is_full():
+            waiter = self._space_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+        return item
+
+    def is_full(self) -> bool:
+        """Whether the buffer has reached one of its limits."""
+        if (
+            self._max_chunks is not None
+            and self.qsize() + self._in_flight_chunks >= self._max_chunks
+        ):
+            return True
+        if (
+            self._max_bytes is not None
+            and self._buffered_bytes + self._in_flight_bytes >= self._max_bytes
+        ):
+            return True
+        return False
+
+    def close(self) -> None:
+        """Stop waiting for space: the consumer has gone away.
+
+        Pending and later `wait_for_space()` calls raise CancelledError.
+        """
+        self._closed = True
+        while self._space_waiters:
+            waiter = self._space_waiters.popleft()
+            if not waiter.done():
+                waiter.cancel()
+
+    async def wait_for_space(self) -> None:
+        """Suspend until the buffer is below its limits.
+
+        Raises:
+            asyncio.CancelledError: If the queue was closed
+        """
+        while self.is_full():
+            if self._closed:
+                raise asyncio.CancelledError("Run was cancelled")
+            waiter = asyncio.get_running_loop().create_future()
+            self._space_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if not waiter.done():
+                    waiter.cancel()
+
+
+class _TextCoalescer:
+    """Merges adjacent text and reasoning deltas that share a parent_id.
+
+    Deltas are buffered until the end of the current loop tick (or the
+    configured time window) and then emitted as a single chunk. Any other
+    chunk flushes the buffer first, so ordering is preserved.
+
+    The buffer is guarded by `lock`, the run's state lock, so deltas can be
+    added from worker threads while the loop flushes.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        put_chunk: Callable[[AssistantStreamChunk], None],
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        hold_queue: Optional[_RunQueue] = None,
+        lock: Optional[threading.RLock] = None,
+    ):
+        self._loop = loop
+        self._lock = lock or threading.RLock()
+        self._put_chunk = put_chunk
+        self._delay = (window_ms or 0) / 1000
+        self._max_batch = max_batch
+        self._hold_queue = hold_queue
+        self._chunk_class = None
+        self._parent_id = None
+        self._parts: List[str] = []
+        self._handle = None
+
+    @property
+    def pending(self) -> bool:
+        """Whether any deltas are buffered."""
+        return bool(self._parts)
+
+    def add(self, chunk_class, delta: str, parent_id: Optional[str]) -> None:
+        """Buffer a delta, flushing first if it cannot be merged."""
+        with self._lock:
+            if self._parts and (
+                chunk_class is not self._chunk_class or parent_id != self._parent_id
+            ):
+                self.flush()
+
+            if not self._parts:
+                self._chunk_class = chunk_class
+                self._parent_id = parent_id
+                if _on_loop_thread(self._loop):
+                    self._handle = self._loop.call_soon(self._arm)
+                else:
+                    self._handle = self._loop.call_soon_threadsafe(self._arm)
+
+            self._parts.append(delta)
+            if self._max_batch is not None and len(self._parts) >= self._max_batch:
+                self.flush()
+
+    def _arm(self) -> None:
+        """Schedule the flush for the end of the tick or time window."""
+        with self._lock:
+            if self._hold_queue is not None and self._hold_queue.is_full():
+                self._handle = self._loop.create_task(self._flush_when_space())
+            elif self._delay > 0 and self._parts:
+                self._handle = self._loop.call_later(self._delay, self.flush)
+            else:
+                self.flush()
+
+    async def _flush_when_space(self) -> None:
+        """Hold the buffered deltas until the run queue has room."""
+        await self._hold_queue.wait_for_space()
+        with self._lock:
+            self._handle = None
+            self.flush()
+
+    def _cancel_handle(self) -> None:
+        """Cancel the scheduled flush; handles belong to the loop thread."""
+        handle = self._handle
+        if handle is None:
+            return
+        self._handle = None
+        if _on_loop_thread(self._loop):
+            handle.cancel()
+        else:
+            # A flush that still runs finds nothing or a newer batch to emit
+            self._loop.call_soon_threadsafe(handle.cancel)
+
+    def discard(self) -> None:
+        """Drop the buffered deltas without emitting them."""
+        with self._lock:
+            self._cancel_handle()
+            self._parts = []
+
+    def flush(self) -> None:
+        """Emit the buffered deltas as a single chunk."""
+        with self._lock:
+            self._cancel_handle()
+            if not self._parts:
+                return
+
+            delta = "".join(self._parts)
+            self._parts = []
+            if self._chunk_class is TextDeltaChunk:
+                chunk = TextDeltaChunk(text_delta=delta, parent_id=self._parent_id)
+            else:
+                chunk = ReasoningDeltaChunk(
+                    reasoning_delta=delta, parent_id=self._parent_id
+                )
+            # Put under the lock so chunks keep the order of their flushes
+            self._put_chunk(chunk)
 
 
 class RunController:
-    def __init__(self, queue, state_data, parent_id: Optional[str] = None):
+    def __init__(
+        self,
+        queue,
+        state_data,
+        parent_id: Optional[str] = None,
+        *,
+        coalesce_text_ms: Optional[float] = None,
+        max_text_batch: Optional[int] = None,
+        overflow: OverflowPolicy = "coalesce",
+        state_flush_policy: Optional[FlushPolicy] = None,
+        compact_state_operations: bool = True,
+        state_diff: Optional[DiffPolicy] = None,
+        state_schema: Optional[StateSchema] = None,
+    ):
+        if overflow not in ("block", "coalesce", "raise"):
+            raise ValueError(f"Invalid overflow policy: {overflow}")
+
         self._queue = queue
         self._loop = asyncio.get_running_loop()
+        self._writer = _LoopQueueWriter(self._loop, queue)
         self._dispose_callbacks = []
         self._stream_tasks = []
-        self._state_manager = StateManager(self._put_chunk_nowait, state_data)
+        self._cancelled = asyncio.Event()
+        self._metrics: Optional[RunMetrics] = None
+        self._state_manager = StateManager(
+            self._put_chunk_nowait,
+            state_data,
+            state_flush_policy,
+            compact=compact_state_operations,
+            diff_policy=state_diff,
+            schema=state_schema,
+        )
         self._parent_id = parent_id
+        self._overflow = overflow
+        self._coalesce_text = coalesce_text_ms is not None or max_text_batch is not None
+        self._text_coalescer = None
+        if self._coalesce_text or overflow == "coalesce":
+            self._text_coalescer = _TextCoalescer(
+                self._loop,
+                self._put_chunk,
+                window_ms=coalesce_text_ms,
+                max_batch=max_text_batch,
+                hold_queue=queue if overflow == "coalesce" else None,
+                lock=self._state_manager._lock,
+            )
 
     def with_parent_id(self, parent_id: str) -> 'RunController':
-        """Create a new RunController instance with the specified parent_id."""
-        controller = RunController(self._queue, self._state_manager._state_data, parent_id)
-        controller._loop = self._loop
-        controller._dispose_callbacks = self._dispose_callbacks
-        controller._stream_tasks = self._stream_tasks
-        controller._state_manager = self._state_manager
+        """Create a new RunController instance with the specified parent_id.
+
+        The new controller shares the queue, state manager, text coalescer
+        and cancellation state of this one.
+        """
+        controller = copy.copy(self)
+        controller._parent_id = parent_id
         return controller
 
     def append_text(self, text_delta: str) -> None:
         """Append a text delta to the stream."""
+        if self._should_buffer_delta():
+            self._coalesce_delta(TextDeltaChunk, text_delta)
+            return
         chunk = TextDeltaChunk(text_delta=text_delta, parent_id=self._parent_id)
         self._flush_and_put_chunk(chunk)
 
     def append_reasoning(self, reasoning_delta: str) -> None:
         """Append a reasoning delta to the stream."""
+        if self._should_buffer_delta():
+            self._coalesce_delta(ReasoningDeltaChunk, reasoning_delta)
+            return
         chunk = ReasoningDeltaChunk(reasoning_delta=reasoning_delta, parent_id=self._parent_id)
         self._flush_and_put_chunk(chunk)
 
+    @property
+    def metrics(self) -> Optional[RunMetrics]:
+        """Performance telemetry of the run, if collection is enabled.
+
+        Call `controller.metrics.snapshot()` for a live view.
+        """
+        return self._metrics
+
+    @property
+    def cancelled(self) -> asyncio.Event:
+        """Event that is set once the consumer of the run has gone away.
+
+        Await ``controller.cancelled.wait()`` to react to a client disconnect.
+        """
+        return self._cancelled
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Whether the consumer of the run has gone away.
+
+        Long-running loops can check this to stop producing early.
+        """
+        return self._cancelled.is_set()
+
+    def _cancel(self) -> None:
+        """Mark the run cancelled and stop all substream readers."""
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        # Wake producers waiting for buffer space, including blocked threads
+        self._queue.close()
+        if self._text_coalescer is not None:
+            self._text_coalescer.discard()
+        for task in self._stream_tasks:
+            task.cancel()
+
+    async def append_text_async(self, text_delta: str) -> None:
+        """Append a text delta, waiting for buffer space first."""
+        await self.wait_for_capacity()
+        self.append_text(text_delta)
+
+    async def append_reasoning_async(self, reasoning_delta: str) -> None:
+        """Append a reasoning delta, waiting for buffer space first."""
+        await self.wait_for_capacity()
+        self.append_reasoning(reasoning_delta)
+
+    async def wait_for_capacity(self) -> None:
+        """Suspend until the run buffer is below its limits.
+
+        Returns immediately when the run was created without buffer limits.
+        """
+        await self._queue.wait_for_space()
+
+    def _should_buffer_delta(self) -> bool:
+        """Decide whether a delta goes through the text coalescer.
+
+        Applies the overflow policy when the run buffer is full.
+        """
+        if self._coalesce_text:
+            return True
+        if self._text_coalescer is not None and self._text_coalescer.pending:
+            # Keep ordering with deltas already held back
+            return True
+        if not self._queue.is_full():
+            return False
+        if self._overflow == "coalesce":
+            return True
+        self._handle_overflow()
+        return False
+
+    def _handle_overflow(self) -> None:
+        """Apply the block or raise overflow policy for a full buffer."""
+        if self._overflow == "coalesce":
+            # Only deltas can be held back; other chunks go past the soft limit
+            return
+        if self._overflow == "raise":
+            raise asyncio.QueueFull("Run buffer is full")
+        if _on_loop_thread(self._loop):
+            # The loop thread cannot block on itself
+            raise RuntimeError(
+                "Run buffer is full and overflow='block' can only block worker "
+                "threads; await the *_async producer methods on the event loop"
+            )
+        if self.is_cancelled:
+            raise asyncio.CancelledError("Run was cancelled")
+        # Called from a worker thread: wait there until the consumer catches up
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._queue.wait_for_space(), self._loop
+            ).result()
+        except concurrent.futures.CancelledError:
+            raise asyncio.CancelledError("Run was cancelled") from None
+
+    def _coalesce_delta(self, chunk_class, delta: str) -> None:
+        """Buffer a text or reasoning delta in the coalescer.
+
+        Pending state operations were recorded before this delta, so they are
+        flushed (after any buffered text) before the delta is buffered.
+        """
+        with self._state_manager._lock:
+            if self._state_manager._pending_operations:
+                self._text_coalescer.flush()
+                self._state_manager.flush()
+            self._text_coalescer.add(chunk_class, delta, self._parent_id)
+
     async def add_tool_call(
         self, tool_name: str, tool_call_id: str = None
     ) -> ToolCallController:
@@ -72,6 +452,7 @@ class RunController:
 
         async def reader():
             async for chunk in stream:
+                await self._queue.wait_for_space()
                 self._flush_and_put_chunk(chunk)
 
         task = asyncio.create_task(reader())
@@ -79,9 +460,16 @@ class RunController:
 
     def add_data(self, data: Any) -> None:
         """Emit an event to the main stream."""
+        if self._queue.is_full():
+            self._handle_overflow()
         chunk = DataChunk(data=data)
         self._flush_and_put_chunk(chunk)
 
+    async def add_data_async(self, data: Any) -> None:
+        """Emit an event to the main stream, waiting for buffer space first."""
+        await self.wait_for_capacity()
+        self.add_data(data)
+
     def add_error(self, error: str) -> None:
         """Emit an error to the main stream."""
         chunk = ErrorChunk(error=error)
@@ -97,22 +485,43 @@ class RunController:
         )
         self._flush_and_put_chunk(chunk)
 
+    def _put_chunk(self, chunk):
+        """Helper method to put a chunk in the queue without flushing anything.
+
+        On the event loop thread the chunk is enqueued directly. Calls from
+        other threads are marshalled onto the loop with call_soon_threadsafe,
+        and loop-thread chunks queue up behind those still in flight.
+        """
+        self._writer.put(chunk)
+
     def _put_chunk_nowait(self, chunk):
         """Helper method to put a chunk in the queue without waiting.
 
         This is used as a callback for the StateManager.
         """
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, chunk)
+        # Buffered text was appended before these state operations
+        if self._text_coalescer is not None:
+            self._text_coalescer.flush()
+        self._put_chunk(chunk)
+
+    def _flush_pending(self):
+        """Flush buffered text deltas and pending state operations."""
+        with self._state_manager._lock:
+            if self._text_coalescer is not None:
+                self._text_coalescer.flush()
+            self._state_manager.flush()
 
     def _flush_and_put_chunk(self, chunk):
         """Helper method to flush state operations and put a chunk in the queue.
 
-        This ensures state operations are sent before other operations.
+        This ensures buffered text and state operations are sent before other
+        operations.
         """
-        # Flush any pending state operations first
-        self._state_manager.flush()
-        # Add the chunk to the queue
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, chunk)
+        with self._state_manager._lock:
+            # Flush any buffered text and pending state operations first
+            self._flush_pending()
+            # Add the chunk to the queue
+            self._put_chunk(chunk)
 
     @property
     def state(self):
@@ -140,18 +549,102 @@ class RunController:
         Args:
             value: The new state value to set
         """
-        self._state_manager.add_operations(
-            [{"type": "set", "path": [], "value": value}]
-        )
+        self._state_manager.set_value([], value)
+
+    def scope(self, path: List[str]) -> StateView:
+        """Return a state handle rooted at `path`.
+
+        Useful for callbacks that write many updates below one subtree, e.g. a
+        subgraph or tool call: the subtree is resolved once, and operations
+        added through the view only carry the path relative to it.
+
+        Example:
+            artifact = controller.scope(["artifacts", "0"])
+            artifact.state["content"] += token  # Appends at ["artifacts", "0", "content"]
+        """
+        return self._state_manager.view(path)
+
+    def writer(self, path: List[Any]) -> StateWriter:
+        """Return a precompiled writer for `path`.
+
+        Requires a `state_schema`; the path is validated against it once, and
+        the writer's updates skip the generic path handling.
+
+        Example:
+            content = controller.writer(["messages", 0, "content"])
+            content.append_text(token)
+        """
+        return self._state_manager.writer(path)
 
 
 async def create_run(
     callback: Callable[[RunController], Coroutine[Any, Any, None]],
     *,
     state: Any | None = None,
+    coalesce_text_ms: Optional[float] = None,
+    max_text_batch: Optional[int] = None,
+    max_buffered_chunks: Optional[int] = None,
+    max_buffered_bytes: Optional[int] = None,
+    overflow: OverflowPolicy = "coalesce",
+    on_cancel: Optional[Callable[[], Any]] = None,
+    collect_metrics: bool = False,
+    on_metrics: Optional[Callable[[RunMetrics], Any]] = None,
+    state_flush_policy: Optional[FlushPolicy] = None,
+    compact_state_operations: bool = True,
+    state_diff: Optional[DiffPolicy] = None,
+    state_schema: Optional[StateSchema] = None,
 ) -> AsyncGenerator[AssistantStreamChunk, None]:
-    queue = asyncio.Queue()
-    controller = RunController(queue, state_data=state)
+    """Run the callback and stream the chunks it produces.
+
+    Args:
+        callback: Coroutine function that receives the RunController
+        state: Initial state for the run
+        coalesce_text_ms: Enable merging of adjacent text and reasoning deltas
+            with the same parent_id. ``0`` merges deltas within one loop tick,
+            a positive value merges deltas within that many milliseconds.
+        max_text_batch: Maximum number of deltas merged into one chunk. Setting
+            this alone enables per-tick coalescing.
+        max_buffered_chunks: Soft limit on chunks buffered for the consumer.
+        max_buffered_bytes: Soft limit on the approximate size of buffered chunks.
+        overflow: What the synchronous producer APIs do when a limit is hit:
+            ``"coalesce"`` holds text and reasoning deltas back and merges them
+            until there is room, ``"block"`` blocks the calling worker thread
+            until there is room (on the event loop thread, where it cannot
+            block, it raises ``RuntimeError``), and ``"raise"`` raises
+            ``asyncio.QueueFull``.
+            The ``*_async`` producer variants always wait for room instead.
+            Once the consumer has gone away, producers that wait or block
+            for room raise ``asyncio.CancelledError``.
+        on_cancel: Called (and awaited if it returns an awaitable) when the
+            consumer closes the stream before the run has finished. The
+            callback task and all substreams are cancelled at that point.
+        collect_metrics: Collect RunMetrics, available as `controller.metrics`.
+        on_metrics: Called with the final RunMetrics when the run ends.
+            Implies `collect_metrics`.
+        state_flush_policy: When batched state operations are emitted. See
+            FlushPolicy; defaults to one batch per event loop iteration.
+        compact_state_operations: Merge and drop redundant operations within
+            each state batch before it is emitted.
+        state_diff: Send assignments as a diff against the current state. See
+            DiffPolicy; by default assignments are sent as a whole.
+        state_schema: Shape of the state, a StateSchema built from a TypedDict
+            or JSON Schema. Enables `controller.writer(path)`.
+    """
+    queue = _RunQueue(max_chunks=max_buffered_chunks, max_bytes=max_buffered_bytes)
+    controller = RunController(
+        queue,
+        state_data=state,
+        coalesce_text_ms=coalesce_text_ms,
+        max_text_batch=max_text_batch,
+        overflow=overflow,
+        state_flush_policy=state_flush_policy,
+        compact_state_operations=compact_state_operations,
+        state_diff=state_diff,
+        state_schema=state_schema,
+    )
+    metrics = None
+    if collect_metrics or on_metrics is not None:
+        metrics = controller._metrics = RunMetrics()
 
     async def background_task():
         try:
@@ -160,24 +653,54 @@ async def create_run(
             controller.add_error(str(e))
             raise
         finally:
-            # Flush any pending state updates before disposing
-            controller._state_manager.flush()
-
-            for dispose in controller._dispose_callbacks:
-                dispose()
             try:
-                for task in controller._stream_tasks:
-                    await task
+                if not controller.is_cancelled:
+                    # Flush any buffered text and pending state updates before disposing
+                    controller._flush_pending()
+
+                for dispose in controller._dispose_callbacks:
+                    dispose()
+
+                if controller.is_cancelled:
+                    await asyncio.gather(
+                        *controller._stream_tasks, return_exceptions=True
+                    )
+                else:
+                    for task in controller._stream_tasks:
+                        await task
             finally:
-                asyncio.get_running_loop().call_soon_threadsafe(queue.put_nowait, None)
+                try:
+                    if controller.is_cancelled and on_cancel is not None:
+                        result = on_cancel()
+                        if inspect.isawaitable(result):
+                            await result
+                finally:
+                    # Behind any chunks worker threads have already scheduled
+                    controller._writer.put(None)
 
     task = asyncio.create_task(background_task())
 
-    while True:
-        chunk = await controller._queue.get()
-        if chunk is None:
-            break
-        yield chunk
-        controller._queue.task_done()
+    finished = False
+    try:
+        while True:
+            chunk = await controller._queue.get()
+            if chunk is None:
+                break
+            if metrics is not None:
+                # Depth at the time of the get, including this chunk
+                metrics.record_queue_depth(queue.qsize() + 1)
+                metrics.record_chunk(chunk)
+            yield chunk
+            controller._queue.task_done()
+        finished = True
+    finally:
+        if not finished:
+            # The consumer went away (generator closed or cancelled)
+            controller._cancel()
+            task.cancel()
+        if metrics is not None:
+            metrics.finish(cancelled=not finished)
+            if on_metrics is not None:
+                on_metrics(metrics)
 
     await task
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 from typing import Any, AsyncGenerator
 from assistant_stream.assistant_stream_chunk import (
     AssistantStreamChunk,
@@ -17,12 +18,57 @@ def generate_openai_style_tool_call_id():
     return prefix + random_id
 
 
+def _on_loop_thread(loop: asyncio.AbstractEventLoop) -> bool:
+    """Whether the caller runs on the thread that runs `loop`."""
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+class _LoopQueueWriter:
+    """Puts items on an asyncio queue from the loop thread or other threads.
+
+    On the loop thread items are put directly. Calls from other threads go
+    through call_soon_threadsafe; while any of those are still scheduled,
+    loop-thread puts are scheduled behind them, so items that were put first
+    are never overtaken. Queues with `reserve` and `release` methods are
+    told about scheduled items, so they can count them against their limits.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self._loop = loop
+        self._queue = queue
+        self._lock = threading.Lock()
+        self._scheduled = 0
+        self._reserve = getattr(queue, "reserve", None)
+        self._release = getattr(queue, "release", None)
+
+    def put(self, item) -> None:
+        if not self._scheduled and _on_loop_thread(self._loop):
+            self._queue.put_nowait(item)
+            return
+        with self._lock:
+            self._scheduled += 1
+            if self._reserve is not None:
+                self._reserve(item)
+        self._loop.call_soon_threadsafe(self._put_scheduled, item)
+
+    def _put_scheduled(self, item) -> None:
+        with self._lock:
+            self._scheduled -= 1
+            if self._release is not None:
+                self._release(item)
+        self._queue.put_nowait(item)
+
+
 class ToolCallController:
     def __init__(self, queue, tool_name: str, tool_call_id: str, parent_id: str = None):
         self.tool_name = tool_name
         self.tool_call_id = tool_call_id
         self.queue = queue
         self.loop = asyncio.get_running_loop()
+        self._writer = _LoopQueueWriter(self.loop, queue)
 
         begin_chunk = ToolCallBeginChunk(
             tool_call_id=self.tool_call_id,
@@ -37,7 +83,7 @@ class ToolCallController:
             tool_call_id=self.tool_call_id,
             args_text_delta=args_text_delta,
         )
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+        self._put_nowait(chunk)
 
     def set_result(self, result: Any) -> None:
         """
@@ -65,12 +111,16 @@ class ToolCallController:
             artifact=artifact,
             is_error=is_error,
         )
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+        self._put_nowait(chunk)
         self.close()
 
     def close(self) -> None:
         """Close the stream."""
-        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+        self._put_nowait(None)
+
+    def _put_nowait(self, chunk) -> None:
+        """Put a chunk in the queue, directly when on the event loop thread."""
+        self._writer.put(chunk)
 
 
 async def create_tool_call(
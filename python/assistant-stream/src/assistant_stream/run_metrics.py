@@ -0,0 +1,155 @@
+import bisect
+import time
+from typing import Any, Dict, List, Optional
+
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    UpdateStateChunk,
+    estimate_chunk_size,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram for latency and size distributions.
+
+    Percentiles are estimated by linear interpolation inside the bucket that
+    contains the requested rank, clamped to the observed min and max.
+    """
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estimate the p-th percentile (0-100), or None when empty."""
+        if not self.count:
+            return None
+
+        rank = p / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else self.min
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                fraction = (rank - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([*self.bounds, float("inf")], self.counts)),
+        }
+
+
+# Milliseconds
+_GAP_BOUNDS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+# Operations per update-state chunk
+_BATCH_BOUNDS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+class RunMetrics:
+    """Performance telemetry for a single run.
+
+    Collected by create_run when `collect_metrics=True` or `on_metrics` is
+    given. Read a live view with `controller.metrics.snapshot()`; the final
+    metrics are passed to `on_metrics` when the run ends.
+
+    Byte counts are the approximate payload sizes used for buffer accounting,
+    not the exact encoded sizes.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.first_chunk_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        self.chunk_counts: Dict[str, int] = {}
+        self.byte_counts: Dict[str, int] = {}
+        self.gap_ms = Histogram(_GAP_BOUNDS)
+        self.queue_high_water = 0
+        self.state_operations = 0
+        self.state_batch_sizes = Histogram(_BATCH_BOUNDS)
+        self.cancelled = False
+        self._last_chunk_time: Optional[float] = None
+
+    def record_chunk(self, chunk: AssistantStreamChunk) -> None:
+        """Record a chunk handed to the consumer."""
+        now = time.perf_counter()
+        if self.first_chunk_time is None:
+            self.first_chunk_time = now
+        else:
+            self.gap_ms.record((now - self._last_chunk_time) * 1000)
+        self._last_chunk_time = now
+
+        chunk_type = chunk.type
+        self.chunk_counts[chunk_type] = self.chunk_counts.get(chunk_type, 0) + 1
+        self.byte_counts[chunk_type] = self.byte_counts.get(
+            chunk_type, 0
+        ) + estimate_chunk_size(chunk)
+
+        if isinstance(chunk, UpdateStateChunk):
+            batch_size = len(chunk.operations)
+            self.state_operations += batch_size
+            self.state_batch_sizes.record(batch_size)
+
+    def record_queue_depth(self, depth: int) -> None:
+        if depth > self.queue_high_water:
+            self.queue_high_water = depth
+
+    def finish(self, cancelled: bool = False) -> None:
+        """Mark the end of the run."""
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+            self.cancelled = cancelled
+
+    @property
+    def time_to_first_chunk_ms(self) -> Optional[float]:
+        if self.first_chunk_time is None:
+            return None
+        return (self.first_chunk_time - self.start_time) * 1000
+
+    @property
+    def duration_ms(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return (end_time - self.start_time) * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the metrics collected so far as a plain dictionary."""
+        return {
+            "time_to_first_chunk_ms": self.time_to_first_chunk_ms,
+            "duration_ms": self.duration_ms,
+            "finished": self.end_time is not None,
+            "cancelled": self.cancelled,
+            "chunk_counts": dict(self.chunk_counts),
+            "byte_counts": dict(self.byte_counts),
+            "total_chunks": sum(self.chunk_counts.values()),
+            "total_bytes": sum(self.byte_counts.values()),
+            "inter_chunk_gap_ms": self.gap_ms.to_dict(),
+            "queue_high_water": self.queue_high_water,
+            "state_operations": self.state_operations,
+            "state_batch_sizes": self.state_batch_sizes.to_dict(),
+        }
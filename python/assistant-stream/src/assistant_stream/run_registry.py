@@ -0,0 +1,250 @@
+import asyncio
+from collections import deque
+from typing import AsyncGenerator, Dict, List, Optional, Union
+
+from assistant_stream.assistant_stream_chunk import (
+    AssistantStreamChunk,
+    estimate_chunk_size,
+)
+
+
+class RunLogExpiredError(KeyError):
+    """Raised when a requested offset is no longer retained in the run log."""
+
+
+class RunLog:
+    """Bounded log of the chunks of one run, numbered with sequence ids.
+
+    Sequence ids start at 0 and increase by one per chunk. The oldest chunks
+    are dropped once the log exceeds its chunk or byte limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_chunks: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self._max_chunks = max_chunks
+        self._max_bytes = max_bytes
+        self._entries = deque()
+        self._bytes = 0
+        self._first_sequence = 0
+        self._next_sequence = 0
+        self._waiters: List[asyncio.Future] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def first_sequence(self) -> int:
+        """Sequence id of the oldest retained chunk."""
+        return self._first_sequence
+
+    @property
+    def next_sequence(self) -> int:
+        """Sequence id the next chunk will receive."""
+        return self._next_sequence
+
+    @property
+    def done(self) -> bool:
+        """Whether the run has finished producing chunks."""
+        return self._done
+
+    def append(self, chunk: AssistantStreamChunk) -> int:
+        """Append a chunk and return its sequence id."""
+        size = estimate_chunk_size(chunk)
+        self._entries.append((chunk, size))
+        self._bytes += size
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._trim()
+        self._notify()
+        return sequence
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Mark the run as finished, optionally with the error it raised."""
+        self._done = True
+        self._error = error
+        self._notify()
+
+    def _trim(self) -> None:
+        """Drop the oldest chunks until the log is within its limits."""
+        while self._entries and (
+            (self._max_chunks is not None and len(self._entries) > self._max_chunks)
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            _, size = self._entries.popleft()
+            self._bytes -= size
+            self._first_sequence += 1
+
+    def _notify(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def read(self, start: int = 0) -> AsyncGenerator[AssistantStreamChunk, None]:
+        """Replay chunks from sequence id `start`, then follow the live run.
+
+        Raises:
+            RunLogExpiredError: If chunks at or after `start` were dropped
+        """
+        sequence = start
+        while True:
+            if sequence < self._first_sequence:
+                raise RunLogExpiredError(sequence)
+
+            if sequence < self._next_sequence:
+                chunk, _ = self._entries[sequence - self._first_sequence]
+                sequence += 1
+                yield chunk
+                continue
+
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+
+
+class RunSubscription:
+    """Async iterator over a run's chunks starting at a sequence id.
+
+    `first_sequence` is the id of the first chunk it yields; pass it to
+    `AssistantTransportResponse(..., first_event_id=...)` so the SSE `id:`
+    fields line up with the log.
+    """
+
+    def __init__(self, log: RunLog, first_sequence: int):
+        self.first_sequence = first_sequence
+        self._iterator = log.read(first_sequence)
+
+    def __aiter__(self) -> "RunSubscription":
+        return self
+
+    async def __anext__(self) -> AssistantStreamChunk:
+        return await self._iterator.__anext__()
+
+    async def aclose(self) -> None:
+        await self._iterator.aclose()
+
+
+class RunRegistry:
+    """Keeps the chunk logs of running and recently finished runs.
+
+    A run is driven by a background task, independently of any client, so a
+    client that loses its connection can reconnect with the SSE
+    `Last-Event-ID` header and replay from that offset while the run keeps
+    producing.
+
+    Example:
+        registry = RunRegistry()
+
+        @app.post("/runs/{run_id}")
+        async def start(run_id: str):
+            registry.start(run_id, create_run(callback))
+            subscription = registry.subscribe(run_id)
+            return AssistantTransportResponse(
+                subscription, first_event_id=subscription.first_sequence
+            )
+
+        @app.get("/runs/{run_id}")
+        async def resume(run_id: str, request: Request):
+            subscription = registry.subscribe(
+                run_id, last_event_id=request.headers.get("last-event-id")
+            )
+            return AssistantTransportResponse(
+                subscription, first_event_id=subscription.first_sequence
+            )
+    """
+
+    def __init__(
+        self,
+        *,
+        max_chunks: Optional[int] = 10_000,
+        max_bytes: Optional[int] = 8 * 1024 * 1024,
+        ttl_seconds: float = 300,
+    ):
+        """Initialize the registry.
+
+        Args:
+            max_chunks: Maximum number of chunks retained per run
+            max_bytes: Maximum approximate size of the chunks retained per run
+            ttl_seconds: How long a finished run is kept for reconnects
+        """
+        self._max_chunks = max_chunks
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._logs: Dict[str, RunLog] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(
+        self, run_id: str, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> RunLog:
+        """Start consuming `stream` into a new log registered as `run_id`."""
+        if run_id in self._logs:
+            raise ValueError(f"Run already registered: {run_id}")
+
+        log = RunLog(max_chunks=self._max_chunks, max_bytes=self._max_bytes)
+        self._logs[run_id] = log
+        self._tasks[run_id] = asyncio.create_task(self._pump(run_id, log, stream))
+        return log
+
+    async def _pump(
+        self,
+        run_id: str,
+        log: RunLog,
+        stream: AsyncGenerator[AssistantStreamChunk, None],
+    ) -> None:
+        error = None
+        try:
+            async for chunk in stream:
+                log.append(chunk)
+        except Exception as e:
+            error = e
+        finally:
+            log.finish(error)
+            self._tasks.pop(run_id, None)
+            asyncio.get_running_loop().call_later(
+                self._ttl_seconds, self._expire, run_id, log
+            )
+
+    def _expire(self, run_id: str, log: RunLog) -> None:
+        if self._logs.get(run_id) is log:
+            del self._logs[run_id]
+
+    def get(self, run_id: str) -> Optional[RunLog]:
+        """Return the log of a run, or None if it is unknown or expired."""
+        return self._logs.get(run_id)
+
+    def subscribe(
+        self,
+        run_id: str,
+        last_event_id: Union[int, str, None] = None,
+    ) -> RunSubscription:
+        """Subscribe to a run, replaying everything after `last_event_id`.
+
+        Raises:
+            KeyError: If the run is unknown or expired
+            RunLogExpiredError: If the offset is no longer retained
+            ValueError: If `last_event_id` is ahead of the run
+        """
+        log = self._logs.get(run_id)
+        if log is None:
+            raise KeyError(run_id)
+
+        first_sequence = 0 if last_event_id in (None, "") else int(last_event_id) + 1
+        if first_sequence < log.first_sequence:
+            raise RunLogExpiredError(first_sequence)
+        if first_sequence > log.next_sequence:
+            raise ValueError(f"Unknown event id: {last_event_id}")
+        return RunSubscription(log, first_sequence)
+
+    def cancel(self, run_id: str) -> None:
+        """Stop a running run; its log is kept until the TTL expires."""
+        task = self._tasks.get(run_id)
+        if task is not None:
+            task.cancel()
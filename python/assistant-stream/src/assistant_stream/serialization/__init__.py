@@ -10,6 +10,20 @@ from assistant_stream.serialization.assistant_transport import (
     AssistantTransportEncoder,
     AssistantTransportResponse,
 )
+from assistant_stream.serialization.binary_stream import (
+    BinaryStreamDecoder,
+    BinaryStreamEncoder,
+    BinaryStreamResponse,
+)
+from assistant_stream.serialization.json_backend import (
+    JSONBackend,
+    get_json_backend,
+)
+from assistant_stream.serialization.write_coalescing import WriteCoalescing
+from assistant_stream.serialization.stream_compression import (
+    CompressionMetrics,
+    StreamCompression,
+)
 
 __all__ = [
     "DataStreamEncoder",
@@ -18,4 +32,12 @@ __all__ = [
     "OpenAIStreamResponse",
     "AssistantTransportEncoder",
     "AssistantTransportResponse",
+    "BinaryStreamEncoder",
+    "BinaryStreamDecoder",
+    "BinaryStreamResponse",
+    "JSONBackend",
+    "get_json_backend",
+    "WriteCoalescing",
+    "StreamCompression",
+    "CompressionMetrics",
 ]
@@ -1,8 +1,19 @@
 from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
 from assistant_stream.serialization.stream_encoder import StreamEncoder
-from typing import AsyncGenerator
+from assistant_stream.serialization.stream_compression import (
+    CompressionMetrics,
+    StreamCompression,
+    compress_writes,
+)
+from assistant_stream.serialization.write_coalescing import (
+    WriteCoalescing,
+    coalesce_frames,
+)
+from typing import AsyncGenerator, Optional
 
+from starlette.datastructures import Headers
 from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 
 class AssistantStreamResponse(StreamingResponse):
@@ -10,8 +21,42 @@ class AssistantStreamResponse(StreamingResponse):
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
         stream_encoder: StreamEncoder,
+        *,
+        write_coalescing: Optional[WriteCoalescing] = None,
+        compression: Optional[StreamCompression] = None,
     ):
+        """Stream the encoded chunks.
+
+        With `write_coalescing`, encoded frames are gathered into larger
+        writes; by default every frame is written on its own. With
+        `compression`, the body is compressed with an encoding negotiated
+        from the request's Accept-Encoding header.
+        """
+        if write_coalescing is None:
+            content = stream_encoder.encode_stream(stream)
+        else:
+            content = coalesce_frames(stream, stream_encoder, write_coalescing)
         super().__init__(
-            stream_encoder.encode_stream(stream),
+            content,
             media_type=stream_encoder.get_media_type(),
         )
+        self.compression = compression
+        self.compression_metrics: Optional[CompressionMetrics] = None
+        if compression is not None:
+            self.headers.add_vary_header("Accept-Encoding")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.compression is not None and scope["type"] == "http":
+            encoding = self.compression.negotiate(
+                Headers(scope=scope).get("accept-encoding", "")
+            )
+            if encoding is not None:
+                self.compression_metrics = CompressionMetrics(encoding)
+                self.headers["Content-Encoding"] = encoding
+                self.body_iterator = compress_writes(
+                    self.body_iterator,
+                    self.compression.compressor(encoding),
+                    self.compression_metrics,
+                    self.compression.on_metrics,
+                )
+        await super().__call__(scope, receive, send)
@@ -2,14 +2,23 @@ from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.json_backend import JSONBackend, get_json_backend
 from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.stream_compression import StreamCompression
+from assistant_stream.serialization.write_coalescing import WriteCoalescing
 from assistant_stream.state_proxy import StateProxy
-from typing import AsyncGenerator, Any
+from typing import AsyncGenerator, Any, Callable, Dict, Optional, Tuple
+import dataclasses
 import json
+import operator
 
 
 class StateProxyJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that can handle StateProxy objects."""
+    """Custom JSON encoder that can handle StateProxy objects.
+
+    The encoders use a JSONBackend, which handles StateProxy natively; this
+    class remains for code that serializes with the json module directly.
+    """
 
     def default(self, obj: Any) -> Any:
         if isinstance(obj, StateProxy):
@@ -17,12 +26,32 @@ class StateProxyJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+# camelCase keys of a chunk class's fields, and a getter for their values
+_FieldMap = Tuple[Tuple[str, ...], Callable[[Any], Tuple[Any, ...]]]
+_FIELD_MAPS: Dict[type, _FieldMap] = {}
+
+
 class AssistantTransportEncoder(StreamEncoder):
     """
     AssistantTransportEncoder encodes AssistantStreamChunks into SSE format
     and emits [DONE] when the stream completes.
+
+    When `first_event_id` is set, every event carries an SSE `id:` field,
+    starting at that value and increasing by one per chunk, so clients can
+    resume with the `Last-Event-ID` header.
+
+    Events are serialized with `json_backend`, by default the fastest JSON
+    library installed (see get_json_backend).
     """
 
+    def __init__(
+        self,
+        first_event_id: Optional[int] = None,
+        json_backend: Optional[JSONBackend] = None,
+    ):
+        self._first_event_id = first_event_id
+        self._dumps = (json_backend or get_json_backend()).dumps
+
     def get_media_type(self) -> str:
         return "text/event-stream"
 
@@ -30,6 +59,14 @@ class AssistantTransportEncoder(StreamEncoder):
         """Convert a chunk to a JSON-serializable dictionary."""
         chunk_dict = {"type": chunk.type}
 
+        field_map = _FIELD_MAPS.get(type(chunk))
+        if field_map is None:
+            field_map = self._compile_field_map(type(chunk))
+        if field_map is not None:
+            keys, get_values = field_map
+            chunk_dict.update(zip(keys, get_values(chunk)))
+            return chunk_dict
+
         # Add all attributes from the chunk
         for key, value in vars(chunk).items():
             if key != "type":  # Already added
@@ -37,6 +74,25 @@ class AssistantTransportEncoder(StreamEncoder):
 
         return chunk_dict
 
+    def _compile_field_map(self, chunk_class: type) -> Optional[_FieldMap]:
+        """Precompute the camelCase keys and a getter for a dataclass chunk.
+
+        Other chunk objects are converted through vars() on every call.
+        """
+        if not dataclasses.is_dataclass(chunk_class):
+            return None
+        names = [
+            field.name for field in dataclasses.fields(chunk_class) if field.name != "type"
+        ]
+        keys = tuple(self._snake_to_camel(name) for name in names)
+        if len(names) == 1:
+            name = names[0]
+            field_map = (keys, lambda chunk: (getattr(chunk, name),))
+        else:
+            field_map = (keys, operator.attrgetter(*names))
+        _FIELD_MAPS[chunk_class] = field_map
+        return field_map
+
     def _snake_to_camel(self, snake_str: str) -> str:
         """Convert snake_case to camelCase."""
         components = snake_str.split("_")
@@ -44,19 +100,34 @@ class AssistantTransportEncoder(StreamEncoder):
 
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
+        dumps = self._dumps
+        event_id = self._first_event_id
         async for chunk in stream:
             chunk_dict = self._chunk_to_dict(chunk)
-            chunk_json = json.dumps(chunk_dict, cls=StateProxyJSONEncoder)
-            yield f"data: {chunk_json}\n\n"
+            chunk_json = dumps(chunk_dict)
+            if event_id is None:
+                yield b"data: " + chunk_json + b"\n\n"
+            else:
+                yield b"id: %d\ndata: %s\n\n" % (event_id, chunk_json)
+                event_id += 1
 
         # Emit [DONE] marker when stream completes
-        yield "data: [DONE]\n\n"
+        yield b"data: [DONE]\n\n"
 
 
 class AssistantTransportResponse(AssistantStreamResponse):
     def __init__(
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
+        *,
+        first_event_id: Optional[int] = None,
+        write_coalescing: Optional[WriteCoalescing] = None,
+        compression: Optional[StreamCompression] = None,
     ):
-        super().__init__(stream, AssistantTransportEncoder())
+        super().__init__(
+            stream,
+            AssistantTransportEncoder(first_event_id),
+            write_coalescing=write_coalescing,
+            compression=compression,
+        )
@@ -0,0 +1,169 @@
+import dataclasses
+import operator
+import struct
+import typing
+from typing import Any, AsyncGenerator, AsyncIterable, Callable, Dict, List, Optional, Tuple
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.serialization.assistant_stream_response import (
+    AssistantStreamResponse,
+)
+from assistant_stream.serialization.json_backend import _default
+from assistant_stream.serialization.stream_compression import StreamCompression
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.write_coalescing import WriteCoalescing
+
+# Frames are a 4-byte big-endian payload length followed by the payload
+_LENGTH = struct.Struct(">I")
+
+# Chunk classes by their type, with the names of their fields in frame order
+_CHUNK_CLASSES: Dict[str, Tuple[type, Tuple[str, ...]]] = {}
+# Getter for the frame values of a chunk, by chunk class
+_GETTERS: Dict[type, Callable[[Any], Tuple[Any, ...]]] = {}
+
+for _chunk_class in typing.get_args(AssistantStreamChunk):
+    _names = tuple(
+        field.name for field in dataclasses.fields(_chunk_class) if field.name != "type"
+    )
+    _CHUNK_CLASSES[_chunk_class.type] = (_chunk_class, _names)
+    _GETTERS[_chunk_class] = operator.attrgetter("type", *_names)
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            "The binary stream format requires msgpack; "
+            "install assistant-stream[msgpack]"
+        ) from e
+    return msgpack
+
+
+class BinaryStreamEncoder(StreamEncoder):
+    """
+    BinaryStreamEncoder encodes AssistantStreamChunks as length-prefixed
+    MessagePack frames, for consumers that read the stream from code rather
+    than from a browser.
+
+    Each frame is a 4-byte big-endian payload length followed by a
+    MessagePack array: the chunk type, then the chunk's dataclass fields in
+    declaration order. Read it back with BinaryStreamDecoder.
+    """
+
+    def __init__(self):
+        msgpack = _import_msgpack()
+        self._pack = msgpack.Packer(default=_default, use_bin_type=True).pack
+
+    def get_media_type(self) -> str:
+        return "application/vnd.assistant-stream+msgpack"
+
+    def encode_chunk(self, chunk: AssistantStreamChunk) -> Optional[bytes]:
+        getter = _GETTERS.get(type(chunk))
+        if getter is None:
+            # Chunk objects of other classes are encoded by their type
+            entry = _CHUNK_CLASSES.get(getattr(chunk, "type", None))
+            if entry is None:
+                return None
+            getter = _GETTERS[entry[0]]
+        payload = self._pack(getter(chunk))
+        return _LENGTH.pack(len(payload)) + payload
+
+    async def encode_stream(
+        self, stream: AsyncGenerator[AssistantStreamChunk, None]
+    ) -> AsyncGenerator[bytes, None]:
+        async for chunk in stream:
+            encoded = self.encode_chunk(chunk)
+            if encoded is None:
+                continue
+            yield encoded
+
+
+class BinaryStreamDecoder:
+    """Incremental decoder for the output of BinaryStreamEncoder.
+
+    Feed it the response body in pieces of any size; it returns the chunks
+    of every frame completed so far.
+
+    Example:
+        decoder = BinaryStreamDecoder()
+        async for data in response.aiter_bytes():
+            for chunk in decoder.feed(data):
+                ...
+        decoder.close()
+    """
+
+    def __init__(self, max_frame_size: int = 64 * 1024 * 1024):
+        msgpack = _import_msgpack()
+        self._unpackb = msgpack.unpackb
+        self._max_frame_size = max_frame_size
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[AssistantStreamChunk]:
+        """Add `data` and return the chunks of the frames it completes.
+
+        Raises:
+            ValueError: If a frame is larger than `max_frame_size` or is not
+                a valid chunk
+        """
+        buffer = self._buffer
+        buffer += data
+        chunks = []
+        offset = 0
+        while len(buffer) - offset >= _LENGTH.size:
+            (size,) = _LENGTH.unpack_from(buffer, offset)
+            if size > self._max_frame_size:
+                raise ValueError(f"Frame of {size} bytes exceeds max_frame_size")
+            end = offset + _LENGTH.size + size
+            if end > len(buffer):
+                break
+            chunks.append(self._decode_payload(bytes(buffer[offset + _LENGTH.size : end])))
+            offset = end
+        del buffer[:offset]
+        return chunks
+
+    def close(self) -> None:
+        """Check that the stream ended on a frame boundary.
+
+        Raises:
+            ValueError: If a partial frame is left over
+        """
+        if self._buffer:
+            raise ValueError(f"Stream ended inside a frame ({len(self._buffer)} bytes left)")
+
+    async def decode_stream(
+        self, stream: AsyncIterable[bytes]
+    ) -> AsyncGenerator[AssistantStreamChunk, None]:
+        """Decode a stream of body pieces into chunks."""
+        async for data in stream:
+            for chunk in self.feed(data):
+                yield chunk
+        self.close()
+
+    def _decode_payload(self, payload: bytes) -> AssistantStreamChunk:
+        values = self._unpackb(payload, raw=False, strict_map_key=False)
+        if not isinstance(values, list) or not values:
+            raise ValueError("Invalid frame: expected a non-empty array")
+        entry = _CHUNK_CLASSES.get(values[0])
+        if entry is None:
+            raise ValueError(f"Invalid frame: unknown chunk type {values[0]!r}")
+        chunk_class, names = entry
+        if len(values) != len(names) + 1:
+            raise ValueError(f"Invalid frame: wrong number of fields for {values[0]}")
+        return chunk_class(**dict(zip(names, values[1:])))
+
+
+class BinaryStreamResponse(AssistantStreamResponse):
+    def __init__(
+        self,
+        stream: AsyncGenerator[AssistantStreamChunk, None],
+        *,
+        write_coalescing: Optional[WriteCoalescing] = None,
+        compression: Optional[StreamCompression] = None,
+    ):
+        super().__init__(
+            stream,
+            BinaryStreamEncoder(),
+            write_coalescing=write_coalescing,
+            compression=compression,
+        )
@@ -1,17 +1,33 @@
 from assistant_stream.assistant_stream_chunk import (
     AssistantStreamChunk,
+    DataChunk,
+    ErrorChunk,
+    ReasoningDeltaChunk,
+    SourceChunk,
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
 )
 import json
-from typing import AsyncGenerator, Any
+from typing import AsyncGenerator, Any, Callable, Dict, Optional
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.json_backend import JSONBackend, get_json_backend
 from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.stream_compression import StreamCompression
+from assistant_stream.serialization.write_coalescing import WriteCoalescing
 from assistant_stream.state_proxy import StateProxy
 
 
 class StateProxyJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that can handle StateProxy objects."""
+    """Custom JSON encoder that can handle StateProxy objects.
+
+    The encoders use a JSONBackend, which handles StateProxy natively; this
+    class remains for code that serializes with the json module directly.
+    """
     def default(self, obj: Any) -> Any:
         if isinstance(obj, StateProxy):
             return obj._get_value()
@@ -19,58 +35,92 @@ class StateProxyJSONEncoder(json.JSONEncoder):
 
 
 class DataStreamEncoder(StreamEncoder):
-    def __init__(self):
-        pass
-
-    def encode_chunk(self, chunk: AssistantStreamChunk) -> str:
-        if chunk.type == "text-delta":
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                return f"aui-text-delta:{json.dumps({'textDelta': chunk.text_delta, 'parentId': chunk.parent_id}, cls=StateProxyJSONEncoder)}\n"
-            else:
-                return f"0:{json.dumps(chunk.text_delta, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "reasoning-delta":
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                return f"aui-reasoning-delta:{json.dumps({'reasoningDelta': chunk.reasoning_delta, 'parentId': chunk.parent_id}, cls=StateProxyJSONEncoder)}\n"
-            else:
-                return f"g:{json.dumps(chunk.reasoning_delta, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "tool-call-begin":
-            data = {"toolCallId": chunk.tool_call_id, "toolName": chunk.tool_name}
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                data["parentId"] = chunk.parent_id
-            return f'b:{json.dumps(data, cls=StateProxyJSONEncoder)}\n'
-        elif chunk.type == "tool-call-delta":
-            return f'c:{json.dumps({ "toolCallId": chunk.tool_call_id, "argsTextDelta": chunk.args_text_delta }, cls=StateProxyJSONEncoder)}\n'
-        elif chunk.type == "tool-result":
-            res = {"toolCallId": chunk.tool_call_id, "result": chunk.result}
-            if chunk.artifact is not None:
-                res["artifact"] = chunk.artifact
-            if chunk.is_error:
-                res["isError"] = chunk.is_error
-            return f"a:{json.dumps(res, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "data":
-            return f"2:{json.dumps([chunk.data], cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "error":
-            return f"3:{json.dumps(chunk.error, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "source":
-            source_data = {
-                "sourceType": chunk.source_type,
-                "id": chunk.id,
-                "url": chunk.url
-            }
-            if chunk.title is not None:
-                source_data["title"] = chunk.title
-            if hasattr(chunk, 'parent_id') and chunk.parent_id:
-                source_data["parentId"] = chunk.parent_id
-            return f"h:{json.dumps(source_data, cls=StateProxyJSONEncoder)}\n"
-        elif chunk.type == "update-state":
-            return f"aui-state:{json.dumps(chunk.operations, cls=StateProxyJSONEncoder)}\n"
+    def __init__(self, json_backend: Optional[JSONBackend] = None):
+        """Encode chunks with `json_backend`, by default the fastest installed."""
+        self._dumps = (json_backend or get_json_backend()).dumps
+        # Frame encoders by chunk class, and by chunk type for chunk objects
+        # of other classes
+        self._encoders: Dict[type, Callable[[Any], bytes]] = {
+            TextDeltaChunk: self._encode_text_delta,
+            ReasoningDeltaChunk: self._encode_reasoning_delta,
+            ToolCallBeginChunk: self._encode_tool_call_begin,
+            ToolCallDeltaChunk: self._encode_tool_call_delta,
+            ToolResultChunk: self._encode_tool_result,
+            DataChunk: self._encode_data,
+            ErrorChunk: self._encode_error,
+            SourceChunk: self._encode_source,
+            UpdateStateChunk: self._encode_update_state,
+        }
+        self._encoders_by_type = {
+            chunk_class.type: encode for chunk_class, encode in self._encoders.items()
+        }
+
+    def encode_chunk(self, chunk: AssistantStreamChunk) -> Optional[bytes]:
+        encode = self._encoders.get(type(chunk))
+        if encode is None:
+            encode = self._encoders_by_type.get(getattr(chunk, "type", None))
+            if encode is None:
+                return None
+        return encode(chunk)
+
+    def _encode_text_delta(self, chunk: TextDeltaChunk) -> bytes:
+        parent_id = getattr(chunk, "parent_id", None)
+        if parent_id:
+            return b"aui-text-delta:" + self._dumps({"textDelta": chunk.text_delta, "parentId": parent_id}) + b"\n"
+        return b"0:" + self._dumps(chunk.text_delta) + b"\n"
+
+    def _encode_reasoning_delta(self, chunk: ReasoningDeltaChunk) -> bytes:
+        parent_id = getattr(chunk, "parent_id", None)
+        if parent_id:
+            return b"aui-reasoning-delta:" + self._dumps({"reasoningDelta": chunk.reasoning_delta, "parentId": parent_id}) + b"\n"
+        return b"g:" + self._dumps(chunk.reasoning_delta) + b"\n"
+
+    def _encode_tool_call_begin(self, chunk: ToolCallBeginChunk) -> bytes:
+        data = {"toolCallId": chunk.tool_call_id, "toolName": chunk.tool_name}
+        parent_id = getattr(chunk, "parent_id", None)
+        if parent_id:
+            data["parentId"] = parent_id
+        return b"b:" + self._dumps(data) + b"\n"
+
+    def _encode_tool_call_delta(self, chunk: ToolCallDeltaChunk) -> bytes:
+        return b"c:" + self._dumps({"toolCallId": chunk.tool_call_id, "argsTextDelta": chunk.args_text_delta}) + b"\n"
+
+    def _encode_tool_result(self, chunk: ToolResultChunk) -> bytes:
+        res = {"toolCallId": chunk.tool_call_id, "result": chunk.result}
+        if chunk.artifact is not None:
+            res["artifact"] = chunk.artifact
+        if chunk.is_error:
+            res["isError"] = chunk.is_error
+        return b"a:" + self._dumps(res) + b"\n"
+
+    def _encode_data(self, chunk: DataChunk) -> bytes:
+        return b"2:" + self._dumps([chunk.data]) + b"\n"
+
+    def _encode_error(self, chunk: ErrorChunk) -> bytes:
+        return b"3:" + self._dumps(chunk.error) + b"\n"
+
+    def _encode_source(self, chunk: SourceChunk) -> bytes:
+        source_data = {
+            "sourceType": chunk.source_type,
+            "id": chunk.id,
+            "url": chunk.url
+        }
+        if chunk.title is not None:
+            source_data["title"] = chunk.title
+        parent_id = getattr(chunk, "parent_id", None)
+        if parent_id:
+            source_data["parentId"] = parent_id
+        return b"h:" + self._dumps(source_data) + b"\n"
+
+    def _encode_update_state(self, chunk: UpdateStateChunk) -> bytes:
+        return b"aui-state:" + self._dumps(chunk.operations) + b"\n"
 
     def get_media_type(self) -> str:
         return "text/plain"
 
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         async for chunk in stream:
             encoded = self.encode_chunk(chunk)
             if encoded is None:
@@ -82,5 +132,13 @@ class DataStreamResponse(AssistantStreamResponse):
     def __init__(
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
+        *,
+        write_coalescing: Optional[WriteCoalescing] = None,
+        compression: Optional[StreamCompression] = None,
     ):
-        super().__init__(stream, DataStreamEncoder())
+        super().__init__(
+            stream,
+            DataStreamEncoder(),
+            write_coalescing=write_coalescing,
+            compression=compression,
+        )
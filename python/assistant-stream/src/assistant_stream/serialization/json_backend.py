@@ -0,0 +1,102 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from assistant_stream.state_proxy import StateProxy
+
+
+def _default(obj: Any) -> Any:
+    """Serialize StateProxy objects as the value they point to."""
+    if isinstance(obj, StateProxy):
+        return obj._get_value()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONBackend:
+    """Serializes values to compact UTF-8 JSON bytes.
+
+    All backends produce the same output for JSON values: no whitespace
+    between tokens, non-ASCII characters unescaped, and StateProxy objects
+    replaced by their values. Integers outside the 64-bit range, which
+    orjson can't encode, are encoded by the standard library instead.
+    Non-finite floats are not JSON values and differ: orjson and msgspec
+    write null, the standard library writes NaN and Infinity.
+
+    Attributes:
+        name: Name of the library doing the encoding
+        dumps: Function that encodes a value to bytes
+    """
+
+    __slots__ = ("name", "dumps")
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes]):
+        self.name = name
+        self.dumps = dumps
+
+    def __repr__(self) -> str:
+        return f"JSONBackend({self.name!r})"
+
+
+def _orjson_backend() -> JSONBackend:
+    import orjson
+
+    option = orjson.OPT_NON_STR_KEYS
+    fallback = _stdlib_backend().dumps
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except orjson.JSONEncodeError as e:
+            if "Integer exceeds 64-bit range" not in str(e):
+                raise
+            return fallback(obj)
+
+    return JSONBackend("orjson", dumps)
+
+
+def _msgspec_backend() -> JSONBackend:
+    import msgspec
+
+    return JSONBackend("msgspec", msgspec.json.Encoder(enc_hook=_default).encode)
+
+
+def _stdlib_backend() -> JSONBackend:
+    # One reused encoder instance; json.dumps(cls=...) builds one per call
+    encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=_default
+    )
+
+    def dumps(obj: Any) -> bytes:
+        return encoder.encode(obj).encode()
+
+    return JSONBackend("json", dumps)
+
+
+_BACKENDS = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": _stdlib_backend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_json_backend(name: Optional[str] = None) -> JSONBackend:
+    """Return the named JSON backend, or the fastest one that is installed.
+
+    orjson is preferred, then msgspec; the standard library is the fallback.
+
+    Raises:
+        ValueError: If `name` is not a known backend
+        ImportError: If the named backend is not installed
+    """
+    if name is not None:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {name}")
+        return _BACKENDS[name]()
+
+    for factory in (_orjson_backend, _msgspec_backend):
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _stdlib_backend()
@@ -1,13 +1,15 @@
 from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
-import json
 import time
 import string
 import random
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from assistant_stream.serialization.assistant_stream_response import (
     AssistantStreamResponse,
 )
+from assistant_stream.serialization.json_backend import JSONBackend, get_json_backend
 from assistant_stream.serialization.stream_encoder import StreamEncoder
+from assistant_stream.serialization.stream_compression import StreamCompression
+from assistant_stream.serialization.write_coalescing import WriteCoalescing
 
 
 def generate_openai_style_id():
@@ -18,11 +20,16 @@ def generate_openai_style_id():
 
 
 class OpenAIStreamEncoder(StreamEncoder):
-    def __init__(self, model="assistant_stream", system_fingerprint="fp_0000000000"):
+    def __init__(
+        self,
+        model="assistant_stream",
+        system_fingerprint="fp_0000000000",
+        json_backend: Optional[JSONBackend] = None,
+    ):
         self.id = generate_openai_style_id()
         self.model = model
         self.system_fingerprint = system_fingerprint
-        pass
+        self._dumps = (json_backend or get_json_backend()).dumps
 
     def get_media_type(self) -> str:
         return "text/event-stream"
@@ -43,9 +50,9 @@ class OpenAIStreamEncoder(StreamEncoder):
                 }
             ],
         }
-        return f"data: {json.dumps(response, ensure_ascii=False)}\n\n"
+        return b"data: " + self._dumps(response) + b"\n\n"
 
-    def encode_chunk(self, chunk: AssistantStreamChunk) -> str:
+    def encode_chunk(self, chunk: AssistantStreamChunk) -> bytes:
         """
         Encodes the chunk into OpenAI's SSE format.
         """
@@ -54,13 +61,13 @@ class OpenAIStreamEncoder(StreamEncoder):
             return self._create_chunk({"content": chunk.text_delta})
         else:
             # Handle unknown chunk types gracefully
-            return ""
+            return b""
 
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
-        Asynchronously encodes chunks into SSE-formatted strings.
+        Asynchronously encodes chunks into SSE-formatted bytes.
         """
         async for chunk in stream:
             encoded_chunk = self.encode_chunk(chunk)
@@ -68,15 +75,23 @@ class OpenAIStreamEncoder(StreamEncoder):
                 yield encoded_chunk
 
         yield self._create_chunk(finish_reason="stop")
-        yield "data: [DONE]\n\n"
+        yield b"data: [DONE]\n\n"
 
 
 class OpenAIStreamResponse(AssistantStreamResponse):
     def __init__(
         self,
         stream: AsyncGenerator[AssistantStreamChunk, None],
+        *,
+        write_coalescing: Optional[WriteCoalescing] = None,
+        compression: Optional[StreamCompression] = None,
     ):
         """
         Initializes the response with the OpenAI SSE encoder.
         """
-        super().__init__(stream, OpenAIStreamEncoder())
+        super().__init__(
+            stream,
+            OpenAIStreamEncoder(),
+            write_coalescing=write_coalescing,
+            compression=compression,
+        )
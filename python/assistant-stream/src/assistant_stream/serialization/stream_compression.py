@@ -0,0 +1,208 @@
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Optional, Tuple, Union
+
+
+def _brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class CompressionMetrics:
+    """Byte counts of one compressed response.
+
+    Passed to `StreamCompression.on_metrics` when the response ends, and
+    available while streaming as `response.compression_metrics`.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.writes = 0
+        self.compress_seconds = 0.0
+
+    def record_write(self, raw_bytes: int, compressed_bytes: int, seconds: float) -> None:
+        self.raw_bytes += raw_bytes
+        self.compressed_bytes += compressed_bytes
+        self.writes += 1
+        self.compress_seconds += seconds
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.raw_bytes - self.compressed_bytes
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Compressed size as a fraction of the raw size, or None when empty."""
+        if not self.raw_bytes:
+            return None
+        return self.compressed_bytes / self.raw_bytes
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "encoding": self.encoding,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "saved_bytes": self.saved_bytes,
+            "ratio": self.ratio,
+            "writes": self.writes,
+            "compress_ms": self.compress_seconds * 1000,
+        }
+
+
+@dataclass
+class StreamCompression:
+    """Negotiated compression of a streamed response.
+
+    The encoding is picked from the request's Accept-Encoding header, in the
+    order of `encodings`; brotli ("br") is only offered when the `brotli`
+    package is installed. Each write is compressed and sync-flushed on its
+    own, so the client can decode everything sent so far and streaming
+    latency is unchanged. Combine with WriteCoalescing to compress larger
+    writes, which both compresses better and costs fewer flushes.
+
+    Attributes:
+        encodings: Supported content codings in order of preference.
+        level: Compression level; defaults to 6 for gzip and deflate and
+            5 for brotli, whose highest levels are too slow for streaming.
+        on_metrics: Called with the CompressionMetrics when the response
+            ends.
+    """
+
+    encodings: Tuple[str, ...] = ("br", "gzip", "deflate")
+    level: Optional[int] = None
+    on_metrics: Optional[Callable[[CompressionMetrics], Any]] = None
+
+    def __post_init__(self):
+        unknown = set(self.encodings) - set(_COMPRESSORS)
+        if unknown:
+            raise ValueError(f"Unsupported content encoding: {', '.join(sorted(unknown))}")
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Return the preferred encoding the client accepts, or None."""
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best: Optional[str] = None
+        best_q = 0.0
+        for encoding in self.encodings:
+            if encoding == "br" and not _brotli_available():
+                continue
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compressor(self, encoding: str) -> "_Compressor":
+        return _COMPRESSORS[encoding](self.level)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, *params = item.strip().split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class _Compressor(ABC):
+    """Incremental compressor that flushes at every write boundary."""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress `data` and flush, so everything written so far decodes.
+        """
+        pass
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """
+        End the compressed stream and return its remaining bytes.
+        """
+        pass
+
+
+class _ZlibCompressor(_Compressor):
+    def __init__(self, level: Optional[int], wbits: int):
+        self._compressor = zlib.compressobj(
+            6 if level is None else level, zlib.DEFLATED, wbits
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor(_Compressor):
+    def __init__(self, level: Optional[int]):
+        import brotli
+
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=5 if level is None else level
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+_COMPRESSORS: Dict[str, Callable[[Optional[int]], _Compressor]] = {
+    # gzip wrapper around the deflate stream
+    "gzip": lambda level: _ZlibCompressor(level, 16 + zlib.MAX_WBITS),
+    # HTTP "deflate" is the zlib format, not raw deflate
+    "deflate": lambda level: _ZlibCompressor(level, zlib.MAX_WBITS),
+    "br": _BrotliCompressor,
+}
+
+
+async def compress_writes(
+    content: AsyncIterable[Union[bytes, str]],
+    compressor: _Compressor,
+    metrics: CompressionMetrics,
+    on_metrics: Optional[Callable[[CompressionMetrics], Any]] = None,
+) -> AsyncIterator[bytes]:
+    """Compress each write of `content`, flushing at every write boundary."""
+    try:
+        async for data in content:
+            if isinstance(data, str):
+                data = data.encode()
+            start = time.perf_counter()
+            compressed = compressor.compress(data)
+            metrics.record_write(len(data), len(compressed), time.perf_counter() - start)
+            if compressed:
+                yield compressed
+
+        start = time.perf_counter()
+        tail = compressor.finish()
+        metrics.record_write(0, len(tail), time.perf_counter() - start)
+        if tail:
+            yield tail
+    finally:
+        # Close the source right away when the client goes away, which
+        # cancels the run
+        aclose = getattr(content, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        if on_metrics is not None:
+            on_metrics(metrics)
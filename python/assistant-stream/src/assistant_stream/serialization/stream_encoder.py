@@ -18,9 +18,10 @@ class StreamEncoder(ABC):
     @abstractmethod
     async def encode_stream(
         self, stream: AsyncGenerator[AssistantStreamChunk, None]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Encode the stream of AssistantStreamChunk into a specific format.
+        Frames are yielded as UTF-8 bytes, so the response sends them as is.
         This method must be implemented by subclasses.
         """
         pass
@@ -0,0 +1,128 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, FrozenSet, List, Optional
+
+from assistant_stream.assistant_stream_chunk import AssistantStreamChunk
+from assistant_stream.serialization.stream_encoder import StreamEncoder
+
+
+@dataclass
+class WriteCoalescing:
+    """Controls how encoded frames are gathered into larger response writes.
+
+    Without it, every chunk becomes its own ASGI body message and usually its
+    own TCP write. With it, frames are buffered and written together once
+    `max_bytes` are buffered, `max_latency_ms` after the first buffered
+    frame, right after a chunk whose type is in `urgent_types`, or when the
+    stream ends.
+
+    Attributes:
+        max_bytes: Write once this many bytes are buffered. The chunk stream
+            is not read further until the buffer was written, so slow
+            clients still apply backpressure to the run.
+        max_latency_ms: Longest time a frame is held back.
+        urgent_types: Chunk types that are written without delay, together
+            with everything buffered before them.
+    """
+
+    max_bytes: int = 16 * 1024
+    max_latency_ms: float = 10
+    urgent_types: FrozenSet[str] = field(
+        default_factory=lambda: frozenset({"error", "tool-call-begin"})
+    )
+
+    def __post_init__(self):
+        if self.max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if self.max_latency_ms < 0:
+            raise ValueError("max_latency_ms must not be negative")
+
+
+async def coalesce_frames(
+    stream: AsyncGenerator[AssistantStreamChunk, None],
+    stream_encoder: StreamEncoder,
+    policy: WriteCoalescing,
+) -> AsyncGenerator[bytes, None]:
+    """Encode `stream` and yield the frames in batches per `policy`.
+
+    A producer task encodes frames into a buffer; this generator yields the
+    joined buffer when a write is due. Closing or cancelling the generator
+    cancels the producer, and with it the chunk stream.
+    """
+    loop = asyncio.get_running_loop()
+    latency = policy.max_latency_ms / 1000
+    buffer: List[bytes] = []
+    size = 0
+    deadline = 0.0
+    urgent = False
+    done = False
+    error: Optional[BaseException] = None
+    # Set when the buffer stops being empty, when a write is due before the
+    # deadline, and when the buffer was taken
+    arrived = asyncio.Event()
+    due = asyncio.Event()
+    drained = asyncio.Event()
+
+    async def tap():
+        nonlocal urgent
+        async for chunk in stream:
+            if chunk.type in policy.urgent_types:
+                # The encoder yields this chunk's frames next
+                urgent = True
+            yield chunk
+
+    async def produce():
+        nonlocal size, deadline, urgent, done, error
+        try:
+            async for frame in stream_encoder.encode_stream(tap()):
+                if isinstance(frame, str):
+                    frame = frame.encode()
+                if not buffer:
+                    deadline = loop.time() + latency
+                    arrived.set()
+                buffer.append(frame)
+                size += len(frame)
+                if urgent or size >= policy.max_bytes:
+                    urgent = False
+                    due.set()
+                    while size >= policy.max_bytes:
+                        drained.clear()
+                        await drained.wait()
+        except Exception as e:
+            error = e
+        finally:
+            done = True
+            arrived.set()
+            due.set()
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            if not buffer:
+                if done:
+                    break
+                arrived.clear()
+                await arrived.wait()
+                continue
+
+            if not due.is_set():
+                timeout = deadline - loop.time()
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(due.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+            due.clear()
+            data = b"".join(buffer)
+            buffer.clear()
+            size = 0
+            drained.set()
+            yield data
+
+        if error is not None:
+            raise error
+    finally:
+        if not producer.done():
+            producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,219 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from assistant_stream.assistant_stream_chunk import ObjectStreamOperation
+from assistant_stream.state_proxy import copy_json_value
+
+# How many preceding operations are searched for a merge candidate when the
+# newest one on an overlapping path was dropped.
+COMPACTION_WINDOW = 64
+
+
+def _is_prefix(prefix: List[str], path: List[str]) -> bool:
+    return len(prefix) <= len(path) and path[: len(prefix)] == prefix
+
+
+def _is_superseded(operation: ObjectStreamOperation, path: List[str]) -> bool:
+    """Whether a later set or delete at `path` makes `operation` redundant."""
+    op_path = operation["path"]
+    if not _is_prefix(path, op_path):
+        return False
+    if len(op_path) == len(path) and path and operation["type"] in ("set", "increment"):
+        # These may append the list element a later operation relies on,
+        # so on a list index they are replaced in place by the fold instead
+        return not path[-1].isdigit()
+    return True
+
+
+def _shifts_indices(operation: ObjectStreamOperation) -> bool:
+    """Whether `operation` moves list elements, changing what paths refer to."""
+    op_type = operation["type"]
+    if op_type == "splice":
+        return True
+    return op_type == "delete" and operation["path"][-1].isdigit()
+
+
+def _fold(container: Any, path: List[str], operation: ObjectStreamOperation) -> Any:
+    """Apply `operation` at `path` relative to an owned copy of a set value."""
+    op_type = operation["type"]
+    if not path:
+        if op_type == "set":
+            return copy_json_value(operation["value"])
+        if op_type == "append-list":
+            container.extend(copy_json_value(operation["items"]))
+            return container
+        if op_type == "increment":
+            return (container or 0) + operation["value"]
+        return container + operation["value"]
+
+    if container is None:
+        container = {}
+
+    key, rest = path[0], path[1:]
+    if isinstance(container, list):
+        idx = int(key)
+        if idx == len(container):
+            container.append(_fold(None, rest, operation))
+        else:
+            container[idx] = _fold(container[idx], rest, operation)
+    elif not rest and op_type == "delete":
+        container.pop(key, None)
+    else:
+        container[key] = _fold(container.get(key), rest, operation)
+    return container
+
+
+def compact_operations(
+    operations: List[ObjectStreamOperation],
+) -> List[ObjectStreamOperation]:
+    """Rewrite a batch of operations into an equivalent, smaller batch.
+
+    - Consecutive append-text, append-list and increment operations on one
+      path are merged.
+    - Operations superseded by a later set or delete of the same or an
+      ancestor path are dropped.
+    - Operations below a pending set are folded into that set's value.
+
+    Sets of None are always sent as they are: clients store null, while the
+    local state skips a None set on a missing key. So they are never folded
+    into another set, and they don't drop earlier operations on their own
+    path, which may be what creates the key.
+
+    Operations on unrelated paths commute, so they may sit between the
+    operations that are combined. Splices and list element deletes move
+    elements, so they are indexed under the list's path and nothing below
+    that list is combined across them. The input operations are not
+    modified. Operations are indexed by path, so the pass is O(n * depth).
+    """
+    if len(operations) < 2:
+        return operations
+
+    # Dropped operations are replaced by None until the end of the pass
+    result: List[Optional[ObjectStreamOperation]] = []
+    # The path each operation is indexed under
+    keys: List[Tuple[str, ...]] = []
+    # Index of the newest operation at each path, and below each path
+    at_path: Dict[Tuple[str, ...], int] = {}
+    below_path: Dict[Tuple[str, ...], int] = {}
+    # Indices of the operations at or below each path
+    subtree: Dict[Tuple[str, ...], List[int]] = {}
+    # Index of the newest splice or element delete on each list
+    shifted: Dict[Tuple[str, ...], int] = {}
+    # Operations created by this pass (safe to mutate), by index
+    owned: Set[int] = set()
+    text_parts: Dict[int, List[str]] = {}
+
+    for operation in operations:
+        op_type = operation["type"]
+        path = operation["path"]
+        shifts = _shifts_indices(operation)
+        key = tuple(path[:-1]) if shifts and op_type == "delete" else tuple(path)
+        sets_none = op_type == "set" and operation["value"] is None and bool(path)
+
+        if op_type in ("set", "delete"):
+            # Paths below a list that was spliced since referred to other
+            # elements, so those operations are kept
+            path_key = tuple(path)
+            floor = max(
+                (shifted.get(path_key[:depth], -1) for depth in range(len(path))),
+                default=-1,
+            )
+            kept = []
+            for index in subtree.get(path_key, ()):
+                previous = result[index]
+                if previous is None:
+                    continue
+                if (
+                    index > floor
+                    and _is_superseded(previous, path)
+                    and not (sets_none and len(previous["path"]) == len(path))
+                ):
+                    result[index] = None
+                else:
+                    kept.append(index)
+            subtree[path_key] = kept
+
+        target = None
+        if not shifts and not sets_none:
+            target = _newest_overlapping(result, keys, key, at_path, below_path)
+
+        if target is not None:
+            previous = result[target]
+            previous_path = previous["path"]
+            same_path = len(previous_path) == len(path)
+
+            if op_type == previous["type"] and same_path:
+                if op_type == "append-text":
+                    if target not in owned:
+                        previous = result[target] = dict(previous)
+                        owned.add(target)
+                        text_parts[target] = [previous["value"]]
+                    text_parts[target].append(operation["value"])
+                    continue
+                if op_type in ("append-list", "increment"):
+                    if target not in owned:
+                        previous = result[target] = dict(previous)
+                        owned.add(target)
+                        if op_type == "append-list":
+                            previous["items"] = list(previous["items"])
+                    if op_type == "append-list":
+                        previous["items"].extend(operation["items"])
+                    else:
+                        previous["value"] += operation["value"]
+                    continue
+
+            if previous["type"] == "set" and _is_prefix(previous_path, path):
+                if target not in owned:
+                    previous = result[target] = {
+                        **previous,
+                        "value": copy_json_value(previous["value"]),
+                    }
+                    owned.add(target)
+                relative_path = path[len(previous_path) :]
+                previous["value"] = _fold(previous["value"], relative_path, operation)
+                at_path[key] = target
+                continue
+
+        index = len(result)
+        result.append(operation)
+        keys.append(key)
+        at_path[key] = index
+        if shifts:
+            shifted[key] = index
+        for depth in range(len(key)):
+            below_path[key[:depth]] = index
+        for depth in range(len(key) + 1):
+            subtree.setdefault(key[:depth], []).append(index)
+
+    for index, parts in text_parts.items():
+        if result[index] is not None:
+            result[index]["value"] = "".join(parts)
+
+    return [operation for operation in result if operation is not None]
+
+
+def _newest_overlapping(
+    result: List[Optional[ObjectStreamOperation]],
+    keys: List[Tuple[str, ...]],
+    key: Tuple[str, ...],
+    at_path: Dict[Tuple[str, ...], int],
+    below_path: Dict[Tuple[str, ...], int],
+) -> Optional[int]:
+    """Index of the newest live operation on a prefix or extension of `key`."""
+    target = below_path.get(key, -1)
+    for depth in range(len(key) + 1):
+        index = at_path.get(key[:depth], -1)
+        if index > target:
+            target = index
+    if target < 0:
+        return None
+    if result[target] is not None:
+        return target
+
+    # The newest one was dropped; search back for the one before it
+    for index in range(target - 1, max(-1, target - 1 - COMPACTION_WINDOW), -1):
+        previous_key = keys[index]
+        if result[index] is not None and (
+            previous_key[: len(key)] == key or key[: len(previous_key)] == previous_key
+        ):
+            return index
+    return None
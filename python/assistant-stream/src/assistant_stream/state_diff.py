@@ -0,0 +1,143 @@
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from assistant_stream.assistant_stream_chunk import ObjectStreamOperation
+
+
+@dataclass
+class DiffPolicy:
+    """Controls how assignments are diffed against the local state.
+
+    With a DiffPolicy, assigning a value through the state proxy (or to
+    `controller.state`) compares it with the current value at that path and
+    emits only the operations needed to turn one into the other.
+
+    Attributes:
+        max_depth: Below this many levels, changed values are set as a whole
+            instead of being compared further.
+        max_operations: Give up and send a single set once the diff needs
+            more operations than this.
+        max_size_ratio: Send a single set when the diff is not smaller than
+            this fraction of the encoded new value.
+    """
+
+    max_depth: int = 8
+    max_operations: int = 64
+    max_size_ratio: float = 0.5
+
+    def __post_init__(self):
+        if self.max_depth < 0 or self.max_operations < 0:
+            raise ValueError("max_depth and max_operations must not be negative")
+
+
+class _TooManyOperations(Exception):
+    pass
+
+
+def diff_operations(
+    current: Any, value: Any, path: List[str], policy: DiffPolicy
+) -> Optional[List[ObjectStreamOperation]]:
+    """Compute the operations that turn `current` into `value` at `path`.
+
+    Returns None when a single set of `value` is expected to be cheaper.
+    Strings that only grew become append-text, lists that only grew become
+    append-list, and removed dictionary keys become delete operations.
+    """
+    differ = _Differ(policy)
+    try:
+        differ.diff(current, value, list(path), 0)
+    except _TooManyOperations:
+        return None
+
+    operations = differ.operations
+    if len(operations) > 1 or (operations and operations[0]["type"] != "set"):
+        limit = policy.max_size_ratio
+        diff_size = len(json.dumps(operations, default=str))
+        # The unchanged leaves that were compared give a lower bound on the
+        # size of the value; only encode the value when that is inconclusive
+        if diff_size >= (differ.unchanged_size + diff_size) * limit:
+            if diff_size >= len(json.dumps(value, default=str)) * limit:
+                return None
+    return operations
+
+
+class _Differ:
+    def __init__(self, policy: DiffPolicy):
+        self.policy = policy
+        self.operations: List[ObjectStreamOperation] = []
+        # Approximate encoded size of the leaves found unchanged
+        self.unchanged_size = 0
+
+    def add(self, operation: ObjectStreamOperation) -> None:
+        self.operations.append(operation)
+        if len(self.operations) > self.policy.max_operations:
+            raise _TooManyOperations()
+
+    def diff(self, current: Any, value: Any, path: List[str], depth: int) -> None:
+        if type(current) is not type(value):
+            self.add({"type": "set", "path": path, "value": value})
+            return
+
+        if isinstance(value, str):
+            if value == current:
+                self.unchanged_size += len(value) + 2
+            elif value.startswith(current):
+                self.unchanged_size += len(current) + 2
+                self.add(
+                    {"type": "append-text", "path": path, "value": value[len(current) :]}
+                )
+            else:
+                self.add({"type": "set", "path": path, "value": value})
+            return
+
+        if not isinstance(value, (dict, list)) or depth >= self.policy.max_depth:
+            if value != current:
+                self.add({"type": "set", "path": path, "value": value})
+            else:
+                self.unchanged_size += 4
+            return
+
+        depth += 1
+        if isinstance(value, dict):
+            start = len(self.operations)
+            for key, item in value.items():
+                if key not in current:
+                    if item is None:
+                        # Setting a missing key to None is a no-op, so send
+                        # the whole dict instead
+                        del self.operations[start:]
+                        self.add({"type": "set", "path": path, "value": value})
+                        return
+                    self.add({"type": "set", "path": [*path, key], "value": item})
+                    continue
+                previous = current[key]
+                if previous is item or (
+                    type(previous) is type(item)
+                    and not isinstance(item, (dict, list))
+                    and previous == item
+                ):
+                    # Unchanged leaf, without building its path
+                    self.unchanged_size += len(key) + 4
+                    continue
+                self.diff(previous, item, [*path, key], depth)
+            for key in current:
+                if key not in value:
+                    self.add({"type": "delete", "path": [*path, key]})
+            return
+
+        common = min(len(current), len(value))
+        for index in range(common):
+            self.diff(current[index], value[index], [*path, str(index)], depth)
+        if len(value) > common:
+            self.add({"type": "append-list", "path": path, "items": value[common:]})
+        elif len(current) > common:
+            self.add(
+                {
+                    "type": "splice",
+                    "path": path,
+                    "start": common,
+                    "deleteCount": len(current) - common,
+                    "items": [],
+                }
+            )
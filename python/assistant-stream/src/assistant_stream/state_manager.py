@@ -1,28 +1,155 @@
 import asyncio
-from typing import Any, Callable, Dict, List
+import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from assistant_stream.assistant_stream_chunk import (
     ObjectStreamOperation,
     UpdateStateChunk,
 )
-from assistant_stream.state_proxy import StateProxy
+from assistant_stream.modules.tool_call import _on_loop_thread
+from assistant_stream.state_compaction import compact_operations
+from assistant_stream.state_diff import DiffPolicy, diff_operations
+from assistant_stream.state_proxy import StateProxy, copy_json_value, resolve_path
+from assistant_stream.state_schema import StateSchema, StateWriter
+from assistant_stream.state_view import StateView
+
+
+@dataclass
+class FlushPolicy:
+    """Controls when StateManager emits pending operations.
+
+    Modes:
+        immediate: Every add_operations call is emitted as its own chunk.
+        tick: Operations are batched until the next event loop iteration
+            (the default, and the historical behavior).
+        debounce: Operations are emitted once no new operation arrived for
+            `debounce_ms`, or `max_latency_ms` after the first pending one.
+        size: Operations are emitted once `max_operations` are pending, or
+            `max_latency_ms` after the first pending one.
+
+    In every mode pending operations are also flushed before any other chunk
+    is sent, so ordering relative to text, tool and error chunks is kept.
+    """
+
+    mode: Literal["immediate", "tick", "debounce", "size"] = "tick"
+    debounce_ms: float = 0
+    max_latency_ms: Optional[float] = None
+    max_operations: Optional[int] = None
+
+    def __post_init__(self):
+        if self.mode not in ("immediate", "tick", "debounce", "size"):
+            raise ValueError(f"Invalid flush mode: {self.mode}")
+        if self.mode == "size" and self.max_operations is None:
+            raise ValueError("The size flush mode requires max_operations")
+
+
+class StateHistoryExpiredError(KeyError):
+    """Raised when operations after an offset are no longer retained."""
+
+
+# Maximum number of strings that are grown through text buffers at once.
+# The least recently started buffer is materialized when it is exceeded.
+MAX_TEXT_BUFFERS = 16
+
+
+class _TextBuffer:
+    """Parts appended to a string in the local state, joined on demand.
+
+    The container slot holds the string as of the last materialization;
+    `parts` holds the text appended since.
+    """
+
+    __slots__ = ("container", "key", "parts")
+
+    def __init__(self, container: Any, key: Any):
+        self.container = container
+        self.key = key
+        self.parts: List[str] = []
+
+    def materialize(self) -> None:
+        if self.parts:
+            self.container[self.key] += "".join(self.parts)
+            self.parts.clear()
 
 
 class StateManager:
-    """Manages state operations with efficient batching and local updates."""
+    """Manages state operations with efficient batching and local updates.
+
+    Operations may be added from worker threads as well as from the event
+    loop. Each add_operations call is applied and queued atomically, and
+    operations are emitted in the order they were added across all threads.
+    A `batch()` block holds the lock for its duration, so read-modify-write
+    sequences inside it are not interleaved with writes from other threads.
+    Flushes are marshalled onto the loop once per batch of operations, not
+    once per call.
+
+    Every added operation advances the operation offset by one. `snapshot()`
+    returns the state as of an offset, and `ops_since(offset)` the operations
+    added after it, so a late joiner can be served a snapshot followed by
+    the live operations.
+    """
 
     def __init__(
         self,
         put_chunk_callback: Callable[[UpdateStateChunk], None],
         state_data: Any | None = None,
+        flush_policy: Optional[FlushPolicy] = None,
+        compact: bool = True,
+        diff_policy: Optional[DiffPolicy] = None,
+        history_limit: Optional[int] = 1024,
+        schema: Optional[StateSchema] = None,
     ):
-        """Initialize with callback for sending state updates."""
+        """Initialize with callback for sending state updates.
+
+        When `compact` is set, each batch is rewritten by compact_operations
+        before it is sent. With a `diff_policy`, set_value sends the
+        difference to the current value instead of the whole value.
+        `history_limit` bounds the number of operations kept for ops_since
+        (None keeps all of them, 0 none). A `schema` enables writer().
+        """
         self._state_data = state_data
         self._pending_operations = []
+        self._compact = compact
+        self._diff_policy = diff_policy
+        self._schema = schema
         self._update_scheduled = False
+        self._batch_depth = 0
+        self._flush_policy = flush_policy or FlushPolicy()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._pending_since: Optional[float] = None
+        self._last_operation_time = 0.0
         self._put_chunk_callback = put_chunk_callback
+        self._text_buffers: Dict[Tuple[str, ...], _TextBuffer] = {}
+        # Bumped whenever a container may have been replaced; StateProxy
+        # caches resolved nodes while it is unchanged
+        self._version = 0
+        # Operation offset, and the most recent operations for ops_since
+        self._offset = 0
+        self._history = deque(maxlen=history_limit)
+        # Ids of the containers copied since the last snapshot; None until a
+        # snapshot shares the state
+        self._owned: Optional[Set[int]] = None
+        # Guards the local state, the pending operations and the scheduling
+        # flags; reentrant so that batches can nest and flushes can run
+        # from inside a write
+        self._lock = threading.RLock()
         self._loop = asyncio.get_running_loop()
-        self._state_proxy = StateProxy(self, [])
+        self._state_proxy = StateProxy(self)
 
     @property
     def state(self) -> Any:
@@ -38,154 +165,547 @@ class StateManager:
     @property
     def state_data(self) -> Dict[str, Any]:
         """Current state data."""
-        return self._state_data
+        with self._lock:
+            self._materialize_text_buffers()
+            return self._state_data
 
     def add_operations(self, operations: List[ObjectStreamOperation]) -> None:
         """Add operations to pending batch and apply locally."""
-        # Apply to local state immediately
-        for operation in operations:
-            self._apply_operation_to_local_state(operation)
+        with self._lock:
+            # Apply to local state immediately
+            for operation in operations:
+                self._apply_operation_to_local_state(operation)
 
-        # Add to pending operations
+            self._enqueue_operations(operations)
+
+    def _enqueue_operations(self, operations: List[ObjectStreamOperation]) -> None:
+        """Queue operations that were applied locally; requires the lock."""
         self._pending_operations.extend(operations)
+        self._history.extend(operations)
+        self._offset += len(operations)
+
+        if not self._batch_depth:
+            self._schedule_flush()
+
+    def set_value(self, path: List[str], value: Any) -> None:
+        """Assign `value` at `path`.
+
+        Without a diff policy this is a single set operation. With one, the
+        value is compared with the current value at `path` and only the
+        changes are sent, unless a single set is expected to be cheaper.
+        """
+        if self._diff_policy is None:
+            self.add_operations([{"type": "set", "path": list(path), "value": value}])
+            return
+
+        with self._lock:
+            operations = None
+            try:
+                current = self.get_value_at_path(path)
+            except KeyError:
+                pass
+            else:
+                operations = diff_operations(
+                    current, copy_json_value(value), path, self._diff_policy
+                )
+
+            if operations is None:
+                operations = [{"type": "set", "path": list(path), "value": value}]
+            if operations:
+                self.add_operations(operations)
+
+    @property
+    def offset(self) -> int:
+        """Number of operations added so far."""
+        return self._offset
+
+    def snapshot(self) -> Tuple[int, Any]:
+        """Return the current offset and a point-in-time copy of the state.
+
+        The copy is structurally shared with the live state: taking it costs
+        O(1), and later writes copy only the containers along their path
+        before mutating them. The returned state must not be mutated.
+        """
+        with self._lock:
+            self._materialize_text_buffers()
+            # Buffers hold containers that are now shared; appends reopen
+            # them on private copies
+            self._text_buffers.clear()
+            self._owned = set()
+            return self._offset, self._state_data
+
+    def ops_since(self, offset: int) -> List[ObjectStreamOperation]:
+        """Return the operations added after `offset`, compacted if enabled.
+
+        Raises:
+            StateHistoryExpiredError: If some of them are no longer retained
+        """
+        with self._lock:
+            if offset < 0 or offset > self._offset:
+                raise ValueError(f"Invalid offset: {offset}")
+            first = self._offset - len(self._history)
+            if offset < first:
+                raise StateHistoryExpiredError(offset)
+            operations = list(islice(self._history, offset - first, None))
+        if self._compact:
+            operations = compact_operations(operations)
+        return operations
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Collect the writes made inside the block and schedule them once.
+
+        Writes are still applied to the local state right away, so reads in
+        the block see them. Batches may be nested; the operations are
+        scheduled when the outermost one exits.
+
+        The block holds the state lock, so other threads wait until it exits
+        before writing; avoid awaiting inside a batch on the event loop.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._pending_operations:
+                    self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Schedule the emission of pending operations per the flush policy."""
+        policy = self._flush_policy
+        mode = policy.mode
+
+        if mode == "tick":
+            # Schedule batch update if needed
+            if not self._update_scheduled:
+                self._update_scheduled = True
+                self._loop.call_soon_threadsafe(self._flush_updates)
+            return
+
+        if mode == "immediate":
+            self._flush_updates()
+            return
+
+        now = self._loop.time()
+        self._last_operation_time = now
+        if self._pending_since is None:
+            self._pending_since = now
+
+        if mode == "size" and len(self._pending_operations) >= policy.max_operations:
+            self._flush_updates()
+            return
 
-        # Schedule batch update if needed
         if not self._update_scheduled:
+            if mode == "debounce":
+                delay = policy.debounce_ms
+                if policy.max_latency_ms is not None:
+                    delay = min(delay, policy.max_latency_ms)
+            elif policy.max_latency_ms is not None:
+                delay = policy.max_latency_ms
+            else:
+                # Size-only: wait for the threshold or an explicit flush
+                return
             self._update_scheduled = True
-            self._loop.call_soon_threadsafe(self._flush_updates)
+            self._loop.call_soon_threadsafe(self._arm_flush_timer, now + delay / 1000)
+
+    def _arm_flush_timer(self, when: float) -> None:
+        """Arm the flush timer on the event loop."""
+        with self._lock:
+            if not self._pending_operations:
+                self._update_scheduled = False
+                return
+            if self._flush_handle is not None:
+                return
+            self._flush_handle = self._loop.call_at(when, self._on_flush_timer)
+
+    def _on_flush_timer(self) -> None:
+        """Flush when due, or re-arm if operations kept arriving."""
+        with self._lock:
+            self._flush_handle = None
+            if not self._pending_operations:
+                self._update_scheduled = False
+                return
+
+            policy = self._flush_policy
+            due = float("inf")
+            if policy.mode == "debounce":
+                due = self._last_operation_time + policy.debounce_ms / 1000
+            if policy.max_latency_ms is not None:
+                due = min(due, self._pending_since + policy.max_latency_ms / 1000)
+
+            if due > self._loop.time():
+                self._flush_handle = self._loop.call_at(due, self._on_flush_timer)
+            else:
+                self._flush_updates()
 
     def _flush_updates(self) -> None:
-        """Send pending operations as a batch."""
-        if self._pending_operations:
-            operations_to_send = self._pending_operations.copy()
-            self._pending_operations.clear()
-            self._put_chunk_callback(UpdateStateChunk(operations=operations_to_send))
+        """Send pending operations as a batch.
 
-        self._update_scheduled = False
+        The chunk is handed to the callback while the lock is held, so chunks
+        reach it in the order their operations were added.
+        """
+        with self._lock:
+            handle = self._flush_handle
+            if handle is not None:
+                self._flush_handle = None
+                # Timer handles belong to the loop thread. A timer that still
+                # fires finds nothing or a newer batch to emit
+                if _on_loop_thread(self._loop):
+                    handle.cancel()
+                else:
+                    self._loop.call_soon_threadsafe(handle.cancel)
+            self._pending_since = None
+
+            if self._pending_operations:
+                operations_to_send = self._pending_operations
+                self._pending_operations = []
+                if self._compact:
+                    operations_to_send = compact_operations(operations_to_send)
+                self._put_chunk_callback(UpdateStateChunk(operations=operations_to_send))
+
+            self._update_scheduled = False
 
     def flush(self) -> None:
         """Explicitly flush any pending operations.
 
         This should be called before the run completes to ensure all state updates are sent.
         """
-        if self._pending_operations:
-            self._flush_updates()
+        with self._lock:
+            if self._pending_operations:
+                self._flush_updates()
 
-    def _apply_operation_to_local_state(self, operation: ObjectStreamOperation) -> None:
-        """Apply operation to local state."""
+    def _apply_operation_to_local_state(
+        self, operation: ObjectStreamOperation, base: Optional[StateProxy] = None
+    ) -> None:
+        """Apply operation to local state.
+
+        With a `base` proxy on a prefix of the operation's path, the update
+        walks from its cached node instead of from the root.
+        """
         op_type = operation["type"]
 
+        if self._owned is not None:
+            # Copy the containers shared with a snapshot before mutating them
+            path = operation["path"]
+            if op_type == "append-list" or op_type == "splice":
+                self._unshare_path(path, len(path))
+            elif path:
+                self._unshare_path(path, len(path) - 1)
+
         if op_type == "set":
-            self._update_path(operation["path"], lambda _: operation["value"])
+            # Store a private copy: the state is mutated in place later on,
+            # which must not leak into operations that are not sent yet
+            value = copy_json_value(operation["value"])
+            path = operation["path"]
+
+            def set_value(current):
+                # Proxies only cache containers, so replacing anything else
+                # leaves the structure unchanged
+                if isinstance(current, (dict, list)):
+                    self._version += 1
+                return value
+
+            self._discard_text_buffers(path)
+            self._update_path(path, set_value, base)
+            if not path:
+                self._version += 1
 
         elif op_type == "append-text":
+            path = operation["path"]
+            buffer_key = tuple(path)
+            buffer = self._text_buffers.get(buffer_key)
+            if buffer is not None:
+                buffer.parts.append(operation["value"])
+                return
 
             def append_text(current):
                 if not isinstance(current, str):
-                    path_str = ", ".join(operation["path"])
+                    path_str = ", ".join(path)
                     raise TypeError(f"Expected string at path [{path_str}]")
                 return current + operation["value"]
 
-            self._update_path(operation["path"], append_text)
+            location = self._update_path(path, append_text, base)
+            if location is not None:
+                self._open_text_buffer(buffer_key, *location)
+            elif not path:
+                self._version += 1
+
+        elif op_type == "increment":
+            path = operation["path"]
+
+            def increment(current):
+                if current is None:
+                    current = 0
+                elif isinstance(current, bool) or not isinstance(current, (int, float)):
+                    path_str = ", ".join(path)
+                    raise TypeError(f"Expected number at path [{path_str}]")
+                return current + operation["value"]
+
+            self._update_path(path, increment, base)
+            if not path:
+                self._version += 1
+
+        elif op_type == "append-list":
+            path = operation["path"]
+            items = copy_json_value(operation["items"])
+
+            def append_list(current):
+                if not isinstance(current, list):
+                    path_str = ", ".join(path)
+                    raise TypeError(f"Expected list at path [{path_str}]")
+                current.extend(items)
+                return current
+
+            self._update_path(path, append_list, base)
+
+        elif op_type == "delete":
+            self._delete_path(operation["path"])
+
+        elif op_type == "splice":
+            path = operation["path"]
+            current = self.get_value_at_path(path)
+            if not isinstance(current, list):
+                path_str = ", ".join(path)
+                raise TypeError(f"Expected list at path [{path_str}]")
+            start = operation["start"]
+            if start < 0 or start > len(current):
+                raise KeyError(str(start))
+            # Elements move, so buffered text can't be found by path anymore
+            self._version += 1
+            self._discard_text_buffers(path)
+            current[start : start + operation["deleteCount"]] = copy_json_value(
+                operation["items"]
+            )
 
         else:
             raise TypeError(f"Invalid operation type: {op_type}")
 
-    def get_value_at_path(self, path: List[str]) -> Any:
-        """Get value at path, raising KeyError for invalid paths."""
+    def _unshare_path(self, path: List[str], depth: int) -> None:
+        """Replace the root and the containers along `path[:depth]` that are
+        shared with a snapshot by shallow copies."""
+        owned = self._owned
+        node = self._state_data
+        if not isinstance(node, (dict, list)):
+            return
+        copied = False
+        if id(node) not in owned:
+            node = self._state_data = node.copy()
+            owned.add(id(node))
+            copied = True
+
+        for key in path[:depth]:
+            if isinstance(node, dict):
+                child = node.get(key)
+            else:
+                try:
+                    key = int(key)
+                except ValueError:
+                    break
+                if not 0 <= key < len(node):
+                    break
+                child = node[key]
+            if not isinstance(child, (dict, list)):
+                break
+            if id(child) not in owned:
+                child = node[key] = child.copy()
+                owned.add(id(child))
+                copied = True
+            node = child
+
+        if copied:
+            # Proxies may hold the shared containers
+            self._version += 1
+
+    def _delete_path(self, path: List[str]) -> None:
+        """Remove a dictionary key or list element.
+
+        Deleting a missing dictionary key is a no-op, like a set of None.
+        """
         if not path:
-            return self._state_data
-
-        # If state is None, we can't navigate further
-        if self._state_data is None:
-            raise KeyError(path[0] if path else "")
-
-        current = self._state_data
+            raise KeyError("Cannot delete the root state")
 
-        for key in path:
+        parent = self.get_value_at_path(path[:-1])
+        key = path[-1]
+        if isinstance(parent, list):
             try:
-                if isinstance(current, list):
-                    idx = int(key)
-                    if idx < 0 or idx >= len(current):
-                        raise KeyError(key)
-                    current = current[idx]
-                elif isinstance(current, dict):
-                    current = current[key]
-                else:
-                    raise KeyError(key)
-            except (ValueError, KeyError, IndexError):
+                idx = int(key)
+            except ValueError:
                 raise KeyError(key)
+            if idx < 0 or idx >= len(parent):
+                raise KeyError(key)
+            # Later elements move, so their buffered text is dropped as well
+            self._discard_text_buffers(path[:-1])
+            del parent[idx]
+        elif isinstance(parent, dict):
+            self._discard_text_buffers(path)
+            parent.pop(key, None)
+        else:
+            raise KeyError(f"Invalid path: [{', '.join(path)}]")
+        self._version += 1
 
-        return current
+    def _open_text_buffer(
+        self, buffer_key: Tuple[str, ...], container: Any, key: Any
+    ) -> None:
+        """Grow the string at `buffer_key` through a text buffer from now on.
 
-    def _update_path(self, path: List[str], updater: Callable[[Any], Any]) -> None:
-        """Update value at path without creating parent objects."""
-        # Handle empty path (update root state)
-        if not path:
-            self._state_data = updater(self._state_data)
+        Repeated append-text operations on one path then cost O(1) each
+        instead of copying the whole string; the parts are joined when the
+        value is read.
+        """
+        if len(self._text_buffers) >= MAX_TEXT_BUFFERS:
+            oldest = next(iter(self._text_buffers))
+            self._text_buffers.pop(oldest).materialize()
+        self._text_buffers[buffer_key] = _TextBuffer(container, key)
+
+    def _materialize_text_buffers(self, path: Optional[List[str]] = None) -> None:
+        """Join the buffered text at, below or above `path` (default: all)."""
+        if not self._text_buffers:
+            return
+        with self._lock:
+            if path is None:
+                for buffer in self._text_buffers.values():
+                    buffer.materialize()
+                return
+            path = tuple(path)
+            depth = len(path)
+            for buffer_key, buffer in self._text_buffers.items():
+                if buffer.parts and _paths_overlap(buffer_key, path, depth):
+                    buffer.materialize()
+
+    def _discard_text_buffers(self, path: List[str]) -> None:
+        """Drop the buffers of strings that are replaced by a write at `path`."""
+        if not self._text_buffers:
             return
+        path = tuple(path)
+        depth = len(path)
+        for buffer_key in [
+            buffer_key
+            for buffer_key in self._text_buffers
+            if len(buffer_key) >= depth and buffer_key[:depth] == path
+        ]:
+            del self._text_buffers[buffer_key]
+
+    def get_value_at_path(self, path: Sequence[str]) -> Any:
+        """Get value at path, raising KeyError for invalid paths."""
+        with self._lock:
+            self._materialize_text_buffers(path)
+            return resolve_path(self._state_data, path)
 
-        # Initialize state as empty object if it's null
-        if self._state_data is None:
-            self._state_data = {}
+    def view(self, path: Sequence[str]) -> StateView:
+        """Return a handle on the subtree at `path`.
 
-        if not isinstance(self._state_data, (dict, list)):
-            raise KeyError(f"Invalid path: [{', '.join(path)}]")
+        See StateView; operations added through it only walk the relative
+        path.
+        """
+        return StateView(self, path)
+
+    def writer(self, path: Sequence[Any]) -> StateWriter:
+        """Return a StateWriter for `path`, validated against the schema.
 
-        key, *rest = path
+        Raises:
+            ValueError: If the manager has no schema
+        """
+        if self._schema is None:
+            raise ValueError("writer() requires a state schema")
+        return StateWriter(self, path)
+
+    def _update_path(
+        self,
+        path: List[str],
+        updater: Callable[[Any], Any],
+        base: Optional[StateProxy] = None,
+    ) -> Optional[Tuple[Any, Any]]:
+        """Update value at path without creating parent objects.
+
+        Walks the path once and mutates the containers in place, so the cost
+        is O(depth) regardless of how many siblings each level has. None
+        values along the path are replaced by new objects, which changes the
+        structure. Returns the container and key that hold the updated value,
+        or None when the root was replaced or nothing was stored.
+
+        When `base` is a proxy on a proper prefix of `path` whose node is a
+        container, the walk starts from its cached node.
+        """
+        # Handle empty path (update root state)
+        if not path:
+            self._state_data = updater(self._state_data)
+            return None
 
-        # Handle list access
-        if isinstance(self._state_data, list):
+        container = None
+        start = 0
+        if base is not None and len(path) > len(base._path):
             try:
-                idx = int(key)
-                if idx < 0 or idx > len(self._state_data):
+                container = base._get_node()
+            except KeyError:
+                container = None
+            if isinstance(container, (dict, list)):
+                start = len(base._path)
+            else:
+                container = None
+
+        if container is None:
+            # Initialize state as empty object if it's null
+            if self._state_data is None:
+                self._state_data = {}
+                # Proxies may hold the replaced value
+                self._version += 1
+            container = self._state_data
+
+        last = len(path) - 1
+
+        for depth in range(start, len(path)):
+            key = path[depth]
+            if isinstance(container, list):
+                try:
+                    idx = int(key)
+                except ValueError:
+                    raise KeyError(key)
+                length = len(container)
+                if idx < 0 or idx > length:
                     raise KeyError(key)
 
-                if not rest:
-                    # For direct update
-                    if idx == len(self._state_data):  # Append case
+                if depth == last:
+                    if idx == length:  # Append case
                         value = updater(None)
-                        if value is not None:
-                            self._state_data.append(value)
+                        if value is None:
+                            return None
+                        container.append(value)
                     else:  # Update existing element
-                        self._state_data[idx] = updater(self._state_data[idx])
-                else:
-                    # For nested update
-                    if idx == len(self._state_data):
-                        raise KeyError(key)
+                        container[idx] = updater(container[idx])
+                    return container, idx
 
-                    # Create a copy for the nested update
-                    next_state = self._state_data.copy()
-
-                    # Create a temporary manager for the nested path
-                    temp_manager = type(self)(lambda _: None)
-                    temp_manager._state_data = next_state[idx]
+                if idx == length:
+                    raise KeyError(key)
+                child = container[idx]
+                if child is None:
+                    child = container[idx] = {}
+                    self._version += 1
+
+            elif isinstance(container, dict):
+                if depth == last:
+                    if key not in container and updater(None) is None:
+                        return None
+                    container[key] = updater(container.get(key))
+                    return container, key
+
+                if key not in container:
+                    raise KeyError(key)
+                child = container[key]
+                if child is None:
+                    child = container[key] = {}
+                    self._version += 1
 
-                    # Update nested path
-                    temp_manager._update_path(rest, updater)
-                    next_state[idx] = temp_manager._state_data
-                    self._state_data = next_state
-            except ValueError:
-                raise KeyError(key)
-        else:  # Handle dict access
-            if not rest:
-                # For direct update
-                if key not in self._state_data and updater(None) is None:
-                    return
-                self._state_data[key] = updater(self._state_data.get(key))
             else:
-                # For nested update
-                if key not in self._state_data:
-                    raise KeyError(key)
+                raise KeyError(f"Invalid path: [{', '.join(path[depth:])}]")
 
-                # Create a copy for the nested update
-                next_state = dict(self._state_data)
+            container = child
 
-                # Create a temporary manager for the nested path
-                temp_manager = type(self)(lambda _: None)
-                temp_manager._state_data = next_state[key]
 
-                # Update nested path
-                temp_manager._update_path(rest, updater)
-                next_state[key] = temp_manager._state_data
-                self._state_data = next_state
+def _paths_overlap(
+    buffer_key: Tuple[str, ...], path: Tuple[str, ...], depth: int
+) -> bool:
+    """Whether one path is a prefix of the other."""
+    if len(buffer_key) >= depth:
+        return buffer_key[:depth] == path
+    return buffer_key == path[: len(buffer_key)]
@@ -1,4 +1,5 @@
-from typing import Any, List, Optional, Union, TYPE_CHECKING
+import functools
+from typing import Any, Dict, Optional, Sequence, Tuple, Union, TYPE_CHECKING
 
 
 # Avoid circular import
@@ -6,6 +7,21 @@ if TYPE_CHECKING:
     from assistant_stream.state_manager import StateManager
 
 
+def _locked(method):
+    """Run a proxy method under the manager's lock.
+
+    Used for writes that are computed from a read, e.g. a list index, so the
+    value cannot change between the read and the write.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._manager._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class StateProxy:
     """Proxy object for state access and updates using dictionary-style access.
 
@@ -14,23 +30,83 @@ class StateProxy:
         name = state_proxy["user"]["name"]
         state_proxy["messages"] += "Hello"
         state_proxy["items"].append("item")
+
+    Child proxies are memoized per key, so repeated access through the same
+    parent reuses one proxy and one path tuple. The memo is dropped when the
+    node is replaced and pruned to existing keys when it outgrows the node.
     """
 
+    __slots__ = ("_manager", "_path", "_node", "_version", "_children")
+
+    def _get_node(self):
+        """Resolve the value at this proxy's path, cached between writes.
+
+        The cached node is reused while the manager's structural version is
+        unchanged; other values are resolved on every call, since they are
+        replaced without a version change. Strings inside it may still have
+        buffered text; use _get_value when the contents are exposed.
+        """
+        manager = self._manager
+        if self._version != manager._version:
+            node = manager.get_value_at_path(self._path)
+            if self._children:
+                if node is not self._node:
+                    self._children = None
+                elif len(self._children) > len(node):
+                    # Keys were deleted; keep the memo bounded by the node
+                    self._prune_children(node)
+            self._node = node
+            if isinstance(node, (dict, list)):
+                self._version = manager._version
+        return self._node
+
+    def _prune_children(self, node: Any) -> None:
+        """Drop memoized child proxies whose key is no longer in `node`."""
+        if isinstance(node, list):
+            length = len(node)
+            self._children = {
+                key: child for key, child in self._children.items() if int(key) < length
+            }
+        else:
+            self._children = {
+                key: child for key, child in self._children.items() if key in node
+            }
+
     def _get_value(self):
-        return self._manager.get_value_at_path(self._path)
+        node = self._get_node()
+        if self._manager._text_buffers:
+            self._manager._materialize_text_buffers(self._path)
+        return node
 
     def __init__(
         self,
         state_manager: "StateManager",
-        path: Optional[List[str]] | None = None,
+        path: Optional[Sequence[str]] | None = None,
     ) -> None:
         """Initialize with state manager and current path."""
         self._manager = state_manager
-        self._path = path or []
+        self._path: Tuple[str, ...] = tuple(path) if path else ()
+        self._node = None
+        self._version = -1
+        self._children: Optional[Dict[str, "StateProxy"]] = None
+
+    def _child(self, str_key: str, node: Any) -> "StateProxy":
+        """Return the memoized proxy for a child container."""
+        children = self._children
+        if children is None:
+            children = self._children = {}
+        child = children.get(str_key)
+        if child is None:
+            child = children[str_key] = StateProxy(
+                self._manager, self._path + (str_key,)
+            )
+        child._node = node
+        child._version = self._version
+        return child
 
     def __getitem__(self, key: Union[str, int]) -> Union["StateProxy", Any]:
         """Access nested values with dict-style syntax. Returns primitives directly except strings."""
-        current_value = self._manager.get_value_at_path(self._path)
+        current_value = self._get_node()
 
         # Handle list indexing
         if isinstance(current_value, list):
@@ -47,33 +123,37 @@ class StateProxy:
                     raise KeyError(key)
 
                 # Use the normalized index as string key
-                str_key = str(index)
+                str_key = _index_key(index)
             except (ValueError, TypeError):
                 raise KeyError(key)
+            value = current_value[index]
         else:
             # For dicts, use string representation of key
-            str_key = str(key)
+            str_key = key if isinstance(key, str) else str(key)
 
             # Validate key exists
-            if isinstance(current_value, dict):
-                if str_key not in current_value:
-                    raise KeyError(key)
-            elif not isinstance(current_value, list):
+            if not isinstance(current_value, dict) or str_key not in current_value:
                 raise KeyError(key)
+            value = current_value[str_key]
 
-        # Get value at path
-        value = self._manager.get_value_at_path(self._path + [str_key])
+        if isinstance(value, str):
+            if self._manager._text_buffers:
+                # Join buffered text into the string before handing it out
+                self._manager._materialize_text_buffers(self._path + (str_key,))
+                value = current_value[index if isinstance(current_value, list) else str_key]
+            return value
 
-        # Return primitives directly (including strings)
-        if value is None or isinstance(value, (int, float, bool, str)):
+        # Return primitives directly
+        if value is None or isinstance(value, (int, float, bool)):
             return value
 
         # Return proxy only for collections
-        return StateProxy(self._manager, self._path + [str_key])
+        return self._child(str_key, value)
 
+    @_locked
     def __setitem__(self, key: Union[str, int], value: Any) -> None:
         """Set value with dict-style syntax."""
-        current_value = self._manager.get_value_at_path(self._path)
+        current_value = self._get_node()
 
         # Handle list indexing
         if isinstance(current_value, list):
@@ -90,20 +170,26 @@ class StateProxy:
                     raise KeyError(key)
 
                 # Use the normalized index as string key
-                str_key = str(index)
+                str_key = _index_key(index)
             except (ValueError, TypeError):
                 raise KeyError(key)
         else:
             # For dicts and other types, use string representation of key
-            str_key = str(key)
+            str_key = key if isinstance(key, str) else str(key)
 
-        self._manager.add_operations(
-            [{"type": "set", "path": self._path + [str_key], "value": value}]
-        )
+        if (
+            isinstance(value, StateProxy)
+            and value._manager is self._manager
+            and value._path == self._path + (str_key,)
+        ):
+            # `state[key] += ...` assigns the proxy back after updating it
+            return
+
+        self._manager.set_value([*self._path, str_key], value)
 
     def __iadd__(self, other: Any) -> "StateProxy":
         """Support += for strings and lists."""
-        current_value = self._manager.get_value_at_path(self._path)
+        current_value = self._get_node()
 
         # String concatenation
         if isinstance(current_value, str):
@@ -113,87 +199,75 @@ class StateProxy:
                 )
 
             self._manager.add_operations(
-                [{"type": "append-text", "path": self._path, "value": other}]
+                [{"type": "append-text", "path": list(self._path), "value": other}]
             )
             return self
 
         # List extension
         if isinstance(current_value, list):
             try:
-                # Ensure other is iterable
-                iterator = iter(other)
-
-                # Add each item at the end of the list
-                operations = []
-                current_len = len(current_value)
-
-                for i, item in enumerate(iterator):
-                    operations.append(
-                        {
-                            "type": "set",
-                            "path": self._path + [str(current_len + i)],
-                            "value": item,
-                        }
-                    )
-
-                if operations:
-                    self._manager.add_operations(operations)
-                return self
+                items = list(other)
             except TypeError:
                 raise TypeError(
                     f"can only concatenate list (not '{type(other).__name__}') to list"
                 )
 
+            if items:
+                self._manager.add_operations(
+                    [{"type": "append-list", "path": list(self._path), "items": items}]
+                )
+            return self
+
         raise TypeError(
             f"unsupported operand type(s) for +=: '{type(current_value).__name__}' and '{type(other).__name__}'"
         )
 
     def __repr__(self) -> str:
         """String representation of the value."""
-        return repr(self._manager.get_value_at_path(self._path))
+        return repr(self._get_value())
 
     def __str__(self) -> str:
         """String representation of the value."""
-        return str(self._manager.get_value_at_path(self._path))
+        return str(self._get_value())
 
     def __len__(self) -> int:
         """Length of the value."""
-        return len(self._manager.get_value_at_path(self._path))
+        return len(self._get_node())
 
     def __contains__(self, item: Any) -> bool:
         """Check if item is in the value."""
-        return item in self._manager.get_value_at_path(self._path)
+        return item in self._get_value()
 
     def __eq__(self, other: Any) -> bool:
         """Compare equality with another value."""
-        return self._manager.get_value_at_path(self._path) == other
+        return self._get_value() == other
 
     def __ne__(self, other: Any) -> bool:
         """Compare inequality with another value."""
-        return self._manager.get_value_at_path(self._path) != other
+        return self._get_value() != other
 
     def __hash__(self) -> int:
         """Hash the underlying value if hashable."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if isinstance(value, (str, int, float, bool, tuple)):
             return hash(value)
         raise TypeError(f"unhashable type: '{type(value).__name__}'")
 
     def __bool__(self) -> bool:
         """Truth value of the underlying value."""
-        return bool(self._manager.get_value_at_path(self._path))
+        return bool(self._get_value())
 
     def __int__(self) -> int:
         """Convert to int if possible."""
-        return int(self._manager.get_value_at_path(self._path))
+        return int(self._get_value())
 
     def __float__(self) -> float:
         """Convert to float if possible."""
-        return float(self._manager.get_value_at_path(self._path))
+        return float(self._get_value())
 
     def __add__(self, other: Any) -> Any:
         """Add operation for strings and lists."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if isinstance(value, str) and isinstance(other, str):
             return value + other
         if isinstance(value, list) and hasattr(other, "__iter__"):
@@ -202,7 +276,7 @@ class StateProxy:
 
     def __getattr__(self, name: str) -> Any:
         """Forward attribute access to the underlying value."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
 
         # Handle string methods
         if isinstance(value, str):
@@ -231,33 +305,44 @@ class StateProxy:
 
     def __iter__(self):
         """Make the proxy iterable."""
-        return iter(self._manager.get_value_at_path(self._path))
+        return iter(self._get_value())
 
     # Efficient list operations
+    @_locked
     def append(self, item: Any) -> None:
         """Append an item to a list."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_node()
         if not isinstance(value, list):
             raise TypeError(f"'append' not supported for type {type(value).__name__}")
 
         self._manager.add_operations(
-            [{"type": "set", "path": self._path + [str(len(value))], "value": item}]
+            [{"type": "set", "path": [*self._path, _index_key(len(value))], "value": item}]
         )
 
+    def batch(self):
+        """Collect the writes made inside a `with` block and schedule them once.
+
+        Example:
+            with controller.state.batch():
+                controller.state["status"] = "done"
+                controller.state["messages"].append(message)
+        """
+        return self._manager.batch()
+
     def extend(self, iterable: Any) -> None:
         """Extend a list with items from an iterable."""
         if isinstance(iterable, StateProxy):
-            iterable = iterable._manager.get_value_at_path(iterable._path)
+            iterable = iterable._get_value()
         self.__iadd__(iterable)
 
     def clear(self) -> None:
         """Clear a list or dictionary."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
 
         if isinstance(value, (list, dict)):
             empty_value = [] if isinstance(value, list) else {}
             self._manager.add_operations(
-                [{"type": "set", "path": self._path, "value": empty_value}]
+                [{"type": "set", "path": list(self._path), "value": empty_value}]
             )
         else:
             raise TypeError(f"'clear' not supported for type {type(value).__name__}")
@@ -265,7 +350,7 @@ class StateProxy:
     # Dictionary operations
     def get(self, key: Any, default: Any = None) -> Any:
         """Get dictionary value with default."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if not isinstance(value, dict):
             raise TypeError(f"'get' not supported for type {type(value).__name__}")
 
@@ -276,28 +361,29 @@ class StateProxy:
 
     def keys(self):
         """Dictionary keys view."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if not isinstance(value, dict):
             raise TypeError(f"'keys' not supported for type {type(value).__name__}")
         return value.keys()
 
     def values(self):
         """Dictionary values view."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if not isinstance(value, dict):
             raise TypeError(f"'values' not supported for type {type(value).__name__}")
         return value.values()
 
     def items(self):
         """Dictionary items view."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if not isinstance(value, dict):
             raise TypeError(f"'items' not supported for type {type(value).__name__}")
         return value.items()
 
+    @_locked
     def setdefault(self, key, default=None):
         """Set default value if key doesn't exist."""
-        value = self._manager.get_value_at_path(self._path)
+        value = self._get_value()
         if not isinstance(value, dict):
             raise TypeError(
                 f"'setdefault' not supported for type {type(value).__name__}"
@@ -309,29 +395,198 @@ class StateProxy:
         self[key] = default
         return default
 
-    # Unsupported operations that would be inefficient
+    @_locked
+    def update(self, *args, **kwargs) -> None:
+        """Update a dictionary, sending one set operation per key in one batch."""
+        value = self._get_node()
+        if not isinstance(value, dict):
+            raise TypeError(f"'update' not supported for type {type(value).__name__}")
+
+        updates = dict(*args, **kwargs)
+        if updates:
+            self._manager.add_operations(
+                [
+                    {"type": "set", "path": [*self._path, str(key)], "value": item}
+                    for key, item in updates.items()
+                ]
+            )
+
+    @_locked
+    def __delitem__(self, key: Union[str, int]) -> None:
+        """Delete a dictionary key or list element."""
+        value = self._get_node()
+        if isinstance(value, list):
+            str_key = _index_key(self._normalize_index(value, key))
+        elif isinstance(value, dict):
+            str_key = key if isinstance(key, str) else str(key)
+            if str_key not in value:
+                raise KeyError(key)
+        else:
+            raise TypeError(f"'del' not supported for type {type(value).__name__}")
+
+        self._manager.add_operations(
+            [{"type": "delete", "path": [*self._path, str_key]}]
+        )
+
+    @_locked
     def insert(self, index: int, item: Any) -> None:
-        """Not supported - would require sending entire list."""
-        raise NotImplementedError("Use indexing or append() instead")
+        """Insert an item into a list before `index`."""
+        value = self._get_node()
+        if not isinstance(value, list):
+            raise TypeError(f"'insert' not supported for type {type(value).__name__}")
 
-    def pop(self, *args):
-        """Not supported - would require sending entire collection."""
-        raise NotImplementedError(
-            "Would require sending the entire collection over the network"
+        # Clamp like list.insert does
+        start = index + len(value) if index < 0 else index
+        start = min(max(start, 0), len(value))
+        self._manager.add_operations(
+            [
+                {
+                    "type": "splice",
+                    "path": list(self._path),
+                    "start": start,
+                    "deleteCount": 0,
+                    "items": [item],
+                }
+            ]
         )
 
+    @_locked
+    def pop(self, *args):
+        """Remove and return a list element or dictionary value."""
+        value = self._get_value()
+
+        if isinstance(value, list):
+            if len(args) > 1:
+                raise TypeError(f"pop expected at most 1 argument, got {len(args)}")
+            if not value:
+                raise IndexError("pop from empty list")
+            index = self._normalize_index(value, args[0] if args else -1, IndexError)
+            item = value[index]
+            self._manager.add_operations(
+                [{"type": "delete", "path": [*self._path, _index_key(index)]}]
+            )
+            return item
+
+        if isinstance(value, dict):
+            if not 1 <= len(args) <= 2:
+                raise TypeError(f"pop expected 1 or 2 arguments, got {len(args)}")
+            key = args[0] if isinstance(args[0], str) else str(args[0])
+            if key not in value:
+                if len(args) == 2:
+                    return args[1]
+                raise KeyError(args[0])
+            item = value[key]
+            self._manager.add_operations(
+                [{"type": "delete", "path": [*self._path, key]}]
+            )
+            return item
+
+        raise TypeError(f"'pop' not supported for type {type(value).__name__}")
+
+    @_locked
     def remove(self, item: Any) -> None:
-        """Not supported - would require sending entire list."""
-        raise NotImplementedError(
-            "Would require sending the entire list over the network"
-        )
+        """Remove the first occurrence of an item from a list."""
+        value = self._get_value()
+        if not isinstance(value, list):
+            raise TypeError(f"'remove' not supported for type {type(value).__name__}")
 
-    def update(self, *args, **kwargs):
-        """Not supported - would require sending entire dictionary."""
-        raise NotImplementedError("Use individual assignments instead")
+        index = value.index(item)
+        self._manager.add_operations(
+            [{"type": "delete", "path": [*self._path, _index_key(index)]}]
+        )
 
+    @_locked
     def popitem(self):
-        """Not supported - would require sending entire dictionary."""
-        raise NotImplementedError(
-            "Would require sending the entire dictionary over the network"
+        """Remove and return the last inserted (key, value) pair of a dictionary."""
+        value = self._get_value()
+        if not isinstance(value, dict):
+            raise TypeError(
+                f"'popitem' not supported for type {type(value).__name__}"
+            )
+        if not value:
+            raise KeyError("popitem(): dictionary is empty")
+
+        key = next(reversed(value))
+        item = value[key]
+        self._manager.add_operations(
+            [{"type": "delete", "path": [*self._path, key]}]
         )
+        return key, item
+
+    @_locked
+    def increment(self, key: Union[str, int], amount: Union[int, float] = 1) -> None:
+        """Add `amount` to the number at `key`, starting from 0 if it is unset."""
+        value = self._get_node()
+        if isinstance(value, list):
+            str_key = _index_key(self._normalize_index(value, key))
+        else:
+            str_key = key if isinstance(key, str) else str(key)
+
+        self._manager.add_operations(
+            [{"type": "increment", "path": [*self._path, str_key], "value": amount}]
+        )
+
+    @staticmethod
+    def _normalize_index(value: list, key: Any, error: type = KeyError) -> int:
+        """Resolve a possibly negative list index, validating its bounds."""
+        try:
+            index = int(key)
+        except (ValueError, TypeError):
+            raise error(key)
+        if index < 0:
+            index += len(value)
+        if index < 0 or index >= len(value):
+            raise error(key)
+        return index
+
+
+# Interned string keys for the most common list indices
+_INDEX_KEYS = tuple(str(index) for index in range(1024))
+
+
+def _index_key(index: int) -> str:
+    if index < len(_INDEX_KEYS):
+        return _INDEX_KEYS[index]
+    return str(index)
+
+
+def copy_json_value(value: Any) -> Any:
+    """Deep copy a JSON-like value, resolving StateProxy objects.
+
+    Only dicts and lists are copied; other values are immutable in practice.
+    """
+    if isinstance(value, dict):
+        return {key: copy_json_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json_value(item) for item in value]
+    if isinstance(value, StateProxy):
+        return copy_json_value(value._get_value())
+    return value
+
+
+def resolve_path(node: Any, path: Sequence[str]) -> Any:
+    """Walk `path` down from `node`, raising KeyError for invalid paths."""
+    if not path:
+        return node
+
+    # If state is None, we can't navigate further
+    if node is None:
+        raise KeyError(path[0])
+
+    current = node
+
+    for key in path:
+        try:
+            if isinstance(current, list):
+                idx = int(key)
+                if idx < 0 or idx >= len(current):
+                    raise KeyError(key)
+                current = current[idx]
+            elif isinstance(current, dict):
+                current = current[key]
+            else:
+                raise KeyError(key)
+        except (ValueError, KeyError, IndexError):
+            raise KeyError(key)
+
+    return current
@@ -0,0 +1,385 @@
+import types
+import typing
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+from assistant_stream.state_proxy import copy_json_value
+
+# Avoid circular import
+if TYPE_CHECKING:
+    from assistant_stream.state_manager import StateManager
+
+
+class _SchemaNode:
+    """Normalized schema of one value: its kind and, for containers, children."""
+
+    __slots__ = ("kind", "fields", "additional", "items")
+
+    def __init__(
+        self,
+        kind: str,
+        fields: Optional[Dict[str, "_SchemaNode"]] = None,
+        additional: Optional["_SchemaNode"] = None,
+        items: Optional["_SchemaNode"] = None,
+    ):
+        # One of object, array, string, number, boolean, null or any
+        self.kind = kind
+        self.fields = fields or {}
+        self.additional = additional
+        self.items = items
+
+
+_ANY = _SchemaNode("any")
+
+# `X | Y` annotations have their own type on Python 3.10+
+_UNION_TYPES = (Union, getattr(types, "UnionType", Union))
+
+
+class StateSchema:
+    """Shape of a run's state, used to compile StateWriters.
+
+    Accepts a TypedDict class or a JSON Schema dictionary. Paths are
+    validated against the schema once, when a writer is created; the writer
+    then mutates the state without interpreting its path again.
+
+    Example:
+        class Message(TypedDict):
+            role: str
+            content: str
+
+        class ThreadState(TypedDict):
+            messages: List[Message]
+
+        schema = StateSchema(ThreadState)
+    """
+
+    def __init__(self, schema: Union[type, Dict[str, Any]]):
+        if isinstance(schema, dict):
+            self._root = _from_json_schema(schema)
+        else:
+            self._root = _from_type(schema, {})
+        self._compiled: Dict[Tuple[Any, ...], Tuple[_SchemaNode, Tuple[bool, ...]]] = {}
+
+    def compile(self, path: Sequence[Union[str, int]]) -> Tuple[str, Tuple[bool, ...]]:
+        """Validate `path` and return the kind of its value and which of its
+        segments are list indices.
+
+        Raises:
+            KeyError: If the path names a key the schema doesn't allow
+            TypeError: If the path indexes into a value that isn't a container
+        """
+        pattern = tuple(
+            int if isinstance(key, int) or (isinstance(key, str) and key.isdigit()) else key
+            for key in path
+        )
+        compiled = self._compiled.get(pattern)
+        if compiled is None:
+            compiled = self._compiled[pattern] = self._walk(path)
+        node, indices = compiled
+        return node.kind, indices
+
+    def _walk(self, path: Sequence[Union[str, int]]) -> Tuple[_SchemaNode, Tuple[bool, ...]]:
+        node = self._root
+        indices = []
+        for depth, key in enumerate(path):
+            if node.kind == "object":
+                key = str(key)
+                if key in node.fields:
+                    node = node.fields[key]
+                elif node.additional is not None:
+                    node = node.additional
+                else:
+                    raise KeyError(f"Invalid path: [{', '.join(map(str, path[: depth + 1]))}]")
+                indices.append(False)
+            elif node.kind == "array":
+                if not (isinstance(key, int) or str(key).isdigit()) or int(key) < 0:
+                    raise KeyError(f"Invalid list index: {key}")
+                node = node.items or _ANY
+                indices.append(True)
+            elif node.kind == "any":
+                # Unknown shape below this point; writers fall back to the
+                # generic update path
+                return _ANY, ()
+            else:
+                raise TypeError(
+                    f"Expected object or array at path [{', '.join(map(str, path[:depth]))}]"
+                )
+        return node, tuple(indices)
+
+
+class StateWriter:
+    """Precompiled writer for one state path.
+
+    The path was validated against the StateSchema when the writer was
+    created. Writes build their operation with the precomputed path and
+    mutate the cached parent container directly, skipping the generic path
+    walk in StateManager. After a snapshot the containers along the path
+    are copied once, and the copies are cached. Whenever the fast path does
+    not apply (the parent was replaced by a write elsewhere and is missing,
+    or the current value doesn't have the expected type) the write goes
+    through the generic update path instead, with the same results.
+
+    Example:
+        content = controller.writer(["messages", 3, "content"])
+        for token in tokens:
+            content.append_text(token)
+    """
+
+    __slots__ = (
+        "_manager",
+        "_path",
+        "_buffer_key",
+        "_parent_keys",
+        "_key",
+        "_kind",
+        "_node",
+        "_version",
+    )
+
+    def __init__(self, manager: "StateManager", path: Sequence[Union[str, int]]):
+        if not path:
+            raise ValueError("A state writer needs a non-empty path")
+        kind, indices = manager._schema.compile(path)
+        self._manager = manager
+        self._path = [str(key) for key in path]
+        self._buffer_key = tuple(self._path)
+        self._kind = kind
+        if len(indices) == len(path):
+            keys = [int(key) if index else str(key) for key, index in zip(path, indices)]
+            self._parent_keys: Optional[Tuple[Any, ...]] = tuple(keys[:-1])
+            self._key = keys[-1]
+        else:
+            self._parent_keys = None
+            self._key = None
+        self._node = None
+        self._version = -1
+
+    @property
+    def path(self) -> List[str]:
+        """Path the writer writes to."""
+        return list(self._path)
+
+    def _container(self) -> Any:
+        """Parent container of the path, or None to use the generic path."""
+        manager = self._manager
+        if self._parent_keys is None:
+            return None
+        owned = manager._owned
+        # A snapshot taken since doesn't change the version, but shares the
+        # cached container
+        if self._version != manager._version or (
+            owned is not None and id(self._node) not in owned
+        ):
+            if owned is not None:
+                manager._unshare_path(self._path, len(self._path) - 1)
+            node = manager._state_data
+            try:
+                for key in self._parent_keys:
+                    node = node[key]
+            except (KeyError, IndexError, TypeError):
+                node = None
+            # The state may not match the schema; only use containers of the
+            # expected type
+            expected = list if type(self._key) is int else dict
+            if not isinstance(node, expected) or (
+                owned is not None and id(node) not in owned
+            ):
+                node = None
+            self._node = node
+            self._version = manager._version
+        return self._node
+
+    def _check_kind(self, *kinds: str) -> None:
+        if self._kind not in kinds and self._kind != "any":
+            raise TypeError(
+                f"Expected {' or '.join(kinds)} at path [{', '.join(self._path)}], "
+                f"the schema has {self._kind}"
+            )
+
+    def set(self, value: Any) -> None:
+        """Set the value at the path."""
+        manager = self._manager
+        operation = {"type": "set", "path": self._path, "value": value}
+        with manager._lock:
+            container = self._container()
+            key = self._key
+            if container is None or (type(key) is int and key >= len(container)):
+                manager._apply_operation_to_local_state(operation)
+            elif value is None and type(key) is str and key not in container:
+                # Like the generic path, setting a missing key to None is a no-op
+                pass
+            else:
+                value = copy_json_value(value)
+                manager._version += 1
+                manager._discard_text_buffers(self._buffer_key)
+                container[key] = value
+                # Setting a child doesn't replace the parent container
+                self._version = manager._version
+            manager._enqueue_operations([operation])
+
+    def append_text(self, text: str) -> None:
+        """Append text to the string at the path."""
+        self._check_kind("string")
+        manager = self._manager
+        operation = {"type": "append-text", "path": self._path, "value": text}
+        with manager._lock:
+            buffer = manager._text_buffers.get(self._buffer_key)
+            if buffer is not None:
+                buffer.parts.append(text)
+            else:
+                container = self._container()
+                key = self._key
+                if (
+                    container is None
+                    or (type(key) is int and key >= len(container))
+                    or type(container[key]) is not str
+                ):
+                    manager._apply_operation_to_local_state(operation)
+                else:
+                    container[key] += text
+                    manager._open_text_buffer(self._buffer_key, container, key)
+            manager._enqueue_operations([operation])
+
+    def append_list(self, items: Sequence[Any]) -> None:
+        """Append items to the list at the path."""
+        self._check_kind("array")
+        manager = self._manager
+        operation = {"type": "append-list", "path": self._path, "items": list(items)}
+        with manager._lock:
+            container = self._container()
+            key = self._key
+            if (
+                container is None
+                or (type(key) is int and key >= len(container))
+                or type(container[key]) is not list
+                # The list itself may be shared with a snapshot
+                or (manager._owned is not None and id(container[key]) not in manager._owned)
+            ):
+                manager._apply_operation_to_local_state(operation)
+            else:
+                container[key].extend(copy_json_value(operation["items"]))
+            manager._enqueue_operations([operation])
+
+    def increment(self, amount: Union[int, float] = 1) -> None:
+        """Add `amount` to the number at the path, starting from 0 if unset."""
+        self._check_kind("number")
+        manager = self._manager
+        operation = {"type": "increment", "path": self._path, "value": amount}
+        with manager._lock:
+            container = self._container()
+            key = self._key
+            if container is None or (type(key) is int and key >= len(container)):
+                manager._apply_operation_to_local_state(operation)
+            else:
+                current = container[key] if type(key) is int else container.get(key)
+                if current is None:
+                    container[key] = amount
+                elif type(current) is int or type(current) is float:
+                    container[key] = current + amount
+                else:
+                    manager._apply_operation_to_local_state(operation)
+            manager._enqueue_operations([operation])
+
+
+def _from_type(tp: Any, seen: Dict[Any, _SchemaNode]) -> _SchemaNode:
+    """Convert a type annotation into a schema node."""
+    if tp is Any:
+        return _ANY
+    if tp is None or tp is type(None):
+        return _SchemaNode("null")
+    if tp is str:
+        return _SchemaNode("string")
+    if tp is bool:
+        return _SchemaNode("boolean")
+    if tp in (int, float):
+        return _SchemaNode("number")
+
+    if _is_typeddict(tp):
+        if tp in seen:
+            return seen[tp]
+        node = seen[tp] = _SchemaNode("object")
+        for key, field in typing.get_type_hints(tp).items():
+            node.fields[key] = _from_type(field, seen)
+        return node
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin in _UNION_TYPES:
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            return _from_type(options[0], seen)
+        nodes = [_from_type(arg, seen) for arg in options]
+        if all(node.kind == nodes[0].kind for node in nodes) and nodes[0].kind not in (
+            "object",
+            "array",
+        ):
+            return nodes[0]
+        return _ANY
+    if origin is typing.Literal:
+        return _literal_node(args)
+    if tp is list or origin is list:
+        return _SchemaNode("array", items=_from_type(args[0], seen) if args else _ANY)
+    if tp is dict or origin is dict:
+        return _SchemaNode("object", additional=_from_type(args[1], seen) if args else _ANY)
+    return _ANY
+
+
+def _is_typeddict(tp: Any) -> bool:
+    # typing.is_typeddict is only available on Python 3.10+
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(tp, "__total__")
+
+
+def _from_json_schema(schema: Any) -> _SchemaNode:
+    """Convert a JSON Schema into a schema node."""
+    if not isinstance(schema, dict) or "$ref" in schema:
+        return _ANY
+    if "const" in schema:
+        return _literal_node([schema["const"]])
+    if "enum" in schema:
+        return _literal_node(schema["enum"])
+
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in schema:
+            options = [
+                option
+                for option in schema[combinator]
+                if not (isinstance(option, dict) and option.get("type") == "null")
+            ]
+            return _from_json_schema(options[0]) if len(options) == 1 else _ANY
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kinds = [k for k in kind if k != "null"]
+        kind = kinds[0] if len(kinds) == 1 else None
+    if kind == "object":
+        additional = schema.get("additionalProperties", True)
+        return _SchemaNode(
+            "object",
+            fields={
+                key: _from_json_schema(field)
+                for key, field in schema.get("properties", {}).items()
+            },
+            additional=(
+                None
+                if additional is False
+                else _ANY if additional is True else _from_json_schema(additional)
+            ),
+        )
+    if kind == "array":
+        return _SchemaNode("array", items=_from_json_schema(schema.get("items")))
+    if kind == "integer":
+        return _SchemaNode("number")
+    if kind in ("string", "number", "boolean", "null"):
+        return _SchemaNode(kind)
+    return _ANY
+
+
+def _literal_node(values: Sequence[Any]) -> _SchemaNode:
+    kinds = {
+        "null" if value is None
+        else "boolean" if isinstance(value, bool)
+        else "number" if isinstance(value, (int, float))
+        else "string" if isinstance(value, str)
+        else "any"
+        for value in values
+    }
+    return _SchemaNode(kinds.pop()) if len(kinds) == 1 else _ANY
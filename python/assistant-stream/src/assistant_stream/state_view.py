@@ -0,0 +1,90 @@
+from typing import Any, List, Sequence, TYPE_CHECKING
+
+from assistant_stream.assistant_stream_chunk import ObjectStreamOperation
+from assistant_stream.state_proxy import StateProxy, resolve_path
+
+# Avoid circular import
+if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+
+    from assistant_stream.state_manager import StateManager
+
+
+class StateView:
+    """StateManager-like handle on the subtree at a fixed path.
+
+    Paths passed to a view are relative to its root. Operations are
+    prefixed with the root path and sent through the underlying manager.
+    The root node is resolved once and cached until the state structure
+    changes, and operations added through the view are applied from it, so
+    they only walk the relative path. Writes through `state` go through the
+    manager like any proxy write.
+
+    Example:
+        subgraph = controller.scope(["messages", "3", "artifact"])
+        subgraph.add_operations(
+            [{"type": "append-text", "path": ["text"], "value": token}]
+        )
+        subgraph.state["status"] = "running"
+    """
+
+    __slots__ = ("_manager", "_path", "_proxy")
+
+    def __init__(self, state_manager: "StateManager", path: Sequence[Any]):
+        self._manager = state_manager
+        self._path = tuple(str(key) for key in path)
+        self._proxy = StateProxy(state_manager, self._path)
+
+    @property
+    def path(self) -> List[str]:
+        """Path of the view's root in the full state."""
+        return list(self._path)
+
+    @property
+    def state(self) -> StateProxy:
+        """State proxy rooted at the view's path."""
+        return self._proxy
+
+    @property
+    def state_data(self) -> Any:
+        """Current value at the view's path."""
+        return self._proxy._get_value()
+
+    def get_value_at_path(self, path: Sequence[str]) -> Any:
+        """Get the value at a relative path, raising KeyError for invalid paths."""
+        node = self._proxy._get_node()
+        if self._manager._text_buffers:
+            self._manager._materialize_text_buffers(self._path + tuple(path))
+        return resolve_path(node, path)
+
+    def add_operations(self, operations: List[ObjectStreamOperation]) -> None:
+        """Add operations with paths relative to the view's root."""
+        prefix = self._path
+        operations = [
+            {**operation, "path": [*prefix, *operation["path"]]} for operation in operations
+        ]
+        manager = self._manager
+        with manager._lock:
+            for operation in operations:
+                manager._apply_operation_to_local_state(operation, self._proxy)
+
+            manager._enqueue_operations(operations)
+
+    def set_value(self, path: Sequence[str], value: Any) -> None:
+        """Assign `value` at a relative path, see StateManager.set_value."""
+        if self._manager._diff_policy is None:
+            self.add_operations([{"type": "set", "path": list(path), "value": value}])
+            return
+        self._manager.set_value([*self._path, *path], value)
+
+    def view(self, path: Sequence[Any]) -> "StateView":
+        """Return a handle on a subtree of this view."""
+        return StateView(self._manager, (*self._path, *path))
+
+    def batch(self) -> "AbstractContextManager[None]":
+        """Collect writes and schedule them once, see StateManager.batch."""
+        return self._manager.batch()
+
+    def flush(self) -> None:
+        """Flush the pending operations of the underlying manager."""
+        self._manager.flush()
@@ -26,15 +26,15 @@ async def test_assistant_transport_encoder_format():
 
     # All lines except the last should be SSE formatted chunks
     for line in collected_output[:-1]:
-        assert line.startswith("data: ")
-        assert line.endswith("\n\n")
+        assert line.startswith(b"data: ")
+        assert line.endswith(b"\n\n")
         # Verify it's valid JSON (excluding the "data: " prefix and newlines)
         json_str = line[6:-2]  # Remove "data: " and "\n\n"
         chunk_data = json.loads(json_str)
         assert "type" in chunk_data
 
     # Last line should be [DONE]
-    assert collected_output[-1] == "data: [DONE]\n\n"
+    assert collected_output[-1] == b"data: [DONE]\n\n"
 
 
 @pytest.mark.anyio
@@ -52,7 +52,7 @@ async def test_assistant_transport_encoder_text_chunks():
     encoded = encoder.encode_stream(chunks)
 
     async for line in encoded:
-        if line != "data: [DONE]\n\n":
+        if line != b"data: [DONE]\n\n":
             json_str = line[6:-2]  # Remove "data: " and "\n\n"
             chunk_data = json.loads(json_str)
             collected_chunks.append(chunk_data)
@@ -78,7 +78,7 @@ async def test_assistant_transport_encoder_reasoning():
     encoded = encoder.encode_stream(chunks)
 
     async for line in encoded:
-        if line != "data: [DONE]\n\n":
+        if line != b"data: [DONE]\n\n":
             json_str = line[6:-2]
             chunk_data = json.loads(json_str)
             collected_chunks.append(chunk_data)
@@ -112,7 +112,7 @@ async def test_assistant_transport_encoder_tool_calls():
     encoded = encoder.encode_stream(chunks)
 
     async for line in encoded:
-        if line != "data: [DONE]\n\n":
+        if line != b"data: [DONE]\n\n":
             json_str = line[6:-2]
             chunk_data = json.loads(json_str)
             collected_chunks.append(chunk_data)
@@ -129,3 +129,48 @@ async def test_assistant_transport_encoder_tool_calls():
     tool_result_chunks = [c for c in collected_chunks if c["type"] == "tool-result"]
     assert len(tool_result_chunks) == 1
     assert tool_result_chunks[0]["toolCallId"] == "tool_1"
+
+
+def test_assistant_transport_field_maps_match_chunk_attributes():
+    """Test that precomputed field maps convert every chunk class like vars()."""
+    from assistant_stream.assistant_stream_chunk import (
+        DataChunk,
+        ErrorChunk,
+        ReasoningDeltaChunk,
+        SourceChunk,
+        TextDeltaChunk,
+        ToolCallBeginChunk,
+        ToolCallDeltaChunk,
+        ToolResultChunk,
+        UpdateStateChunk,
+    )
+
+    class CustomChunk:
+        def __init__(self):
+            self.type = "custom"
+            self.some_value = 1
+
+    encoder = AssistantTransportEncoder()
+    chunks = [
+        TextDeltaChunk(text_delta="a", parent_id="p"),
+        ReasoningDeltaChunk(reasoning_delta="b"),
+        ToolCallBeginChunk(tool_call_id="t", tool_name="n"),
+        ToolCallDeltaChunk(tool_call_id="t", args_text_delta="{}"),
+        ToolResultChunk(tool_call_id="t", result=1, is_error=True),
+        DataChunk(data=[1]),
+        ErrorChunk(error="e"),
+        UpdateStateChunk(operations=[]),
+        SourceChunk(id="s", url="u"),
+        CustomChunk(),
+    ]
+
+    for chunk in chunks:
+        expected = {"type": chunk.type}
+        expected.update(
+            (encoder._snake_to_camel(key), value)
+            for key, value in vars(chunk).items()
+            if key != "type"
+        )
+        converted = encoder._chunk_to_dict(chunk)
+        assert converted == expected
+        assert list(converted) == list(expected)
@@ -0,0 +1,104 @@
+import pytest
+
+pytest.importorskip("msgpack")
+
+from assistant_stream import create_run, RunController
+from assistant_stream.assistant_stream_chunk import (
+    DataChunk,
+    ErrorChunk,
+    ReasoningDeltaChunk,
+    SourceChunk,
+    TextDeltaChunk,
+    ToolCallBeginChunk,
+    ToolCallDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization import (
+    BinaryStreamDecoder,
+    BinaryStreamEncoder,
+    BinaryStreamResponse,
+)
+from assistant_stream.state_manager import StateManager
+
+CHUNKS = [
+    TextDeltaChunk(text_delta="Hello", parent_id="p1"),
+    ReasoningDeltaChunk(reasoning_delta="hmm"),
+    ToolCallBeginChunk(tool_call_id="call_1", tool_name="search"),
+    ToolCallDeltaChunk(tool_call_id="call_1", args_text_delta='{"q":'),
+    ToolResultChunk(tool_call_id="call_1", result={"hits": [1, 2]}, artifact=b"\x00", is_error=True),
+    DataChunk(data={"k": [None, 1.5, True]}),
+    ErrorChunk(error="boom"),
+    UpdateStateChunk(
+        operations=[
+            {"type": "set", "path": ["a"], "value": {"b": 1}},
+            {"type": "append-text", "path": ["a", "c"], "value": "ü"},
+            {"type": "splice", "path": ["l"], "start": 0, "deleteCount": 1, "items": [2]},
+        ]
+    ),
+    SourceChunk(id="s1", url="https://example.com", title="Example"),
+]
+
+
+def test_every_chunk_type_round_trips():
+    """Test that decoding the encoded chunks returns equal chunks."""
+    encoder = BinaryStreamEncoder()
+    data = b"".join(encoder.encode_chunk(chunk) for chunk in CHUNKS)
+
+    assert BinaryStreamDecoder().feed(data) == CHUNKS
+
+
+def test_decoder_accepts_arbitrary_splits():
+    """Test that frames split across feeds are decoded once complete."""
+    encoder = BinaryStreamEncoder()
+    data = b"".join(encoder.encode_chunk(chunk) for chunk in CHUNKS)
+    decoder = BinaryStreamDecoder()
+
+    chunks = []
+    for i in range(len(data)):
+        chunks.extend(decoder.feed(data[i : i + 1]))
+    decoder.close()
+
+    assert chunks == CHUNKS
+
+
+@pytest.mark.asyncio
+async def test_state_proxy_values_are_encoded():
+    manager = StateManager(lambda ops: None, {"result": {"x": [1]}})
+    encoder = BinaryStreamEncoder()
+    frame = encoder.encode_chunk(ToolResultChunk(tool_call_id="c", result=manager.state["result"]))
+
+    assert BinaryStreamDecoder().feed(frame)[0].result == {"x": [1]}
+
+
+def test_decoder_rejects_invalid_input():
+    frame = BinaryStreamEncoder().encode_chunk(ErrorChunk(error="boom"))
+
+    decoder = BinaryStreamDecoder()
+    decoder.feed(frame[:-1])
+    with pytest.raises(ValueError):
+        decoder.close()
+
+    with pytest.raises(ValueError):
+        BinaryStreamDecoder(max_frame_size=4).feed(frame)
+
+    with pytest.raises(ValueError):
+        BinaryStreamDecoder().feed(b"\x00\x00\x00\x02\x91\xa1")
+
+
+@pytest.mark.asyncio
+async def test_response_streams_binary_frames():
+    """Test that BinaryStreamResponse output decodes to the run's chunks."""
+
+    async def run_callback(controller: RunController):
+        controller.append_text("Hello")
+        controller.state["x"] = 1
+        await controller.add_tool_call("search", "call_1")
+
+    response = BinaryStreamResponse(create_run(run_callback, state={}))
+    chunks = [
+        chunk async for chunk in BinaryStreamDecoder().decode_stream(response.body_iterator)
+    ]
+
+    assert response.media_type == "application/vnd.assistant-stream+msgpack"
+    assert [chunk.type for chunk in chunks] == ["text-delta", "update-state", "tool-call-begin"]
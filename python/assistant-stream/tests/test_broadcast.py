@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from assistant_stream import (
+    BroadcastOverflowError,
+    RunBroadcast,
+    RunController,
+)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_run():
+    """Test that every subscriber receives the chunks of a single run."""
+    calls = 0
+
+    async def run_callback(controller: RunController):
+        nonlocal calls
+        calls += 1
+        controller.append_text("Hello")
+        controller.append_text(" world")
+
+    broadcast = RunBroadcast(run_callback)
+    first = broadcast.subscribe()
+    second = broadcast.subscribe()
+
+    first_chunks, second_chunks = await asyncio.gather(
+        _collect(first), _collect(second)
+    )
+
+    assert calls == 1
+    assert [c.text_delta for c in first_chunks] == ["Hello", " world"]
+    assert [c.text_delta for c in second_chunks] == ["Hello", " world"]
+
+
+@pytest.mark.asyncio
+async def test_late_joiner_gets_compacted_snapshot():
+    """Test that a late joiner receives merged history and a state snapshot."""
+    release = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("Hel")
+        controller.append_text("lo")
+        controller.state["messages"].append({"content": ""})
+        controller.state["messages"][0]["content"] += "Hi"
+        await release.wait()
+        controller.state["messages"][0]["content"] += "!"
+
+    broadcast = RunBroadcast(run_callback, state={"messages": []})
+    early = broadcast.subscribe()
+    early_task = asyncio.create_task(_collect(early))
+    await asyncio.sleep(0.01)
+
+    late = broadcast.subscribe()
+    release.set()
+    late_chunks = await _collect(late)
+    await early_task
+
+    assert late_chunks[0].type == "text-delta"
+    assert late_chunks[0].text_delta == "Hello"
+    assert late_chunks[1].type == "update-state"
+    assert late_chunks[1].operations == [
+        {"type": "set", "path": [], "value": {"messages": [{"content": "Hi"}]}}
+    ]
+    assert late_chunks[2].operations == [
+        {"type": "set", "path": ["messages", "0", "content"], "value": "Hi!"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_stall_others():
+    """Test that an overflowing subscriber is dropped without blocking the run."""
+
+    async def run_callback(controller: RunController):
+        for i in range(10):
+            controller.append_text(str(i))
+            await asyncio.sleep(0)
+
+    broadcast = RunBroadcast(run_callback, max_subscriber_chunks=3)
+    slow = broadcast.subscribe()
+    fast_chunks = await _collect(broadcast.subscribe())
+
+    assert len(fast_chunks) == 10
+    with pytest.raises(BroadcastOverflowError):
+        await _collect(slow)
+
+
+async def _collect(stream):
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+    return chunks
@@ -0,0 +1,396 @@
+import asyncio
+import time
+
+import pytest
+from assistant_stream import create_run, RunController
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_text_within_tick():
+    """Test that adjacent text deltas are merged into a single chunk."""
+
+    async def run_callback(controller: RunController):
+        for token in ["Hel", "lo", " wor", "ld"]:
+            controller.append_text(token)
+
+    chunks = await collect(create_run(run_callback, coalesce_text_ms=0))
+
+    assert [c.type for c in chunks] == ["text-delta"]
+    assert chunks[0].text_delta == "Hello world"
+
+
+@pytest.mark.asyncio
+async def test_coalesce_text_keeps_ordering():
+    """Test that coalescing never reorders deltas relative to other chunks."""
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+        controller.append_reasoning("thinking")
+        controller.with_parent_id("p1").append_text("c")
+        controller.append_text("d")
+        controller.state["x"] = 1
+        controller.append_text("e")
+        controller.add_data({"k": "v"})
+        controller.append_text("f")
+
+    chunks = await collect(create_run(run_callback, state={}, coalesce_text_ms=0))
+
+    assert [(c.type, getattr(c, "parent_id", None)) for c in chunks] == [
+        ("text-delta", None),
+        ("reasoning-delta", None),
+        ("text-delta", "p1"),
+        ("text-delta", None),
+        ("update-state", None),
+        ("text-delta", None),
+        ("data", None),
+        ("text-delta", None),
+    ]
+    assert [c.text_delta for c in chunks if c.type == "text-delta"] == [
+        "ab",
+        "c",
+        "d",
+        "e",
+        "f",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_text_time_window():
+    """Test that deltas across loop ticks are merged within the time window."""
+
+    async def run_callback(controller: RunController):
+        for token in ["a", "b", "c"]:
+            controller.append_text(token)
+            await asyncio.sleep(0)
+
+    chunks = await collect(create_run(run_callback, coalesce_text_ms=50))
+
+    assert [c.text_delta for c in chunks] == ["abc"]
+
+
+@pytest.mark.asyncio
+async def test_max_text_batch():
+    """Test that max_text_batch caps the number of merged deltas."""
+
+    async def run_callback(controller: RunController):
+        for token in "abcde":
+            controller.append_text(token)
+
+    chunks = await collect(create_run(run_callback, max_text_batch=2))
+
+    assert [c.text_delta for c in chunks] == ["ab", "cd", "e"]
+
+
+@pytest.mark.asyncio
+async def test_async_producer_waits_for_buffer_space():
+    """Test that async producers suspend while the run buffer is full."""
+    max_depth = 0
+
+    async def run_callback(controller: RunController):
+        nonlocal max_depth
+        for i in range(20):
+            await controller.append_text_async(str(i))
+            max_depth = max(max_depth, controller._queue.qsize())
+
+    chunks = []
+    async for chunk in create_run(run_callback, max_buffered_chunks=2):
+        chunks.append(chunk)
+        await asyncio.sleep(0)
+
+    assert "".join(c.text_delta for c in chunks) == "".join(map(str, range(20)))
+    assert max_depth <= 2
+
+
+@pytest.mark.asyncio
+async def test_overflow_coalesce_merges_deltas():
+    """Test that sync producers merge deltas while the buffer is full."""
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        for token in "bcd":
+            controller.append_text(token)
+        controller.add_data(1)
+
+    chunks = await collect(create_run(run_callback, max_buffered_chunks=1))
+
+    assert [c.type for c in chunks] == ["text-delta", "text-delta", "data"]
+    assert [c.text_delta for c in chunks[:2]] == ["a", "bcd"]
+
+
+@pytest.mark.asyncio
+async def test_overflow_raise():
+    """Test that the raise policy surfaces a full buffer to sync producers."""
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+
+    with pytest.raises(asyncio.QueueFull):
+        await collect(
+            create_run(run_callback, max_buffered_chunks=1, overflow="raise")
+        )
+
+
+@pytest.mark.asyncio
+async def test_overflow_block_on_loop_thread_raises():
+    """Test that the block policy raises instead of ignoring the limit."""
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+
+    with pytest.raises(RuntimeError, match="worker threads"):
+        await collect(
+            create_run(run_callback, max_buffered_chunks=1, overflow="block")
+        )
+
+
+@pytest.mark.asyncio
+async def test_overflow_block_waits_in_worker_threads():
+    """Test that the block policy holds worker threads until there is room."""
+    max_backlog = 0
+
+    async def run_callback(controller: RunController):
+        def produce():
+            nonlocal max_backlog
+            for i in range(200):
+                controller.append_text(f"{i},")
+                # Chunks still in flight through call_soon_threadsafe count too
+                backlog = controller._queue.qsize() + controller._writer._scheduled
+                max_backlog = max(max_backlog, backlog)
+
+        await asyncio.to_thread(produce)
+
+    chunks = []
+    async for chunk in create_run(run_callback, max_buffered_chunks=2, overflow="block"):
+        chunks.append(chunk)
+        await asyncio.sleep(0.001)
+
+    assert "".join(c.text_delta for c in chunks) == "".join(f"{i}," for i in range(200))
+    assert max_backlog <= 2
+
+
+@pytest.mark.asyncio
+async def test_worker_thread_chunks_precede_end_of_stream():
+    """Test that chunks scheduled by worker threads are not cut off."""
+    import threading
+
+    async def run_callback(controller: RunController):
+        def produce():
+            controller.append_text("from-thread")
+            controller.add_data("thread")
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        thread.join()
+        controller.add_data("loop")
+
+    chunks = await collect(create_run(run_callback))
+
+    assert [getattr(c, "text_delta", None) or c.data for c in chunks] == [
+        "from-thread",
+        "thread",
+        "loop",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_text_from_worker_threads():
+    """Test that deltas from worker threads are neither lost nor reordered."""
+    import sys
+
+    async def run_callback(controller: RunController):
+        def produce(index):
+            child = controller.with_parent_id(f"t{index}")
+            for i in range(500):
+                child.append_text(f"{i},")
+
+        async def produce_on_loop():
+            for i in range(500):
+                controller.append_text(f"{i},")
+                await asyncio.sleep(0)
+
+        await asyncio.gather(
+            produce_on_loop(),
+            *(asyncio.to_thread(produce, index) for index in range(4)),
+        )
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        chunks = await collect(create_run(run_callback, coalesce_text_ms=0))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    expected = "".join(f"{i}," for i in range(500))
+    for parent_id in [None, "t0", "t1", "t2", "t3"]:
+        text = "".join(c.text_delta for c in chunks if c.parent_id == parent_id)
+        assert text == expected
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_cancels_run():
+    """Test that closing the stream cancels the callback and substreams."""
+    callback_cancelled = asyncio.Event()
+    on_cancel_called = asyncio.Event()
+    run_controller = None
+
+    async def run_callback(controller: RunController):
+        nonlocal run_controller
+        run_controller = controller
+        tool = await controller.add_tool_call("slow_tool", "tool_1")
+        tool.append_args_text("{}")
+        controller.append_text("Hello")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            callback_cancelled.set()
+            raise
+
+    chunks = create_run(run_callback, on_cancel=on_cancel_called.set)
+    first = await chunks.__anext__()
+    assert first.type in ("tool-call-begin", "text-delta")
+    await chunks.aclose()
+
+    await asyncio.wait_for(on_cancel_called.wait(), timeout=1)
+    assert callback_cancelled.is_set()
+    assert run_controller.is_cancelled
+    assert run_controller.cancelled.is_set()
+    assert all(task.done() for task in run_controller._stream_tasks)
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_releases_blocked_worker_threads():
+    """Test that a worker thread blocked on a full buffer is released."""
+    import threading
+
+    released = threading.Event()
+    errors = []
+
+    async def run_callback(controller: RunController):
+        def produce():
+            try:
+                while True:
+                    controller.append_text("x")
+                    time.sleep(0.005)
+            except asyncio.CancelledError as e:
+                errors.append(e)
+            finally:
+                released.set()
+
+        await asyncio.to_thread(produce)
+
+    chunks = create_run(run_callback, max_buffered_chunks=1, overflow="block")
+    await chunks.__anext__()
+    # Let the producer fill the buffer and block
+    await asyncio.sleep(0.05)
+    await chunks.aclose()
+
+    assert await asyncio.to_thread(released.wait, 1)
+    assert len(errors) == 1
+
+
+@pytest.mark.asyncio
+async def test_completed_run_is_not_cancelled():
+    """Test that a run that finishes normally does not invoke on_cancel."""
+    cancelled = []
+    run_controller = None
+
+    async def run_callback(controller: RunController):
+        nonlocal run_controller
+        run_controller = controller
+        controller.append_text("done")
+
+    await collect(create_run(run_callback, on_cancel=lambda: cancelled.append(True)))
+
+    assert cancelled == []
+    assert not run_controller.is_cancelled
+
+
+@pytest.mark.asyncio
+async def test_run_metrics():
+    """Test that run metrics are collected and reported at the end."""
+    reported = []
+    live = {}
+
+    async def run_callback(controller: RunController):
+        controller.append_text("Hello")
+        controller.append_text(" world")
+        controller.state["a"] = 1
+        controller.state["b"] = 2
+        await asyncio.sleep(0)
+        live.update(controller.metrics.snapshot())
+
+    await collect(create_run(run_callback, state={}, on_metrics=reported.append))
+
+    assert live["finished"] is False
+    assert len(reported) == 1
+    snapshot = reported[0].snapshot()
+    assert snapshot["finished"] is True
+    assert snapshot["cancelled"] is False
+    assert snapshot["chunk_counts"] == {"text-delta": 2, "update-state": 1}
+    assert snapshot["state_operations"] == 2
+    assert snapshot["state_batch_sizes"]["count"] == 1
+    assert snapshot["inter_chunk_gap_ms"]["count"] == 2
+    assert snapshot["queue_high_water"] >= 2
+    assert snapshot["time_to_first_chunk_ms"] <= snapshot["duration_ms"]
+
+
+def test_histogram_percentiles():
+    """Test percentile estimation of the metrics histogram."""
+    from assistant_stream.run_metrics import Histogram
+
+    histogram = Histogram([1, 10, 100])
+    for value in range(1, 101):
+        histogram.record(value)
+
+    assert histogram.percentile(0) == 1
+    assert 40 <= histogram.percentile(50) <= 60
+    assert 90 <= histogram.percentile(99) <= 100
+    assert Histogram([1]).percentile(50) is None
+
+
+@pytest.mark.asyncio
+async def test_scope_writes_below_its_path():
+    """Test that controller.scope() emits operations with the full path."""
+
+    async def run_callback(controller: RunController):
+        artifact = controller.scope(["artifacts", "0"])
+        artifact.state["content"] += "hello"
+        artifact.state["content"] += " world"
+
+    operations = [
+        operation
+        async for chunk in create_run(
+            run_callback, state={"artifacts": [{"content": ""}]}
+        )
+        if chunk.type == "update-state"
+        for operation in chunk.operations
+    ]
+
+    assert [operation["path"] for operation in operations] == [["artifacts", "0", "content"]]
+    assert operations[0]["value"] == "hello world"
+
+
+@pytest.mark.asyncio
+async def test_with_parent_id_shares_run_components():
+    """Test that a child controller reuses the parent's components."""
+    children = []
+
+    async def run_callback(controller: RunController):
+        child = controller.with_parent_id("p1")
+        children.append((controller, child))
+        child.append_text("a")
+
+    chunks = await collect(create_run(run_callback, state={}, coalesce_text_ms=0))
+
+    parent, child = children[0]
+    assert child._state_manager is parent._state_manager
+    assert child._text_coalescer is parent._text_coalescer
+    assert child._cancelled is parent._cancelled
+    assert [(c.text_delta, c.parent_id) for c in chunks] == [("a", "p1")]
@@ -0,0 +1,28 @@
+from assistant_stream.assistant_stream_chunk import SourceChunk, TextDeltaChunk
+from assistant_stream.serialization import DataStreamEncoder
+
+
+def test_data_stream_dispatches_by_class_and_type():
+    """Test that subclasses and other chunk objects are encoded by type."""
+
+    class TaggedTextDelta(TextDeltaChunk):
+        pass
+
+    class PlainError:
+        type = "error"
+        error = "boom"
+
+    class Unknown:
+        type = "unknown"
+
+    encoder = DataStreamEncoder()
+
+    assert encoder.encode_chunk(TextDeltaChunk(text_delta="a", parent_id="p")) == (
+        b'aui-text-delta:{"textDelta":"a","parentId":"p"}\n'
+    )
+    assert encoder.encode_chunk(TaggedTextDelta(text_delta="a")) == b'0:"a"\n'
+    assert encoder.encode_chunk(PlainError()) == b'3:"boom"\n'
+    assert encoder.encode_chunk(Unknown()) is None
+    assert encoder.encode_chunk(SourceChunk(id="s", url="u", title="t")) == (
+        b'h:{"sourceType":"url","id":"s","url":"u","title":"t"}\n'
+    )
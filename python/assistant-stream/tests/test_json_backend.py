@@ -0,0 +1,81 @@
+import importlib.util
+
+import pytest
+from assistant_stream.assistant_stream_chunk import (
+    TextDeltaChunk,
+    ToolResultChunk,
+    UpdateStateChunk,
+)
+from assistant_stream.serialization import (
+    DataStreamEncoder,
+    get_json_backend,
+)
+from assistant_stream.state_manager import StateManager
+
+BACKENDS = [
+    name
+    for name in ("json", "orjson", "msgspec")
+    if name == "json" or importlib.util.find_spec(name) is not None
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", BACKENDS)
+async def test_backends_produce_identical_bytes(name):
+    """Test that every backend encodes values and StateProxy objects alike."""
+    manager = StateManager(lambda _: None, {"user": {"name": "Zoë", "tags": ["a"]}})
+    value = {
+        "text": "héllo \"quoted\"\n",
+        "numbers": [0, -1, 2.5, True, None],
+        "proxy": manager.state["user"],
+    }
+
+    encoded = get_json_backend(name).dumps(value)
+
+    assert encoded == get_json_backend("json").dumps(value)
+    assert encoded == (
+        '{"text":"héllo \\"quoted\\"\\n","numbers":[0,-1,2.5,true,null],'
+        '"proxy":{"name":"Zoë","tags":["a"]}}'
+    ).encode()
+    with pytest.raises(TypeError):
+        get_json_backend(name).dumps({"x": object()})
+
+
+def test_backend_selection():
+    """Test that the fastest installed backend is the default."""
+    expected = next((name for name in ("orjson", "msgspec") if name in BACKENDS), "json")
+    assert get_json_backend().name == expected
+    with pytest.raises(ValueError):
+        get_json_backend("yaml")
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_data_stream_frames_are_bytes(name):
+    """Test that the data stream encoder emits complete byte frames."""
+    encoder = DataStreamEncoder(get_json_backend(name))
+
+    assert encoder.encode_chunk(TextDeltaChunk(text_delta="hi")) == b'0:"hi"\n'
+    assert encoder.encode_chunk(
+        ToolResultChunk(tool_call_id="t", result={"ok": 1})
+    ) == b'a:{"toolCallId":"t","result":{"ok":1}}\n'
+    assert encoder.encode_chunk(
+        UpdateStateChunk(operations=[{"type": "set", "path": ["a"], "value": 1}])
+    ) == b'aui-state:[{"type":"set","path":["a"],"value":1}]\n'
+
+
+@pytest.mark.parametrize("name", [name for name in BACKENDS if name != "msgspec"])
+def test_integers_beyond_64_bits(name):
+    """Test that integers orjson can't encode are encoded like the stdlib does."""
+    value = {"big": [2**70, -(2**64)], "small": 2**63 - 1}
+
+    assert get_json_backend(name).dumps(value) == (
+        b'{"big":[1180591620717411303424,-18446744073709551616],'
+        b'"small":9223372036854775807}'
+    )
+
+
+def test_non_finite_floats_differ():
+    """Test the documented difference for NaN, which is not a JSON value."""
+    assert get_json_backend("json").dumps([float("nan")]) == b"[NaN]"
+    if "orjson" in BACKENDS:
+        assert get_json_backend("orjson").dumps([float("nan")]) == b"[null]"
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from assistant_stream import create_run, RunController, RunRegistry, RunLogExpiredError
+from assistant_stream.serialization.assistant_transport import AssistantTransportEncoder
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_from_offset():
+    """Test that a subscriber can resume after the last event it received."""
+    release = asyncio.Event()
+    registry = RunRegistry()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+        await release.wait()
+        controller.append_text("c")
+
+    registry.start("run_1", create_run(run_callback))
+
+    first = registry.subscribe("run_1")
+    assert first.first_sequence == 0
+    assert (await first.__anext__()).text_delta == "a"
+    await first.aclose()
+
+    # Reconnect after event 0 while the run is still producing
+    resumed = registry.subscribe("run_1", last_event_id="0")
+    assert resumed.first_sequence == 1
+    release.set()
+
+    assert [c.text_delta async for c in resumed] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_log_retention_limits():
+    """Test that offsets dropped from the bounded log are rejected."""
+    registry = RunRegistry(max_chunks=2)
+
+    async def run_callback(controller: RunController):
+        for token in "abcd":
+            controller.append_text(token)
+
+    registry.start("run_1", create_run(run_callback))
+    await asyncio.sleep(0.01)
+
+    log = registry.get("run_1")
+    assert log.done
+    assert log.first_sequence == 2
+
+    with pytest.raises(RunLogExpiredError):
+        registry.subscribe("run_1")
+
+    resumed = registry.subscribe("run_1", last_event_id=1)
+    assert [c.text_delta async for c in resumed] == ["c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_log_expires_after_ttl():
+    """Test that finished runs are removed once their TTL has passed."""
+    registry = RunRegistry(ttl_seconds=0.01)
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+
+    registry.start("run_1", create_run(run_callback))
+    await asyncio.sleep(0.05)
+
+    assert registry.get("run_1") is None
+    with pytest.raises(KeyError):
+        registry.subscribe("run_1")
+
+
+@pytest.mark.asyncio
+async def test_assistant_transport_encoder_event_ids():
+    """Test that the encoder emits SSE ids starting at first_event_id."""
+    encoder = AssistantTransportEncoder(first_event_id=5)
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        controller.append_text("b")
+
+    lines = [line async for line in encoder.encode_stream(create_run(run_callback))]
+
+    assert lines[0].startswith(b"id: 5\ndata: ")
+    assert lines[1].startswith(b"id: 6\ndata: ")
+    assert lines[-1] == b"data: [DONE]\n\n"
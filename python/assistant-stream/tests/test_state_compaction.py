@@ -0,0 +1,176 @@
+import random
+
+import pytest
+from assistant_stream import create_run, RunController
+from assistant_stream.state_compaction import compact_operations
+from assistant_stream.state_manager import StateManager
+from assistant_stream.state_proxy import copy_json_value
+
+
+def _replay(state, operations):
+    manager = StateManager(lambda _: None, copy_json_value(state))
+    for operation in operations:
+        manager._apply_operation_to_local_state(operation)
+    return manager.state_data
+
+
+def test_merges_appends_on_the_same_path():
+    """Test that consecutive append-text operations are joined."""
+    operations = [
+        {"type": "append-text", "path": ["a"], "value": "x"},
+        {"type": "append-text", "path": ["b"], "value": "1"},
+        {"type": "append-text", "path": ["a"], "value": "y"},
+        {"type": "append-text", "path": ["a"], "value": "z"},
+    ]
+
+    assert compact_operations(operations) == [
+        {"type": "append-text", "path": ["a"], "value": "xyz"},
+        {"type": "append-text", "path": ["b"], "value": "1"},
+    ]
+    assert operations[0]["value"] == "x"
+
+
+def test_drops_superseded_operations():
+    """Test that a set drops earlier operations on the same or nested paths."""
+    operations = [
+        {"type": "set", "path": ["a"], "value": {"b": ""}},
+        {"type": "append-text", "path": ["a", "b"], "value": "x"},
+        {"type": "set", "path": ["c"], "value": 1},
+        {"type": "set", "path": ["a"], "value": 2},
+    ]
+
+    assert compact_operations(operations) == [
+        {"type": "set", "path": ["c"], "value": 1},
+        {"type": "set", "path": ["a"], "value": 2},
+    ]
+
+
+def test_folds_nested_operations_into_pending_set():
+    """Test that operations below a pending set are folded into its value."""
+    value = {"content": ""}
+    operations = [
+        {"type": "set", "path": ["messages", "0"], "value": value},
+        {"type": "append-text", "path": ["messages", "0", "content"], "value": "hi"},
+        {"type": "set", "path": ["messages", "0", "role"], "value": "ai"},
+    ]
+
+    assert compact_operations(operations) == [
+        {
+            "type": "set",
+            "path": ["messages", "0"],
+            "value": {"content": "hi", "role": "ai"},
+        }
+    ]
+    assert value == {"content": ""}
+
+
+@pytest.mark.asyncio
+async def test_keeps_list_index_sets():
+    """Test that sets that may append a list element are not dropped."""
+    operations = [
+        {"type": "set", "path": ["items", "0"], "value": 1},
+        {"type": "set", "path": ["items", "0"], "value": 2},
+    ]
+
+    assert _replay({"items": []}, compact_operations(operations)) == {"items": [2]}
+
+
+def test_keeps_none_sets():
+    """Test that sets of None are sent, since clients store them as null."""
+    operations = [
+        {"type": "set", "path": ["msg"], "value": {"content": "hi"}},
+        {"type": "set", "path": ["msg", "result"], "value": None},
+        {"type": "set", "path": ["items", "0"], "value": None},
+    ]
+
+    assert compact_operations(operations) == operations
+
+
+@pytest.mark.asyncio
+async def test_none_set_keeps_key_creating_operations():
+    """Test that a None set does not replace the set that creates its key."""
+    operations = [
+        {"type": "set", "path": ["k"], "value": "x"},
+        {"type": "set", "path": ["k"], "value": None},
+    ]
+
+    compacted = compact_operations(operations)
+    assert _replay({}, compacted) == _replay({}, operations) == {"k": None}
+
+
+def _random_operation(rng):
+    choice = rng.randrange(10)
+    if choice < 3:
+        path = rng.choice([["a"], ["b", "c"], ["b", "d"], ["l", "0", "t"]])
+        return {"type": "append-text", "path": path, "value": rng.choice("xyz")}
+    if choice == 3:
+        path = rng.choice([["a"], ["b"], ["b", "c"], ["b", "e"], []])
+        value = {"c": "", "d": ""} if path == ["b"] else ""
+        if path == ["b", "e"]:
+            value = rng.choice([None, ""])
+        if not path:
+            value = {"a": "", "b": {"c": ""}, "l": [], "n": 0}
+        return {"type": "set", "path": path, "value": value}
+    if choice == 4:
+        return {
+            "type": "set",
+            "path": ["l", str(rng.randint(0, 2))],
+            "value": {"t": rng.choice("xyz")},
+        }
+    if choice == 5:
+        path = rng.choice([["b", "c"], ["b", "d"], ["l", str(rng.randint(0, 2))]])
+        return {"type": "delete", "path": path}
+    if choice == 6:
+        return {
+            "type": "splice",
+            "path": ["l"],
+            "start": rng.randint(0, 2),
+            "deleteCount": rng.randint(0, 2),
+            "items": [{"t": "s"}] * rng.randint(0, 2),
+        }
+    if choice == 7:
+        path = rng.choice([["n"], ["b", "n"], ["l", "0", "n"]])
+        return {"type": "increment", "path": path, "value": rng.randint(1, 3)}
+    return {"type": "append-list", "path": ["l"], "items": [{"t": "p"}]}
+
+
+@pytest.mark.asyncio
+async def test_compacted_operations_are_equivalent():
+    """Test that compaction never changes the resulting state."""
+    rng = random.Random(0)
+    compared = 0
+
+    for _ in range(2000):
+        state = {"a": "", "b": {"c": ""}, "l": [], "n": 0}
+        operations = [_random_operation(rng) for _ in range(rng.randint(1, 20))]
+
+        try:
+            expected = _replay(state, operations)
+        except (KeyError, TypeError, IndexError):
+            continue
+        assert _replay(state, compact_operations(operations)) == expected
+        compared += 1
+
+    assert compared > 200
+
+
+@pytest.mark.asyncio
+async def test_create_run_compaction_option():
+    """Test that compaction can be turned off per run."""
+
+    async def run_callback(controller: RunController):
+        controller.state["text"] = ""
+        for token in "abc":
+            controller.state["text"] += token
+
+    async def operation_counts(compact):
+        return [
+            len(c.operations)
+            async for c in create_run(
+                run_callback, state={}, compact_state_operations=compact
+            )
+            if c.type == "update-state"
+        ]
+
+    assert await operation_counts(True) == [1]
+    assert await operation_counts(False) == [4]
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+from assistant_stream import create_run, DiffPolicy, RunController
+from assistant_stream.state_diff import diff_operations
+from assistant_stream.state_manager import StateManager
+from assistant_stream.state_proxy import copy_json_value
+
+
+def _messages(count):
+    return [{"id": str(i), "content": "x" * 100} for i in range(count)]
+
+
+def test_diff_emits_minimal_operations():
+    """Test that only changed leaves are sent, using the compact operations."""
+    current = {"messages": _messages(10), "status": "running", "old": 1}
+    value = copy_json_value(current)
+    value["messages"][9]["content"] += " more"
+    value["messages"].append({"id": "10", "content": ""})
+    value["status"] = "done"
+    del value["old"]
+
+    assert diff_operations(current, value, [], DiffPolicy()) == [
+        {"type": "append-text", "path": ["messages", "9", "content"], "value": " more"},
+        {"type": "append-list", "path": ["messages"], "items": [{"id": "10", "content": ""}]},
+        {"type": "set", "path": ["status"], "value": "done"},
+        {"type": "delete", "path": ["old"]},
+    ]
+    assert diff_operations(current, copy_json_value(current), [], DiffPolicy()) == []
+
+
+def test_diff_falls_back_to_a_full_set():
+    """Test the operation, size and depth limits."""
+    current = {"items": [{"v": i} for i in range(10)]}
+    value = {"items": [{"v": -i} for i in range(10)]}
+
+    assert diff_operations(current, value, [], DiffPolicy(max_operations=5)) is None
+    assert diff_operations({"a": 1}, {"a": 2}, [], DiffPolicy()) == [
+        {"type": "set", "path": ["a"], "value": 2}
+    ]
+    assert diff_operations({"a": "x", "b": "y"}, {"a": "z", "b": "w"}, [], DiffPolicy()) is None
+    assert diff_operations(
+        {"a": {"b": {"c": 1, "d": "x" * 100}}},
+        {"a": {"b": {"c": 2, "d": "x" * 100}}},
+        [],
+        DiffPolicy(max_depth=2),
+    ) == [{"type": "set", "path": ["a", "b"], "value": {"c": 2, "d": "x" * 100}}]
+
+
+@pytest.mark.asyncio
+async def test_diff_operations_are_equivalent():
+    """Test that applying the diff yields the assigned value."""
+    rng = random.Random(0)
+
+    def random_value(depth):
+        choice = rng.randrange(6 if depth < 3 else 3)
+        if choice == 0:
+            return rng.randint(0, 3)
+        if choice == 1:
+            return rng.choice(["", "a", "ab", "abc", "b"])
+        if choice == 2:
+            return None
+        if choice == 3:
+            return [random_value(depth + 1) for _ in range(rng.randint(0, 3))]
+        return {rng.choice("pqr"): random_value(depth + 1) for _ in range(rng.randint(0, 3))}
+
+    for _ in range(2000):
+        current = {"root": random_value(0)}
+        value = {"root": random_value(0)}
+        operations = diff_operations(current, value, [], DiffPolicy(max_size_ratio=100)) or [
+            {"type": "set", "path": [], "value": value}
+        ]
+
+        manager = StateManager(lambda _: None, copy_json_value(current))
+        for operation in operations:
+            manager._apply_operation_to_local_state(operation)
+        assert manager.state_data == value
+
+
+@pytest.mark.asyncio
+async def test_create_run_state_diff():
+    """Test that reassigning a mostly unchanged subtree only sends the change."""
+
+    async def run_callback(controller: RunController):
+        messages = copy_json_value(controller.state["messages"])
+        messages[-1]["content"] += "!"
+        controller.state["messages"] = messages
+
+    operations = [
+        operation
+        async for chunk in create_run(
+            run_callback, state={"messages": _messages(20)}, state_diff=DiffPolicy()
+        )
+        if chunk.type == "update-state"
+        for operation in chunk.operations
+    ]
+
+    assert operations == [
+        {"type": "append-text", "path": ["messages", "19", "content"], "value": "!"}
+    ]
@@ -0,0 +1,375 @@
+import asyncio
+import sys
+import threading
+import pytest
+from assistant_stream import create_run, FlushPolicy, RunController
+from assistant_stream.state_manager import StateManager
+
+
+async def collect_state_chunks(chunks):
+    return [c async for c in chunks if c.type == "update-state"]
+
+
+@pytest.mark.asyncio
+async def test_tick_flush_policy_emits_per_loop_iteration():
+    """Test that the default policy emits one batch per loop iteration."""
+
+    async def run_callback(controller: RunController):
+        for i in range(3):
+            controller.state["count"] = i
+            await asyncio.sleep(0)
+
+    chunks = await collect_state_chunks(create_run(run_callback, state={}))
+
+    assert len(chunks) == 3
+
+
+@pytest.mark.asyncio
+async def test_immediate_flush_policy():
+    """Test that the immediate policy emits every write on its own."""
+
+    async def run_callback(controller: RunController):
+        controller.state["a"] = 1
+        controller.state["b"] = 2
+
+    chunks = await collect_state_chunks(
+        create_run(
+            run_callback, state={}, state_flush_policy=FlushPolicy("immediate")
+        )
+    )
+
+    assert [len(c.operations) for c in chunks] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_debounce_flush_policy():
+    """Test that the debounce policy batches writes across loop iterations."""
+
+    async def run_callback(controller: RunController):
+        for i in range(5):
+            controller.state[f"k{i}"] = i
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        controller.state["k5"] = 5
+
+    chunks = await collect_state_chunks(
+        create_run(
+            run_callback,
+            state={},
+            state_flush_policy=FlushPolicy("debounce", debounce_ms=20),
+        )
+    )
+
+    assert [len(c.operations) for c in chunks] == [5, 1]
+
+
+@pytest.mark.asyncio
+async def test_debounce_flush_policy_max_latency():
+    """Test that max_latency_ms caps how long a debounced batch is held."""
+
+    async def run_callback(controller: RunController):
+        for i in range(6):
+            controller.state["count"] = i
+            await asyncio.sleep(0.01)
+
+    chunks = await collect_state_chunks(
+        create_run(
+            run_callback,
+            state={},
+            state_flush_policy=FlushPolicy(
+                "debounce", debounce_ms=50, max_latency_ms=25
+            ),
+        )
+    )
+
+    assert len(chunks) > 1
+
+
+@pytest.mark.asyncio
+async def test_size_flush_policy():
+    """Test that the size policy emits once enough operations are pending."""
+
+    async def run_callback(controller: RunController):
+        for i in range(5):
+            controller.state[f"k{i}"] = i
+            await asyncio.sleep(0)
+
+    chunks = await collect_state_chunks(
+        create_run(
+            run_callback,
+            state={},
+            state_flush_policy=FlushPolicy("size", max_operations=2),
+        )
+    )
+
+    assert [len(c.operations) for c in chunks] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_flush_policy_keeps_ordering_with_text():
+    """Test that pending state is flushed before other chunks."""
+
+    async def run_callback(controller: RunController):
+        controller.state["a"] = 1
+        controller.append_text("hi")
+        controller.state["b"] = 2
+
+    chunks = [
+        c
+        async for c in create_run(
+            run_callback,
+            state={},
+            state_flush_policy=FlushPolicy("debounce", debounce_ms=1000),
+        )
+    ]
+
+    assert [c.type for c in chunks] == ["update-state", "text-delta", "update-state"]
+
+
+def test_invalid_flush_policy():
+    """Test that invalid policies are rejected."""
+    with pytest.raises(ValueError):
+        FlushPolicy("never")
+    with pytest.raises(ValueError):
+        FlushPolicy("size")
+
+
+@pytest.mark.asyncio
+async def test_worker_thread_flush_cancels_timer_on_the_loop():
+    """Test that a flush from a worker thread cancels the timer on the loop."""
+    chunks = []
+    manager = StateManager(
+        chunks.append, {}, FlushPolicy("size", max_operations=2, max_latency_ms=1000)
+    )
+    manager.state["a"] = 1
+    # Let the loop arm the latency timer
+    await asyncio.sleep(0)
+    handle = manager._flush_handle
+    cancelled_on = []
+
+    class RecordingHandle:
+        def cancel(self):
+            cancelled_on.append(threading.get_ident())
+            handle.cancel()
+
+    manager._flush_handle = RecordingHandle()
+
+    def produce():
+        manager.state["b"] = 2
+
+    await asyncio.to_thread(produce)
+    assert [len(c.operations) for c in chunks] == [2]
+    await asyncio.sleep(0)
+
+    assert cancelled_on == [threading.get_ident()]
+    assert handle.cancelled()
+    assert manager._flush_handle is None
+
+
+def _apply(manager, *operations):
+    for operation in operations:
+        manager._apply_operation_to_local_state(operation)
+
+
+@pytest.mark.asyncio
+async def test_nested_update_mutates_in_place():
+    """Test that nested writes update containers in place."""
+    messages = [{"content": "a"}, {"content": "b"}]
+    manager = StateManager(lambda _: None, {"messages": messages})
+
+    _apply(
+        manager,
+        {"type": "append-text", "path": ["messages", "1", "content"], "value": "c"},
+        {"type": "set", "path": ["messages", "2"], "value": {"content": ""}},
+    )
+
+    assert manager.state_data["messages"] is messages
+    assert messages == [{"content": "a"}, {"content": "bc"}, {"content": ""}]
+
+
+@pytest.mark.asyncio
+async def test_set_value_is_not_aliased_by_later_updates():
+    """Test that later in-place updates don't change pending operation values."""
+    manager = StateManager(lambda _: None, {"messages": []})
+    message = {"content": ""}
+    set_operation = {"type": "set", "path": ["messages", "0"], "value": message}
+
+    _apply(
+        manager,
+        set_operation,
+        {"type": "append-text", "path": ["messages", "0", "content"], "value": "hi"},
+    )
+
+    assert set_operation["value"] == {"content": ""}
+    assert manager.state_data == {"messages": [{"content": "hi"}]}
+
+
+@pytest.mark.asyncio
+async def test_update_path_errors():
+    """Test that invalid paths are rejected without creating parents."""
+    manager = StateManager(lambda _: None, {"items": [1], "text": "x"})
+
+    with pytest.raises(KeyError):
+        _apply(manager, {"type": "set", "path": ["missing", "key"], "value": 1})
+    with pytest.raises(KeyError):
+        _apply(manager, {"type": "set", "path": ["items", "5"], "value": 1})
+    with pytest.raises(KeyError):
+        _apply(manager, {"type": "set", "path": ["text", "key"], "value": 1})
+    with pytest.raises(TypeError):
+        _apply(manager, {"type": "append-text", "path": ["items", "0"], "value": "a"})
+
+    assert manager.state_data == {"items": [1], "text": "x"}
+
+
+@pytest.mark.asyncio
+async def test_append_text_is_buffered_until_read():
+    """Test that appended text is joined lazily and reads see a plain str."""
+    manager = StateManager(lambda _: None, {"messages": [{"content": ""}]})
+    path = ["messages", "0", "content"]
+
+    for token in ["a", "b", "c"]:
+        _apply(manager, {"type": "append-text", "path": path, "value": token})
+
+    assert manager.state["messages"][0]["content"] == "abc"
+    _apply(manager, {"type": "append-text", "path": path, "value": "d"})
+    assert manager.state["messages"][0]["content"] + "" == "abcd"
+    _apply(manager, {"type": "append-text", "path": path, "value": "e"})
+    assert manager.state_data == {"messages": [{"content": "abcde"}]}
+
+
+@pytest.mark.asyncio
+async def test_set_replaces_buffered_text():
+    """Test that a set on a buffered string or its parent wins over buffered parts."""
+    manager = StateManager(lambda _: None, {"message": {"content": ""}})
+    path = ["message", "content"]
+
+    _apply(
+        manager,
+        {"type": "append-text", "path": path, "value": "a"},
+        {"type": "append-text", "path": path, "value": "b"},
+        {"type": "set", "path": path, "value": "x"},
+        {"type": "append-text", "path": path, "value": "y"},
+        {"type": "append-text", "path": path, "value": "z"},
+        {"type": "set", "path": ["message"], "value": {"content": "new"}},
+        {"type": "append-text", "path": path, "value": "!"},
+    )
+
+    assert manager.state_data == {"message": {"content": "new!"}}
+
+
+@pytest.mark.asyncio
+async def test_text_buffers_are_bounded():
+    """Test that many buffered strings are materialized correctly."""
+    state = {f"k{i}": "" for i in range(40)}
+    manager = StateManager(lambda _: None, state)
+
+    for _ in range(3):
+        for i in range(40):
+            _apply(manager, {"type": "append-text", "path": [f"k{i}"], "value": "x"})
+
+    assert len(manager._text_buffers) <= 16
+    assert manager.state_data == {f"k{i}": "xxx" for i in range(40)}
+
+
+@pytest.mark.asyncio
+async def test_structural_operations():
+    """Test local application of delete, splice, increment and append-list."""
+    manager = StateManager(lambda _: None, {"items": [1, 2, 3], "meta": {"a": 1}})
+
+    _apply(
+        manager,
+        {"type": "delete", "path": ["items", "0"]},
+        {"type": "splice", "path": ["items"], "start": 1, "deleteCount": 1, "items": [4, 5]},
+        {"type": "append-list", "path": ["items"], "items": [6]},
+        {"type": "increment", "path": ["meta", "a"], "value": 2},
+        {"type": "increment", "path": ["meta", "b"], "value": 1.5},
+        {"type": "delete", "path": ["meta", "missing"]},
+    )
+
+    assert manager.state_data == {"items": [2, 4, 5, 6], "meta": {"a": 3, "b": 1.5}}
+    with pytest.raises(KeyError):
+        _apply(manager, {"type": "delete", "path": ["items", "9"]})
+    with pytest.raises(TypeError):
+        _apply(manager, {"type": "append-list", "path": ["meta"], "items": [1]})
+    with pytest.raises(TypeError):
+        _apply(manager, {"type": "increment", "path": ["items"], "value": 1})
+
+
+@pytest.mark.asyncio
+async def test_delete_moves_buffered_text():
+    """Test that buffered text survives elements moving after a delete."""
+    manager = StateManager(lambda _: None, {"messages": [{"c": ""}, {"c": ""}]})
+
+    for _ in range(2):
+        _apply(manager, {"type": "append-text", "path": ["messages", "1", "c"], "value": "x"})
+    _apply(
+        manager,
+        {"type": "delete", "path": ["messages", "0"]},
+        {"type": "append-text", "path": ["messages", "0", "c"], "value": "y"},
+    )
+
+    assert manager.state_data == {"messages": [{"c": "xxy"}]}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_from_threads():
+    """Test that writes from worker threads are neither lost nor interleaved."""
+    emitted = []
+    manager = StateManager(
+        lambda chunk: emitted.extend(chunk.operations),
+        {"log": [], **{f"t{i}": "" for i in range(4)}},
+        compact=False,
+    )
+
+    def produce(index):
+        for _ in range(500):
+            manager.state[f"t{index}"] += "x"
+            with manager.batch():
+                manager.state["log"].append(index)
+                manager.state["log"].pop()
+
+    async def read():
+        while not done.is_set():
+            manager.state_data
+            await asyncio.sleep(0)
+
+    # Switch threads often so that unsynchronized updates would collide
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        done = asyncio.Event()
+        reader = asyncio.create_task(read())
+        await asyncio.gather(*(asyncio.to_thread(produce, i) for i in range(4)))
+        done.set()
+        await reader
+    finally:
+        sys.setswitchinterval(switch_interval)
+    manager.flush()
+
+    assert manager.state_data == {"log": [], **{f"t{i}": "x" * 500 for i in range(4)}}
+    assert len(emitted) == 4 * 500 * 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_from_threads():
+    """Test that list appends from worker threads each get their own index."""
+    manager = StateManager(lambda chunk: None, {"items": [], "seen": {}}, compact=False)
+
+    def produce(index):
+        for i in range(1000):
+            manager.state["items"].append(index)
+            manager.state["seen"].update({f"{index}-{i}": True})
+            manager.state["seen"].setdefault(str(index), 0)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        await asyncio.gather(*(asyncio.to_thread(produce, i) for i in range(12)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    manager.flush()
+
+    items = manager.state_data["items"]
+    assert len(items) == 12 * 1000
+    assert sorted(items) == sorted(i for i in range(12) for _ in range(1000))
+    assert len(manager.state_data["seen"]) == 12 * 1000 + 12
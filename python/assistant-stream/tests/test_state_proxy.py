@@ -0,0 +1,290 @@
+import pytest
+from assistant_stream.state_manager import FlushPolicy, StateManager
+
+
+def _counting_manager(state):
+    manager = StateManager(lambda _: None, state)
+    calls = []
+    get_value_at_path = manager.get_value_at_path
+
+    def counting_get_value_at_path(path):
+        calls.append(list(path))
+        return get_value_at_path(path)
+
+    manager.get_value_at_path = counting_get_value_at_path
+    return manager, calls
+
+
+@pytest.mark.asyncio
+async def test_proxy_reads_use_cached_nodes():
+    """Test that repeated reads don't resolve the path from the root again."""
+    manager, calls = _counting_manager({"a": {"b": {"c": {"d": 1}}}})
+    proxy = manager.state["a"]["b"]["c"]
+
+    for _ in range(10):
+        assert proxy["d"] == 1
+        assert len(proxy) == 1
+
+    assert len(calls) <= 1
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_is_invalidated_by_writes():
+    """Test that a proxy sees a container that replaced its cached node."""
+    manager, _ = _counting_manager({"message": {"content": "a", "meta": {}}})
+    message = manager.state["message"]
+    assert message["content"] == "a"
+
+    manager.state["message"] = {"content": "b"}
+    assert message["content"] == "b"
+    assert "meta" not in message
+
+    manager.state["message"]["content"] += "c"
+    assert message["content"] == "bc"
+
+
+@pytest.mark.asyncio
+async def test_proxy_reads_buffered_text():
+    """Test that cached proxies see text appended through buffered operations."""
+    manager, _ = _counting_manager({"messages": [{"content": ""}]})
+    message = manager.state["messages"][0]
+    path = ["messages", "0", "content"]
+
+    for token in "abc":
+        manager.add_operations([{"type": "append-text", "path": path, "value": token}])
+
+    assert message["content"] == "abc"
+    assert dict(message.items()) == {"content": "abc"}
+    assert manager.state["messages"] == [{"content": "abc"}]
+
+
+@pytest.mark.asyncio
+async def test_stale_proxy_raises_key_error():
+    """Test that a proxy whose node was removed raises on access."""
+    manager, _ = _counting_manager({"a": {"b": {"c": 1}}})
+    proxy = manager.state["a"]["b"]
+
+    manager.state["a"] = {}
+
+    with pytest.raises(KeyError):
+        proxy["c"]
+
+
+@pytest.mark.asyncio
+async def test_child_proxies_are_memoized():
+    """Test that child proxies are reused and have no instance dict."""
+    manager, _ = _counting_manager({"messages": [{"content": "a"}]})
+
+    first = manager.state["messages"][0]
+    second = manager.state["messages"][-1]
+
+    assert first is second
+    assert first._path == ("messages", "0")
+    assert not hasattr(first, "__dict__")
+
+    manager.state["messages"][0]["content"] = "b"
+    assert manager.state_data == {"messages": [{"content": "b"}]}
+
+
+@pytest.mark.asyncio
+async def test_batch_schedules_writes_once():
+    """Test that writes inside batch() are emitted as one chunk."""
+    chunks = []
+    manager = StateManager(chunks.append, {"a": 0, "items": []}, FlushPolicy("immediate"))
+
+    with manager.state.batch():
+        manager.state["a"] = 1
+        with manager.state.batch():
+            manager.state["items"].append("x")
+        assert manager.state["items"] == ["x"]
+        assert chunks == []
+
+    assert len(chunks) == 1
+    assert manager.state_data == {"a": 1, "items": ["x"]}
+
+
+@pytest.mark.asyncio
+async def test_update_sends_one_operation_list():
+    """Test that update() adds a set per key in a single call."""
+    manager, _ = _counting_manager({"meta": {"a": 1}})
+    batches = []
+    add_operations = manager.add_operations
+    manager.add_operations = lambda ops: (batches.append(ops), add_operations(ops))
+
+    manager.state["meta"].update({"b": 2}, c=3)
+
+    assert [[op["path"] for op in ops] for ops in batches] == [
+        [["meta", "b"], ["meta", "c"]]
+    ]
+    assert manager.state_data == {"meta": {"a": 1, "b": 2, "c": 3}}
+
+
+@pytest.mark.asyncio
+async def test_list_iadd_does_not_resend_the_list():
+    """Test that `state[key] += items` only sends the new elements."""
+    chunks = []
+    manager = StateManager(chunks.append, {"items": ["a"]}, FlushPolicy("immediate"))
+
+    manager.state["items"] += ["b", "c"]
+
+    assert [op for chunk in chunks for op in chunk.operations] == [
+        {"type": "append-list", "path": ["items"], "items": ["b", "c"]}
+    ]
+    assert manager.state_data == {"items": ["a", "b", "c"]}
+    with pytest.raises(TypeError):
+        manager.state["items"].update(a=1)
+
+
+@pytest.mark.asyncio
+async def test_list_and_dict_removal_operations():
+    """Test pop, remove, insert, popitem and del through compact operations."""
+    chunks = []
+    manager = StateManager(
+        chunks.append,
+        {"items": ["a", "b", "c", "d"], "meta": {"x": 1, "y": 2, "z": 3}},
+        FlushPolicy("immediate"),
+    )
+    items = manager.state["items"]
+    meta = manager.state["meta"]
+
+    assert items.pop() == "d"
+    assert items.pop(0) == "a"
+    items.remove("c")
+    items.insert(0, "z")
+    del items[-1]
+    assert meta.pop("x") == 1
+    assert meta.pop("missing", None) is None
+    assert meta.popitem() == ("z", 3)
+    del meta["y"]
+    meta.increment("count")
+    meta.increment("count", 2)
+
+    assert manager.state_data == {"items": ["z"], "meta": {"count": 3}}
+    assert [op["type"] for chunk in chunks for op in chunk.operations] == [
+        "delete",
+        "delete",
+        "delete",
+        "splice",
+        "delete",
+        "delete",
+        "delete",
+        "delete",
+        "increment",
+        "increment",
+    ]
+    with pytest.raises(IndexError):
+        manager.state["items"].pop(5)
+    with pytest.raises(ValueError):
+        manager.state["items"].remove("missing")
+    with pytest.raises(KeyError):
+        del manager.state["meta"]["missing"]
+
+
+@pytest.mark.asyncio
+async def test_view_writes_relative_to_its_root():
+    """Test that a view prefixes paths and resolves its root once."""
+    chunks = []
+    manager = StateManager(
+        chunks.append,
+        {"graph": {"nodes": [{"text": "", "meta": {}}]}},
+        FlushPolicy("immediate"),
+    )
+    view = manager.view(["graph", "nodes", 0])
+
+    view.add_operations([{"type": "append-text", "path": ["text"], "value": "ab"}])
+    view.state["meta"]["done"] = True
+    view.view(["meta"]).set_value(["count"], 1)
+
+    assert view.path == ["graph", "nodes", "0"]
+    assert view.get_value_at_path(["text"]) == "ab"
+    assert view.state_data == {"text": "ab", "meta": {"done": True, "count": 1}}
+    assert [op["path"] for chunk in chunks for op in chunk.operations] == [
+        ["graph", "nodes", "0", "text"],
+        ["graph", "nodes", "0", "meta", "done"],
+        ["graph", "nodes", "0", "meta", "count"],
+    ]
+
+    manager.state["graph"]["nodes"] = [{"text": "c"}]
+    assert view.state_data == {"text": "c"}
+    manager.state["graph"] = {}
+    with pytest.raises(KeyError):
+        view.get_value_at_path(["text"])
+
+
+@pytest.mark.asyncio
+async def test_view_operations_start_from_the_cached_root():
+    """Test that operations added through a view don't walk from the root."""
+    manager, calls = _counting_manager({"a": {"b": {"status": "", "n": 0}}})
+    view = manager.view(["a", "b"])
+
+    for status in ("running", "done"):
+        view.add_operations([{"type": "set", "path": ["status"], "value": status}])
+        view.add_operations([{"type": "increment", "path": ["n"], "value": 1}])
+    view.set_value(["result"], {"ok": True})
+
+    assert calls == [["a", "b"]]
+    assert manager.state_data == {
+        "a": {"b": {"status": "done", "n": 2, "result": {"ok": True}}}
+    }
+
+    # Replacing the root is seen by the view
+    manager.state["a"]["b"] = {"n": 0}
+    view.add_operations([{"type": "increment", "path": ["n"], "value": 5}])
+    assert manager.state_data == {"a": {"b": {"n": 5}}}
+
+
+@pytest.mark.asyncio
+async def test_view_on_a_value_sees_replacements():
+    """Test that a view on a non-container value is not served a stale copy."""
+    manager = StateManager(lambda _: None, {"text": "a", "n": 1})
+    text, n = manager.view(["text"]), manager.view(["n"])
+    assert (text.state_data, n.state_data) == ("a", 1)
+
+    manager.add_operations(
+        [
+            {"type": "set", "path": ["text"], "value": "b"},
+            {"type": "increment", "path": ["n"], "value": 1},
+        ]
+    )
+    assert (text.state_data, n.state_data) == ("b", 2)
+
+
+@pytest.mark.asyncio
+async def test_cached_proxy_sees_replaced_none_parent():
+    """Test that replacing a None container invalidates cached proxies."""
+    chunks = []
+    manager = StateManager(chunks.append, {"a": {"b": None}}, FlushPolicy("immediate"))
+    view = manager.view(["a", "b"])
+    assert view.state_data is None
+
+    # The None at ["a", "b"] is replaced by a new object
+    manager.add_operations([{"type": "increment", "path": ["a", "b", "n"], "value": 1}])
+    view.state["n"] += 1
+    view.state["m"] = {"x": 1}
+    view.state["m"]["x"] = 2
+
+    assert view.state_data == {"n": 2, "m": {"x": 2}}
+    assert manager.state_data == {"a": {"b": {"n": 2, "m": {"x": 2}}}}
+
+
+@pytest.mark.asyncio
+async def test_child_memo_is_dropped_on_structural_changes():
+    """Test that memoized child proxies of deleted keys are released."""
+    manager, _ = _counting_manager({"runs": {}})
+    runs = manager.state["runs"]
+
+    for i in range(100):
+        runs[f"run_{i}"] = {"status": "done"}
+        assert runs[f"run_{i}"]["status"] == "done"
+        del runs[f"run_{i}"]
+
+    runs._get_node()
+    assert not runs._children
+    assert manager.state_data == {"runs": {}}
+
+    runs["kept"] = {"status": "running"}
+    kept = runs["kept"]
+    assert runs["kept"] is kept
+    manager.state["runs"] = {"kept": {"status": "done"}}
+    assert runs["kept"] is not kept
+    assert runs["kept"]["status"] == "done"
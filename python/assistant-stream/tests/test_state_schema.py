@@ -0,0 +1,193 @@
+import random
+from typing import Dict, List, Literal, Optional, TypedDict
+
+import pytest
+from assistant_stream import create_run, RunController, StateSchema
+from assistant_stream.state_manager import StateManager
+from assistant_stream.state_proxy import copy_json_value
+
+
+class Part(TypedDict):
+    type: Literal["text", "tool-call"]
+    text: str
+
+
+class Message(TypedDict):
+    role: str
+    content: str
+    parts: List[Part]
+    tokens: Optional[int]
+
+
+class ThreadState(TypedDict):
+    messages: List[Message]
+    meta: Dict[str, int]
+
+
+JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "messages": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "role": {"type": "string"},
+                    "content": {"type": "string"},
+                    "parts": {"type": "array", "items": {"type": "object"}},
+                    "tokens": {"type": ["integer", "null"]},
+                },
+                "additionalProperties": False,
+            },
+        },
+        "meta": {"type": "object", "additionalProperties": {"type": "integer"}},
+    },
+    "additionalProperties": False,
+}
+
+
+def _state():
+    return {
+        "messages": [
+            {"role": "user", "content": "", "parts": [], "tokens": None} for _ in range(3)
+        ],
+        "meta": {},
+    }
+
+
+@pytest.mark.parametrize("schema", [ThreadState, JSON_SCHEMA])
+def test_paths_are_validated_against_the_schema(schema):
+    """Test that TypedDict and JSON Schema paths are checked once, up front."""
+    schema = StateSchema(schema)
+
+    assert schema.compile(["messages", 0, "content"]) == ("string", (False, True, False))
+    assert schema.compile(["messages", "1", "tokens"]) == ("number", (False, True, False))
+    assert schema.compile(["meta", "anything"]) == ("number", (False, False))
+    with pytest.raises(KeyError):
+        schema.compile(["messages", 0, "missing"])
+    with pytest.raises(KeyError):
+        schema.compile(["messages", "last"])
+    with pytest.raises(TypeError):
+        schema.compile(["messages", 0, "content", "x"])
+
+
+@pytest.mark.asyncio
+async def test_writer_requires_matching_kinds():
+    """Test that writers reject operations the schema rules out."""
+    manager = StateManager(lambda _: None, _state(), schema=StateSchema(ThreadState))
+
+    with pytest.raises(TypeError):
+        manager.writer(["messages", 0, "role"]).increment()
+    with pytest.raises(TypeError):
+        manager.writer(["meta", "count"]).append_text("x")
+    with pytest.raises(ValueError):
+        StateManager(lambda _: None, _state()).writer(["messages"])
+
+
+@pytest.mark.asyncio
+async def test_writers_match_generic_operations():
+    """Test that writes through writers yield the same state and operations."""
+    rng = random.Random(0)
+    schema = StateSchema(ThreadState)
+    fast_chunks, slow_chunks = [], []
+    fast = StateManager(fast_chunks.append, _state(), schema=schema)
+    slow = StateManager(slow_chunks.append, _state())
+    writers = {}
+    snapshots = []
+
+    for step in range(3000):
+        index = rng.randrange(4)
+        choice = rng.randrange(7)
+        if choice < 3:
+            path, method, operation = ["messages", index, "content"], "append_text", "x"
+        elif choice == 3:
+            path, method, operation = ["messages", index, "tokens"], "increment", 2
+        elif choice == 4:
+            path = ["messages", index, "parts"]
+            method, operation = "append_list", [{"type": "text", "text": "p"}]
+        elif choice == 5:
+            path = ["meta", rng.choice("ab")]
+            method, operation = "set", rng.choice([1, None])
+        else:
+            path = ["messages", index]
+            method, operation = "set", {"role": "ai", "content": "", "parts": [], "tokens": 0}
+        if step % 500 == 250:
+            _, snapshot = fast.snapshot()
+            snapshots.append((snapshot, copy_json_value(snapshot)))
+
+        if (tuple(path), method) not in writers:
+            writers[tuple(path), method] = fast.writer(path)
+        writer = writers[tuple(path), method]
+        generic = {
+            "append_text": lambda: {"type": "append-text", "value": operation},
+            "increment": lambda: {"type": "increment", "value": operation},
+            "append_list": lambda: {"type": "append-list", "items": operation},
+            "set": lambda: {"type": "set", "value": operation},
+        }[method]()
+        generic["path"] = [str(key) for key in path]
+
+        try:
+            slow.add_operations([copy_json_value(generic)])
+        except (KeyError, TypeError) as error:
+            with pytest.raises(type(error)):
+                getattr(writer, method)(operation)
+        else:
+            getattr(writer, method)(operation)
+        assert fast.state_data == slow.state_data
+
+    fast.flush()
+    slow.flush()
+    assert [c.operations for c in fast_chunks] == [c.operations for c in slow_chunks]
+    for snapshot, expected in snapshots:
+        assert snapshot == expected
+
+
+@pytest.mark.asyncio
+async def test_writers_take_the_fast_path_after_a_snapshot():
+    """Test that a snapshot sends writers to the generic path only once."""
+    manager = StateManager(lambda _: None, _state(), schema=StateSchema(ThreadState))
+    generic = []
+    apply = manager._apply_operation_to_local_state
+
+    def counting_apply(operation, *args):
+        generic.append(operation["type"])
+        return apply(operation, *args)
+
+    manager._apply_operation_to_local_state = counting_apply
+    tokens = manager.writer(["messages", 0, "tokens"])
+    parts = manager.writer(["messages", 0, "parts"])
+    _, snapshot = manager.snapshot()
+    expected = copy_json_value(snapshot)
+
+    for _ in range(3):
+        tokens.increment(1)
+        parts.append_list([{"type": "text", "text": "p"}])
+
+    # The shared parts list is copied once through the generic path
+    assert generic == ["append-list"]
+    assert snapshot == expected
+    message = manager.state_data["messages"][0]
+    assert message["tokens"] == 3
+    assert len(message["parts"]) == len(expected["messages"][0]["parts"]) + 3
+
+
+@pytest.mark.asyncio
+async def test_create_run_state_schema():
+    """Test that controller.writer() streams through the run's state."""
+
+    async def run_callback(controller: RunController):
+        content = controller.writer(["messages", 0, "content"])
+        for token in ["Hello", " world"]:
+            content.append_text(token)
+
+    chunks = [
+        chunk
+        async for chunk in create_run(
+            run_callback, state=_state(), state_schema=StateSchema(ThreadState)
+        )
+        if chunk.type == "update-state"
+    ]
+
+    assert [op for chunk in chunks for op in chunk.operations] == [
+        {"type": "append-text", "path": ["messages", "0", "content"], "value": "Hello world"}
+    ]
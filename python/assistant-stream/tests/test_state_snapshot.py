@@ -0,0 +1,75 @@
+import random
+
+import pytest
+from assistant_stream import StateHistoryExpiredError
+from assistant_stream.state_manager import StateManager
+from assistant_stream.state_proxy import copy_json_value
+
+
+def _random_operation(rng):
+    choice = rng.randrange(8)
+    message = ["messages", str(rng.randrange(3))]
+    if choice < 3:
+        return {"type": "append-text", "path": [*message, "content"], "value": "x"}
+    if choice == 3:
+        return {"type": "set", "path": [*message, "meta", "n"], "value": rng.randrange(9)}
+    if choice == 4:
+        return {"type": "increment", "path": ["count"], "value": 1}
+    if choice == 5:
+        return {"type": "append-list", "path": [*message, "parts"], "items": [{"p": 1}]}
+    if choice == 6:
+        return {"type": "delete", "path": [*message, "meta", "n"]}
+    return {"type": "set", "path": message, "value": {"content": "", "meta": {}, "parts": []}}
+
+
+def _initial_state():
+    return {
+        "count": 0,
+        "messages": [{"content": "", "meta": {}, "parts": []} for _ in range(3)],
+    }
+
+
+@pytest.mark.asyncio
+async def test_snapshots_are_not_changed_by_later_writes():
+    """Test that a snapshot keeps its contents while the state moves on."""
+    rng = random.Random(0)
+    manager = StateManager(lambda _: None, _initial_state())
+    snapshots = []
+
+    for _ in range(2000):
+        manager.add_operations([_random_operation(rng)])
+        if rng.randrange(20) == 0:
+            offset, state = manager.snapshot()
+            snapshots.append((offset, state, copy_json_value(state)))
+            # Reads through cached proxies must not hand out shared containers
+            manager.state["messages"][0]["content"]
+
+    assert len(snapshots) > 50
+    for _, state, expected in snapshots:
+        assert state == expected
+
+
+@pytest.mark.asyncio
+async def test_snapshot_and_ops_since_rebuild_the_state():
+    """Test that replaying ops_since on a snapshot yields the current state."""
+    rng = random.Random(1)
+    manager = StateManager(lambda _: None, _initial_state(), history_limit=100)
+    for _ in range(50):
+        manager.add_operations([_random_operation(rng)])
+
+    offset, state = manager.snapshot()
+    for _ in range(30):
+        manager.add_operations([_random_operation(rng)])
+
+    assert manager.offset == 80
+    replica = StateManager(lambda _: None, copy_json_value(state))
+    replica.add_operations(manager.ops_since(offset))
+    assert replica.state_data == manager.state_data
+    assert manager.ops_since(manager.offset) == []
+
+    for _ in range(100):
+        manager.add_operations([_random_operation(rng)])
+    with pytest.raises(StateHistoryExpiredError):
+        manager.ops_since(offset)
+    with pytest.raises(ValueError):
+        manager.ops_since(manager.offset + 1)
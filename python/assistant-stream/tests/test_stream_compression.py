@@ -0,0 +1,92 @@
+import zlib
+
+import pytest
+from assistant_stream import create_run, RunController, StreamCompression
+from assistant_stream.serialization import AssistantTransportResponse
+
+
+async def run_callback(controller: RunController):
+    for i in range(50):
+        controller.state["messages"][0]["content"] += f"token {i} "
+
+
+async def call(response, accept_encoding=None):
+    """Call the ASGI response and return its headers and body messages."""
+    headers = []
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await response(scope, receive, send)
+    start = messages[0]
+    return (
+        {key.decode(): value.decode() for key, value in start["headers"]},
+        [message["body"] for message in messages[1:] if message["body"]],
+    )
+
+
+def make_response(compression=None):
+    return AssistantTransportResponse(
+        create_run(run_callback, state={"messages": [{"content": ""}]}),
+        compression=compression,
+    )
+
+
+@pytest.mark.asyncio
+async def test_gzip_body_decodes_to_the_uncompressed_body():
+    """Test that the gzip body decodes, write by write, to the plain body."""
+    reported = []
+    _, plain = await call(make_response())
+    headers, writes = await call(
+        make_response(StreamCompression(encodings=("gzip",), on_metrics=reported.append)),
+        "gzip, deflate",
+    )
+
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    # Every write can be decoded on arrival
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoded = [decoder.decompress(data) for data in writes]
+    assert all(decoded[:-1])
+    assert decoder.eof
+    assert b"".join(decoded) == b"".join(plain)
+
+    metrics = reported[0].snapshot()
+    assert metrics["raw_bytes"] == len(b"".join(plain))
+    assert metrics["compressed_bytes"] == len(b"".join(writes))
+    assert metrics["saved_bytes"] > 0
+
+
+@pytest.mark.asyncio
+async def test_encoding_is_negotiated():
+    """Test Accept-Encoding negotiation against the preference order."""
+    compression = StreamCompression(encodings=("gzip", "deflate"))
+
+    headers, writes = await call(make_response(compression), "deflate;q=1, gzip;q=0.5")
+    assert headers["content-encoding"] == "deflate"
+    assert zlib.decompress(b"".join(writes)).startswith(b"data: ")
+
+    assert compression.negotiate("*") == "gzip"
+    assert compression.negotiate("gzip;q=0, *;q=0.1") == "deflate"
+    assert compression.negotiate("identity") is None
+
+
+@pytest.mark.asyncio
+async def test_body_is_not_compressed_without_accept_encoding():
+    """Test that clients without Accept-Encoding get the plain body."""
+    headers, writes = await call(make_response(StreamCompression()))
+
+    assert "content-encoding" not in headers
+    assert b"".join(writes).endswith(b"data: [DONE]\n\n")
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        StreamCompression(encodings=("zstd",))
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from assistant_stream import create_run, RunController, WriteCoalescing
+from assistant_stream.serialization import DataStreamEncoder, DataStreamResponse
+
+
+async def _writes(run_callback, policy):
+    response = DataStreamResponse(create_run(run_callback), write_coalescing=policy)
+    return [data async for data in response.body_iterator]
+
+
+async def _frames(run_callback):
+    encoder = DataStreamEncoder()
+    return [frame async for frame in encoder.encode_stream(create_run(run_callback))]
+
+
+@pytest.mark.asyncio
+async def test_frames_are_written_in_batches():
+    """Test that frames are joined up to the size threshold, in order."""
+
+    async def run_callback(controller: RunController):
+        for i in range(200):
+            controller.append_text(f"token {i} ")
+            await asyncio.sleep(0)
+
+    writes = await _writes(run_callback, WriteCoalescing(max_bytes=256, max_latency_ms=1000))
+
+    assert b"".join(writes) == b"".join(await _frames(run_callback))
+    assert 1 < len(writes) < 200
+    assert all(len(data) < 256 + 32 for data in writes)
+
+
+@pytest.mark.asyncio
+async def test_urgent_chunks_are_written_right_away():
+    """Test that an urgent chunk flushes everything buffered before it."""
+    written = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await asyncio.sleep(0)
+        await controller.add_tool_call("search", "call_1")
+        # The run only continues once the tool call was written
+        await asyncio.wait_for(written.wait(), 1)
+        controller.append_text("b")
+
+    response = DataStreamResponse(
+        create_run(run_callback), write_coalescing=WriteCoalescing(max_latency_ms=10_000)
+    )
+    writes = []
+    async for data in response.body_iterator:
+        writes.append(data)
+        written.set()
+
+    assert writes[0] == b'0:"a"\nb:{"toolCallId":"call_1","toolName":"search"}\n'
+    assert writes[-1].endswith(b'0:"b"\n')
+
+
+@pytest.mark.asyncio
+async def test_frames_are_held_at_most_max_latency():
+    """Test that a slow stream is written after the latency bound."""
+
+    async def run_callback(controller: RunController):
+        for token in "abc":
+            controller.append_text(token)
+            await asyncio.sleep(0.05)
+
+    writes = await _writes(run_callback, WriteCoalescing(max_latency_ms=5))
+
+    assert writes == [b'0:"a"\n', b'0:"b"\n', b'0:"c"\n']
+
+
+@pytest.mark.asyncio
+async def test_closing_the_response_cancels_the_run():
+    """Test that the run is cancelled when the client goes away."""
+    cancelled = asyncio.Event()
+
+    async def run_callback(controller: RunController):
+        controller.append_text("a")
+        await asyncio.sleep(10)
+
+    response = DataStreamResponse(
+        create_run(run_callback, on_cancel=cancelled.set),
+        write_coalescing=WriteCoalescing(max_latency_ms=0),
+    )
+    body = response.body_iterator
+    assert await body.__anext__() == b'0:"a"\n'
+    await body.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), 1)